@@ -0,0 +1,79 @@
+# ---
+# jupyter:
+#   jupytext:
+#     cell_metadata_filter: -all
+#     text_representation:
+#       extension: .py
+#       format_name: light
+#       format_version: '1.5'
+#       jupytext_version: 1.16.4
+#   kernelspec:
+#     display_name: Python 3 (ipykernel)
+#     language: python
+#     name: python3
+# ---
+
+
+# # Interpolation scaling
+#
+# The `Linear` interpolator finds the interval of each query time with a binary search,
+# or with direct index arithmetic for uniformly spaced samples, so the execution time
+# should grow linearly with the number of query times and only logarithmically (or not at all)
+# with the number of samples.
+
+import timeit
+
+
+number = 10
+samples = 100000
+
+
+def linear_scaling(regular):
+    setup = f"""
+import numpy as np
+from spacecoords import interpolation
+if {regular}:
+    t = np.linspace(0, 1e6, {samples})
+else:
+    t = np.cumsum(np.random.uniform(0.5, 1.5, size={samples}))
+states = np.random.randn(6, {samples})
+interp = interpolation.Linear(states, t)
+"""
+    name = "regular" if regular else "irregular"
+    for size in [10**3, 10**4, 10**5, 10**6]:
+        dt = timeit.timeit(
+            f"interp.get_state(np.random.uniform(t[0], t[-1], size={size}))",
+            setup=setup,
+            number=number,
+        )
+        print(f'"Linear" {name} ({samples} samples, {size:.0e} queries): {dt / number:.1e} seconds')
+
+
+# The `legendre8` function chooses between looping over node intervals and a gather based
+# implementation depending on how many query times fall in each interval.
+
+
+def legendre8_strategies():
+    setup = f"""
+import numpy as np
+from spacecoords import interpolation
+table = np.random.randn({samples}, 6)
+"""
+    for size in [10**4, 10**5]:
+        for span in [100, samples - 1]:
+            for method in ["intervals", "gather", "auto"]:
+                dt = timeit.timeit(
+                    f"interpolation.legendre8(table, 0, {samples - 1}, "
+                    f"np.sort(np.random.uniform(0, {span}, size={size})), method='{method}')",
+                    setup=setup,
+                    number=number,
+                )
+                print(
+                    f'"legendre8" {method:>9} ({size:.0e} queries over {span} intervals): '
+                    f"{dt / number:.1e} seconds"
+                )
+
+
+linear_scaling(regular=False)
+linear_scaling(regular=True)
+legendre8_strategies()
@@ -0,0 +1,91 @@
+# ---
+# jupyter:
+#   jupytext:
+#     cell_metadata_filter: -all
+#     text_representation:
+#       extension: .py
+#       format_name: light
+#       format_version: '1.5'
+#       jupytext_version: 1.16.4
+#   kernelspec:
+#     display_name: Python 3 (ipykernel)
+#     language: python
+#     name: python3
+# ---
+
+
+# # Interpolator serialization
+#
+# Interpolators can be saved to a directory of raw `.npy` files and loaded again with
+# `mmap=True`, in which case the tables are not read into memory until they are used and
+# the pages are shared between all processes that map the same files. Here the startup
+# time and peak resident memory of a fresh process is compared when rebuilding a
+# `Lagrange` interpolator (including the barycentric weights) from raw samples, loading
+# it into memory and memory-mapping it. Each scenario runs in a new process and the memory
+# is read from `/proc/self/status` (i.e. Linux only), since the `ru_maxrss` of a child
+# process starts at the peak of its parent. The peak RSS includes the file backed pages of
+# the memory-mapped tables that were touched by the queries, these pages live in the page
+# cache and are shared by all processes, while the anonymous RSS is private to each process.
+
+import pathlib
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+from spacecoords import interpolation
+
+samples = 2_000_000
+queries = 1000
+
+scenario = """
+import sys
+import time
+import numpy as np
+from spacecoords import interpolation
+
+
+def status(key):
+    with open("/proc/self/status") as fh:
+        return next(int(line.split()[1]) / 1024 for line in fh if line.startswith(key))
+
+
+mode, path = sys.argv[1], sys.argv[2]
+peak0, anon0 = status("VmHWM"), status("RssAnon")
+t0 = time.perf_counter()
+if mode == "build":
+    raw = np.load(path + "/states.npy"), np.load(path + "/t.npy")
+    interp = interpolation.Lagrange(*raw, order=8)
+else:
+    interp = interpolation.Interpolator.load(path, mmap=mode == "mmap")
+t1 = time.perf_counter()
+interp.get_state(np.random.uniform(interp.t[0], interp.t[-1], size={queries}))
+t2 = time.perf_counter()
+print(
+    f"{{t1 - t0:.2e}} {{t2 - t1:.2e}} "
+    f"{{status('VmHWM') - peak0:.1f}} {{status('RssAnon') - anon0:.1f}}"
+)
+""".format(queries=queries)
+
+
+def run(mode, path):
+    out = subprocess.run(
+        [sys.executable, "-c", scenario, mode, str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    startup, query, peak, anon = out.stdout.split()
+    print(
+        f"{mode:>5}: startup {startup} s, first {queries} queries {query} s, "
+        f"peak RSS +{peak} MiB, anonymous RSS +{anon} MiB"
+    )
+
+
+with tempfile.TemporaryDirectory() as tmpdirname:
+    path = pathlib.Path(tmpdirname) / "lagrange"
+    t = np.cumsum(np.random.uniform(0.5, 1.5, size=samples))
+    states = np.random.randn(6, samples)
+    interpolation.Lagrange(states, t, order=8).save(path)
+    for mode in ["build", "load", "mmap"]:
+        run(mode, path)
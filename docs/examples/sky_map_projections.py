@@ -0,0 +1,60 @@
+# ---
+# jupyter:
+#   jupytext:
+#     cell_metadata_filter: -all
+#     text_representation:
+#       extension: .py
+#       format_name: light
+#       format_version: '1.5'
+#       jupytext_version: 1.16.4
+#   kernelspec:
+#     display_name: Python 3 (ipykernel)
+#     language: python
+#     name: python3
+# ---
+
+
+# # Sky map projections
+#
+# Radiant sky maps are built with a `ProjectionHistogram`, which projects and bins the
+# points one chunk at a time. Here the chunks are generated on the fly, so the full set of
+# points never exists in memory, and the bin centers are mapped back to longitude and
+# latitude with the inverse projection to mask the bins outside of the map.
+
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+from spacecoords import projection
+
+chunks = 20
+chunk_points = 500_000
+rng = np.random.default_rng(1234)
+
+
+def radiant_chunk(size):
+    """Isotropic background with a concentrated source at (lon, lat) = (270, 60) degrees."""
+    lon = rng.uniform(0, 360, size=size)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, size=size)))
+    source = rng.uniform(size=size) < 0.2
+    lon[source] = 270 + rng.normal(scale=5, size=source.sum())
+    lat[source] = np.clip(60 + rng.normal(scale=5, size=source.sum()), -90, 90)
+    return lon, lat
+
+
+fig, axes = plt.subplots(1, 3, figsize=(16, 4))
+for ax, name in zip(axes, projection.PROJECTIONS):
+    hist = projection.ProjectionHistogram(name, bins=(360, 180), degrees=True)
+    t0 = time.perf_counter()
+    for _ in range(chunks):
+        hist.add(*radiant_chunk(chunk_points))
+    dt = time.perf_counter() - t0
+    print(f"{name}: {hist.total} points binned in {dt:.2f} s")
+
+    lon, _ = hist.bin_centers()
+    counts = np.where(np.isnan(lon), np.nan, hist.counts)
+    ax.pcolormesh(hist.x_edges, hist.y_edges, counts.T)
+    ax.set_aspect("equal")
+    ax.set_title(name)
+
+plt.show()
@@ -30,6 +30,16 @@ closest_point = np.linalg.solve(system_mat, system_result)
 print(system_mat, " x = ", system_result)
 print("x = ", closest_point)
 
+# A track of many targets observed by the same stations is triangulated in one batched call
+track = target[None, :] + np.linspace(0, 10, 1000)[:, None] * np.array([1, 0, -1])[None, :]
+track_dirs = (
+    track[:, :, None] + np.random.randn(1000, *stations.shape) * 0.05 - stations[None, :, :]
+)
+track_points = np.broadcast_to(stations, track_dirs.shape)
+track_est, track_resid = linalg.solve_triangulation(track_dirs, track_points)
+print("max track error = ", np.max(np.linalg.norm(track_est - track, axis=1)))
+print("mean line distance = ", np.mean(track_resid))
+
 fig = plt.figure(figsize=(15, 15))
 ax = fig.add_subplot(111, projection="3d")
 
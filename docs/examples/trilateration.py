@@ -38,6 +38,11 @@ print("x = ", closest_point)
 print("target = ", target)
 print(resid, rank)
 
+# The linear solution is refined with Gauss-Newton iterations, which also gives a covariance
+refined_point, covariance = linalg.solve_trilateration(ranges, stations, range_std=0.1)
+print("refined x = ", refined_point)
+print("position std = ", np.sqrt(np.diag(covariance)))
+
 fig = plt.figure(figsize=(15, 15))
 ax = fig.add_subplot(111, projection="3d")
 
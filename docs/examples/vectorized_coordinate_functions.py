@@ -106,6 +106,225 @@ for y in x.T:
     print(f"vectorized speedup = {dt_l/dt_v}")
 
 
+def linalg_vec_to_vec():
+    setup = f"""
+import spacecoords.linalg as linalg
+import numpy as np
+a = np.random.randn(3,{size})
+b = np.random.randn(3,{size})
+"""
+
+    dt_l = timeit.timeit(
+        """
+for x, y in zip(a.T, b.T):
+    linalg.vec_to_vec(x, y)
+    """,
+        setup=setup,
+        number=number,
+    )
+
+    dt_v = timeit.timeit(
+        "linalg.vec_to_vec(a, b)",
+        setup=setup,
+        number=number,
+    )
+    print(f'"vec_to_vec" ({size}) loop       performance: {dt_l:.1e} seconds')
+    print(f'"vec_to_vec" ({size}) vectorized performance: {dt_v:.1e} seconds')
+    print(f"vectorized speedup = {dt_l/dt_v}")
+
+
+def linalg_rotate_x():
+    setup = f"""
+import spacecoords.linalg as linalg
+import numpy as np
+th = np.random.randn({size})
+x = np.random.randn(3,{size})
+"""
+
+    dt_e = timeit.timeit(
+        'np.einsum("ijk,jk->ik", linalg.rot_mat_x(th), x)',
+        setup=setup,
+        number=number,
+    )
+    dt_m = timeit.timeit(
+        "linalg.rot_mat_x(th, layout='Nx3x3') @ x.T[:, :, None]",
+        setup=setup,
+        number=number,
+    )
+    dt_r = timeit.timeit(
+        "linalg.rotate_x(th, x)",
+        setup=setup,
+        number=number,
+    )
+    print(f'"rot_mat_x" ({size}) einsum     performance: {dt_e:.1e} seconds')
+    print(f'"rot_mat_x" ({size}) matmul     performance: {dt_m:.1e} seconds')
+    print(f'"rotate_x"  ({size}) direct     performance: {dt_r:.1e} seconds')
+    print(f"direct speedup = {dt_e/dt_r}")
+
+
+# Composing rotations as quaternions only pays off once the arrays are large enough for
+# memory traffic, rather than per call overhead, to dominate
+
+
+def linalg_rotation_chain(size=100000, number=10):
+    setup = f"""
+import spacecoords.linalg as linalg
+import numpy as np
+th = np.random.randn(3, {size})
+mats = [linalg.rot_mat_z(th[0]), linalg.rot_mat_y(th[1]), linalg.rot_mat_x(th[2])]
+rots = [linalg.Rotation.from_matrix(mat) for mat in mats]
+"""
+
+    dt_m = timeit.timeit(
+        'np.einsum("ijn,jkn->ikn", np.einsum("ijn,jkn->ikn", mats[0], mats[1]), mats[2])',
+        setup=setup,
+        number=number,
+    )
+    dt_q = timeit.timeit(
+        "rots[0] @ rots[1] @ rots[2]",
+        setup=setup,
+        number=number,
+    )
+    print(f'"rot_mat_*" ({size}) chain      performance: {dt_m:.1e} seconds')
+    print(f'"Rotation"  ({size}) chain      performance: {dt_q:.1e} seconds')
+    print(f"quaternion speedup = {dt_m/dt_q}")
+
+
+# Screening a catalog of directions against a set of beams only keeps the pairs within a
+# maximum angle, the full angle matrix is never held in memory
+
+
+def linalg_pairwise_screening(beams=1000, catalog=100000, number=3):
+    setup = f"""
+import spacecoords.linalg as linalg
+import numpy as np
+a = np.random.randn(3,{beams})
+b = np.random.randn(3,{catalog})
+"""
+
+    dt_l = timeit.timeit(
+        """
+for x in a.T:
+    np.nonzero(linalg.vector_angle(x, b, degrees=True) < 1.0)
+    """,
+        setup=setup,
+        number=number,
+    )
+    dt_p = timeit.timeit(
+        "linalg.pairwise_vector_angle(a, b, degrees=True, max_angle=1.0)",
+        setup=setup,
+        number=number,
+    )
+    print(f'"vector_angle" ({beams}x{catalog}) loop     performance: {dt_l / number:.1e} seconds')
+    print(f'"pairwise_vector_angle" ({beams}x{catalog}) performance: {dt_p / number:.1e} seconds')
+    print(f"pairwise speedup = {dt_l/dt_p}")
+
+
+# With a `SphericalIndex` a cone search only tests the directions in the pixels that
+# overlap the cone instead of the full catalog
+
+
+def spherical_cone_search(cones=1000, catalog=100000, radius=1.0, number=3):
+    setup = f"""
+import spacecoords.linalg as linalg
+import spacecoords.spherical as spherical
+import numpy as np
+a = np.random.randn(3,{cones})
+b = np.random.randn(3,{catalog})
+index = spherical.SphericalIndex(b)
+"""
+
+    dt_p = timeit.timeit(
+        f"linalg.pairwise_vector_angle(a, b, degrees=True, max_angle={radius})",
+        setup=setup,
+        number=number,
+    )
+    dt_i = timeit.timeit(
+        f"index.cone_search(a, {radius}, degrees=True)",
+        setup=setup,
+        number=number,
+    )
+    print(f'"pairwise_vector_angle" ({cones}x{catalog}) performance: {dt_p / number:.1e} seconds')
+    print(
+        f'"SphericalIndex.cone_search" ({cones}x{catalog}) '
+        f"performance: {dt_i / number:.1e} seconds"
+    )
+    print(f"index speedup = {dt_p/dt_i}")
+
+
+# `cart_to_sph` uses no masks or fancy indexing, here compared to the previous masked
+# implementation on a large input, also writing into a preallocated float32 array
+
+
+def coordinates_cart_to_sph_masked(size=1000000, number=10):
+    setup = f"""
+import spacecoords.spherical as sph
+import numpy as np
+
+def masked(vec):
+    r2_ = vec[0, ...] ** 2 + vec[1, ...] ** 2
+    out = np.empty(vec.shape, dtype=vec.dtype)
+    inds_ = r2_ < sph.CLOSE_TO_POLE_LIMIT
+    not_inds_ = np.logical_not(inds_)
+    out[0, inds_] = 0.0
+    out[1, inds_] = np.sign(vec[2, inds_]) * np.pi * 0.5
+    out[0, not_inds_] = np.arctan2(vec[0, not_inds_], vec[1, not_inds_])
+    out[1, not_inds_] = np.arctan(vec[2, not_inds_] / np.sqrt(r2_[not_inds_]))
+    out[2, ...] = np.sqrt(r2_ + vec[2, ...] ** 2)
+    return out
+
+x = np.random.randn(3,{size})
+x32 = x.astype(np.float32)
+out32 = np.empty_like(x32)
+"""
+
+    dt_m = timeit.timeit("masked(x)", setup=setup, number=number)
+    dt_v = timeit.timeit("sph.cart_to_sph(x)", setup=setup, number=number)
+    dt_f = timeit.timeit("sph.cart_to_sph(x32, out=out32)", setup=setup, number=number)
+    print(f'masked "cart_to_sph" ({size})       performance: {dt_m / number:.1e} seconds')
+    print(f'"cart_to_sph" ({size})              performance: {dt_v / number:.1e} seconds')
+    print(f'"cart_to_sph" ({size}) float32 out= performance: {dt_f / number:.1e} seconds')
+    print(f"mask-free speedup = {dt_m/dt_v}, float32 speedup = {dt_m/dt_f}")
+
+
+# A `SteeringGrid` computes the pointing directions of all beam positions of a phased
+# array face once per orientation, compared here to converting every beam position of a
+# scan separately
+
+
+def spherical_steering_grid(num=350, max_angle=60.0, number=3):
+    setup = f"""
+import spacecoords.spherical as sph
+import numpy as np
+grid = sph.SteeringGrid({num}, {max_angle}, degrees=True)
+frame = sph.array_face_frame(30.0, 60.0, degrees=True)
+"""
+
+    dt_l = timeit.timeit(
+        """
+for uvw in grid.uvw.T:
+    sph.cart_to_sph(frame.T @ uvw, degrees=True)
+    """,
+        setup=setup,
+        number=1,
+    )
+    dt_g = timeit.timeit(
+        "grid.clear_cache(); grid.az_el(30.0, 60.0)",
+        setup=setup,
+        number=number,
+    )
+    print(f'"cart_to_sph" ({num}x{num} grid) loop performance: {dt_l:.1e} seconds')
+    print(f'"SteeringGrid.az_el" ({num}x{num} grid) performance: {dt_g / number:.1e} seconds')
+    print(f"steering grid speedup = {dt_l / (dt_g / number)}")
+
+
 coordinates_vector_angle()
 coordinates_sph_to_cart()
 coordinates_cart_to_sph()
+coordinates_cart_to_sph_masked()
+linalg_vec_to_vec()
+linalg_rotate_x()
+linalg_rotation_chain()
+linalg_pairwise_screening()
+spherical_cone_search()
+spherical_steering_grid()
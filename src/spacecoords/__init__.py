@@ -11,6 +11,8 @@ from . import spherical
 from . import constants
 from . import projection
 from . import interpolation
+from . import parallel
+from . import spk_basic
 
 
 def _make_missing_module(name: str, dep: str) -> ModuleType:
@@ -30,11 +32,6 @@ if importlib.util.find_spec("astropy") is not None:
 else:
     celestial = _make_missing_module("celestial", "astropy")
 
-if importlib.util.find_spec("jplephem") is not None:
-    from . import spk_basic
-else:
-    spk_basic = _make_missing_module("spk_basic", "jplephem")
-
 if importlib.util.find_spec("spiceypy") is not None:
     from . import spice
 else:
@@ -13,6 +13,7 @@ import astropy.units as units
 import astropy.config as config
 
 from .spherical import cart_to_sph, sph_to_cart
+from .parallel import epoch_pool_map
 
 from .types import (
     NDArray_N,
@@ -58,6 +59,7 @@ def astropy_get_body(
     time: Time,
     kernel_dir: Path,
     ephemeris: str = "jpl",
+    workers: int | None = None,
 ) -> NDArray_6xN | NDArray_6:
     """Astropy get body wrapper.
 
@@ -66,15 +68,45 @@ def astropy_get_body(
 
     and also have a local directory that is different from the standard astropy cache configured
     inside a single function
+
+    If `workers` is given, vector times are split across a process pool where each worker loads
+    the ephemeris independently, see `parallel.epoch_pool_map`. The first epoch is evaluated
+    in the calling process so that any ephemeris download happens only once.
     """
-    with config.set_temp_cache(path=str(kernel_dir), delete=False):
-        pos, vel = coord.get_body_barycentric_posvel(body, time, ephemeris=ephemeris)
-
-    shape: tuple[int, ...] = (6, time.size) if time.size > 1 else (6,)
-    state = np.empty(shape, dtype=np.float64)
-    state[:3, ...] = pos.xyz.to(units.m).value
-    state[3:, ...] = vel.xyz.to(units.m / units.s).value
-    return state
+    if workers is None or workers < 2 or time.size < 2:
+        with config.set_temp_cache(path=str(kernel_dir), delete=False):
+            pos, vel = coord.get_body_barycentric_posvel(body, time, ephemeris=ephemeris)
+
+        shape: tuple[int, ...] = (6, time.size) if time.size > 1 else (6,)
+        state = np.empty(shape, dtype=np.float64)
+        state[:3, ...] = pos.xyz.to(units.m).value
+        state[3:, ...] = vel.xyz.to(units.m / units.s).value
+        return state
+
+    time_ = time.flatten()
+    astropy_get_body(body, time_[0], kernel_dir, ephemeris=ephemeris)
+    # the ephemeris is evaluated in TDB, converting here keeps observer dependent
+    # conversions (e.g. using `time.location`) identical to the single process path
+    tdb = time_.tdb
+    return epoch_pool_map(
+        _astropy_get_body_jd,
+        (tdb.jd1, tdb.jd2),
+        (6, time.size),
+        workers,
+        args=("tdb", body, kernel_dir, ephemeris),
+    )
+
+
+def _astropy_get_body_jd(
+    jd1: NDArray_N,
+    jd2: NDArray_N,
+    scale: str,
+    body: str,
+    kernel_dir: Path,
+    ephemeris: str,
+) -> NDArray_6xN:
+    time = Time(jd1, jd2, format="jd", scale=scale)
+    return astropy_get_body(body, time, kernel_dir, ephemeris=ephemeris).reshape(6, time.size)
 
 
 def not_geocentric(frame: str) -> bool:
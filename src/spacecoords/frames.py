@@ -3,11 +3,13 @@
 """Transforms between common coordinate frames without any additional dependencies"""
 
 import numpy as np
-from .spherical import sph_to_cart
+from .spherical import sph_to_cart, cart_to_sph, CLOSE_TO_POLE_LIMIT
 from .types import (
     NDArray_N,
     NDArray_3,
     NDArray_3xN,
+    NDArray_6,
+    NDArray_6xN,
 )
 from .constants import WGS84
 
@@ -227,6 +229,73 @@ def ecef_to_enu(
     return enu
 
 
+def ecef_to_azel_rates(
+    lat: float,
+    lon: float,
+    alt: float,
+    states: NDArray_6 | NDArray_6xN,
+    degrees: bool = False,
+) -> NDArray_6xN | NDArray_6:
+    """Azimuth, elevation and range of ECEF target states seen from a site together with
+    their time derivatives, computed analytically in one pass.
+
+    The relative position and velocity are rotated to the local (east, north, up) frame of
+    the site and the rates follow from differentiating the spherical coordinates, i.e.
+    $\\dot{r} = \\rho \\cdot \\dot{\\rho} / r$,
+    $\\dot{A} = (n \\dot{e} - e \\dot{n}) / h^2$ and
+    $\\dot{E} = (h^2 \\dot{u} - u (e \\dot{e} + n \\dot{n})) / (h r^2)$ where $h$ is the
+    horizontal distance. The site is fixed in ECEF, so the ECEF velocity is the velocity
+    relative to the site.
+
+    Parameters
+    ----------
+    lat
+        Geodetic latitude of the site, also defines the local horizon.
+    lon
+        Longitude of the site.
+    alt
+        Altitude of the site above the WGS84 ellipsoid [m].
+    states
+        (6,) or (6, n) ECEF positions [m] and velocities [m/s].
+    degrees
+        If `True`, use degrees. Else all angles are given in radians.
+
+    Returns
+    -------
+        (6,) or (6, n) array of azimuth east of north, elevation, range [m], azimuth rate,
+        elevation rate and range rate [m/s], with the angular rates in radians (degrees)
+        per second. Following `spherical.cart_to_sph` the azimuth is 0 straight above or
+        below the site, where the angular rates are undefined and set to NaN.
+    """
+    if degrees:
+        lat, lon = np.radians(lat), np.radians(lon)
+    states = np.asarray(states, dtype=np.float64)
+    site = geodetic_wgs84_to_ecef(lat, lon, alt)
+    mx = ecef_to_enu_mat(lat, lon)
+
+    out = np.empty(states.shape, dtype=np.float64)
+    rel = np.dot(mx, states[:3, ...] - site.reshape((3,) + (1,) * (states.ndim - 1)))
+    vel = np.dot(mx, states[3:, ...])
+    out[:3, ...] = cart_to_sph(rel)
+
+    e, n, u = rel[0, ...], rel[1, ...], rel[2, ...]
+    de, dn, du = vel[0, ...], vel[1, ...], vel[2, ...]
+    h2 = e * e + n * n
+    r = out[2, ...]
+    pole = h2 < CLOSE_TO_POLE_LIMIT
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[3, ...] = np.where(pole, np.nan, (n * de - e * dn) / h2)
+        out[4, ...] = np.where(
+            pole, np.nan, (h2 * du - u * (e * de + n * dn)) / (np.sqrt(h2) * r * r)
+        )
+        out[5, ...] = (e * de + n * dn + u * du) / r
+
+    if degrees:
+        out[:2, ...] = np.degrees(out[:2, ...])
+        out[3:5, ...] = np.degrees(out[3:5, ...])
+    return out
+
+
 def geodetic_wgs84_to_ecef(
     lat: NDArray_N | float,
     lon: NDArray_N | float,
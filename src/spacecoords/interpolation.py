@@ -3,10 +3,20 @@
 """Interpolation functions."""
 
 from abc import ABC, abstractmethod
+import json
+from math import comb, factorial
+from pathlib import Path
 
 import numpy as np
 import numpy.typing as npt
-from typing import Optional
+from typing import Optional, Any, TypeVar
+
+SAVE_FORMAT_VERSION = 1
+"""Version of the `Interpolator.save` file layout."""
+
+SAVE_META_NAME = "interpolator.json"
+
+InterpolatorType = TypeVar("InterpolatorType", bound="Interpolator")
 
 
 class Interpolator(ABC):
@@ -14,7 +24,9 @@ class Interpolator(ABC):
 
     To create a Interpolator one must define the `get_state` method. to return interpolated
     This method should return states based on the data contained in the instance.
-    This data is preferably internalized at instantiation.
+    This data is preferably internalized at instantiation. The `derivative` argument of
+    `get_state` selects the time derivative of the interpolating function to evaluate,
+    e.g. `derivative=1` gives velocities from tabulated positions.
 
     Parameters
     ----------
@@ -22,6 +34,20 @@ class Interpolator(ABC):
         (6,n) array of states to interpolate between.
     t
         (n,) vector of times corresponding to the states.
+
+    Notes
+    -----
+    Saved layout
+        `save` writes either a directory or, if the path ends with `.npz`, a single
+        uncompressed `.npz` archive. A directory contains one raw `.npy` file per array
+        (always `states.npy` and `t.npy` plus any subclass specific arrays) and a
+        `interpolator.json` file with the keys `class`, `version`, `arrays` and `params`,
+        where `arrays` are the names of the saved arrays and `params` are the scalar
+        constructor arguments. Only the listed arrays are loaded, other files in the
+        directory are ignored. An archive contains the same arrays and the json document as
+        a string in the `__meta__` entry. Only the directory layout can be loaded with
+        `mmap=True`, which memory-maps the arrays read-only so that the tables stay on disk
+        and are shared between processes through the page cache.
     """
 
     def __init__(self, states: npt.NDArray, t: npt.NDArray) -> None:
@@ -29,9 +55,84 @@ class Interpolator(ABC):
         self.t = np.atleast_1d(t)
 
     @abstractmethod
-    def get_state(self, t: npt.NDArray) -> npt.NDArray:
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
         pass
 
+    def _saved_arrays(self) -> dict[str, npt.NDArray]:
+        return {"states": self.states, "t": self.t}
+
+    def _saved_params(self) -> dict[str, Any]:
+        return {}
+
+    @classmethod
+    def _from_saved(
+        cls: type[InterpolatorType], arrays: dict[str, npt.NDArray], params: dict[str, Any]
+    ) -> InterpolatorType:
+        return cls(arrays["states"], arrays["t"], **params)
+
+    def save(self, path: str | Path) -> None:
+        """Save the interpolator, see the class notes for the layout."""
+        path = Path(path)
+        arrays = self._saved_arrays()
+        meta = json.dumps(
+            {
+                "class": type(self).__name__,
+                "version": SAVE_FORMAT_VERSION,
+                "arrays": list(arrays),
+                "params": self._saved_params(),
+            }
+        )
+        if path.suffix == ".npz":
+            np.savez(path, __meta__=np.array(meta), **arrays)  # type: ignore[arg-type]
+            return
+
+        path.mkdir(parents=True, exist_ok=True)
+        for name, data in arrays.items():
+            np.save(path / f"{name}.npy", data)
+        (path / SAVE_META_NAME).write_text(meta)
+
+    @classmethod
+    def load(cls: type[InterpolatorType], path: str | Path, mmap: bool = False) -> InterpolatorType:
+        """Load an interpolator saved with `save`.
+
+        Called on the base class the saved class is instantiated, called on a subclass the
+        saved class must be that subclass or derived from it.
+        """
+        path = Path(path)
+        arrays: dict[str, npt.NDArray]
+        if path.suffix == ".npz":
+            if mmap:
+                raise ValueError("Memory-mapping is only supported for the directory layout")
+            with np.load(path) as data:
+                meta = json.loads(str(data["__meta__"]))
+                arrays = {name: data[name] for name in meta["arrays"]}
+        else:
+            meta = json.loads((path / SAVE_META_NAME).read_text())
+            arrays = {
+                name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)
+                for name in meta["arrays"]
+            }
+
+        if meta["version"] > SAVE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported interpolator file version {meta['version']}")
+        classes = {sub.__name__: sub for sub in _subclasses(cls)}
+        if meta["class"] not in classes:
+            raise ValueError(f"Saved interpolator {meta['class']} is not a {cls.__name__}")
+        saved_cls = classes[meta["class"]]
+        return saved_cls._from_saved(arrays, meta["params"])  # type: ignore[return-value]
+
+
+def _check_derivative(derivative: int) -> None:
+    if derivative < 0:
+        raise ValueError(f"Derivative order must be non-negative, got {derivative}")
+
+
+def _subclasses(cls: type[Interpolator]) -> list[type[Interpolator]]:
+    subs = [cls]
+    for sub in cls.__subclasses__():
+        subs += _subclasses(sub)
+    return subs
+
 
 class Legendre8(Interpolator):
     """Order-8 Legendre polynomial interpolation of uniformly distributed states."""
@@ -41,34 +142,966 @@ class Legendre8(Interpolator):
             raise ValueError(f"Cannot performance 8-degree interpolation with {len(t)} points")
         super().__init__(states, t)
 
-    def get_state(self, t: npt.NDArray) -> npt.NDArray:
-        intep_states = legendre8(self.states.T, self.t.min(), self.t.max(), t, ti=None)
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        intep_states = legendre8(
+            self.states.T, self.t.min(), self.t.max(), t, ti=None, derivative=derivative
+        )
         return intep_states.T
 
 
-class Linear(Interpolator):
-    """Linear interpolation between states"""
+class IntervalInterpolator(Interpolator):
+    """Base class for interpolators on strictly increasing, possibly non-uniform, sample times.
+
+    The interval of each query time is found with a binary search, or with direct index
+    arithmetic if the sample times are uniformly spaced, so that the cost is linear in the
+    number of query times. Query times outside of the sample times raise a `ValueError`.
+    """
 
     def __init__(self, states: npt.NDArray, t: npt.NDArray) -> None:
         super().__init__(states, t)
+        if self.t.size < 2:
+            raise ValueError(f"Cannot performance interpolation with {self.t.size} points")
 
-        self.t_diffs = np.diff(t)
+        self.t_diffs = np.diff(self.t)
+        if np.any(self.t_diffs <= 0):
+            raise ValueError("Sample times must be strictly increasing")
+        self.regular = bool(np.allclose(self.t_diffs, self.t_diffs[0], rtol=1e-12, atol=0))
 
-    def get_state(self, t: npt.NDArray) -> npt.NDArray:
-        st_t = self.t.flatten()
+    def check_range(self, t: npt.NDArray) -> npt.NDArray:
+        """Flatten the query times and check that they are inside the sample times."""
         in_t = np.atleast_1d(t).flatten()
-        t_mat = st_t[:, None] - in_t[None, :]
+        if np.any(in_t < self.t[0]) or np.any(in_t > self.t[-1]):
+            raise ValueError(
+                f"Query times outside of interpolation range [{self.t[0]}, {self.t[-1]}]"
+            )
+        return in_t
+
+    def get_indices(self, t: npt.NDArray) -> npt.NDArray:
+        """Get the index of the interval start for each query time."""
+        if self.regular:
+            inds = np.floor((t - self.t[0]) / self.t_diffs[0]).astype(np.int64)
+        else:
+            inds = np.searchsorted(self.t, t, side="right") - 1
+        # last sample time belongs to the last interval
+        return np.clip(inds, 0, self.t.size - 2)
+
+    def get_windows(self, inds: npt.NDArray, points: int) -> npt.NDArray:
+        """Get the (P, points) sample indices of windows centred on the given intervals,
+        shifted inwards at the edges of the sample times.
+        """
+        start = np.clip(inds - (points // 2 - 1), 0, self.t.size - points)
+        return start[:, np.newaxis] + np.arange(points)[np.newaxis, :]
+
+
+class Linear(IntervalInterpolator):
+    """Linear interpolation between states, see `IntervalInterpolator`."""
 
-        inds = np.argmax(t_mat > 0, axis=0) - 1
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        _check_derivative(derivative)
+        in_t = self.check_range(t)
 
-        dts = -t_mat[inds, np.arange(len(t))]
-        frac = dts / self.t_diffs[inds]
+        inds = self.get_indices(in_t)
+        if derivative == 1:
+            return (self.states[:, inds + 1] - self.states[:, inds]) / self.t_diffs[inds]
+        elif derivative > 1:
+            return np.zeros(
+                (self.states.shape[0], in_t.size),
+                dtype=np.result_type(self.states.dtype, np.float64),
+            )
+        frac = (in_t - self.t[inds]) / self.t_diffs[inds]
 
         intep_states = self.states[:, inds] * (1 - frac) + self.states[:, inds + 1] * frac
         return intep_states
 
 
+class Hermite(IntervalInterpolator):
+    """Lagrange-Hermite interpolation of (6,n) position and velocity states.
+
+    Unlike the other interpolators the positions and velocities are not treated as independent
+    quantities. Over a window of $k$ samples the unique polynomial of degree $2k - 1$ that
+    matches both the positions and the velocities is constructed, the interpolated positions
+    are its values and the interpolated velocities its analytic derivative. Since the
+    velocities constrain the positions, a given accuracy is reached with much sparser sampling.
+
+    Parameters
+    ----------
+    states
+        (6,n) array of states to interpolate between, the velocities (rows 3-5) must be the
+        time derivatives of the positions (rows 0-2) in the units of `t`.
+    t
+        (n,) vector of strictly increasing, possibly non-uniform, times.
+    order
+        Odd polynomial degree, 3 gives cubic Hermite interpolation between neighbouring samples,
+        5 uses a window of 3 samples, 7 a window of 4 samples and so on.
+
+    Notes
+    -----
+    Hermite basis
+        With the Lagrange basis $L_j$ of the window nodes $t_j$ the interpolant is
+        $$
+            H(t) = \\sum_j (1 - 2 L_j'(t_j) (t - t_j)) L_j(t)^2 \\mathbf{r}_j
+                + (t - t_j) L_j(t)^2 \\mathbf{v}_j.
+        $$
+    """
+
+    def __init__(self, states: npt.NDArray, t: npt.NDArray, order: int = 3) -> None:
+        if order < 3 or order % 2 == 0:
+            raise ValueError(f"Hermite interpolation order must be odd and at least 3, got {order}")
+        self.order = order
+        self.points = (order + 1) // 2
+        if len(t) < self.points:
+            raise ValueError(
+                f"Cannot performance {order}-degree interpolation with {len(t)} points"
+            )
+        super().__init__(states, t)
+
+    def _saved_params(self) -> dict[str, Any]:
+        return {"order": self.order}
+
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        """Interpolate states, with `derivative=k` the positions are the k-th and the
+        velocities the (k + 1)-th time derivative of the Hermite polynomial.
+        """
+        _check_derivative(derivative)
+        in_t = self.check_range(t)
+        window = self.get_windows(self.get_indices(in_t), self.points)
+        basis, dbasis = hermite_basis(in_t, self.t[window], derivative=derivative)
+
+        # basis/dbasis {2, P, k}: position and velocity weights and their time derivatives
+        pos = self.states[:3, window]
+        vel = self.states[3:, window]
+        intep_states = np.empty((6, len(in_t)), dtype=np.result_type(self.states.dtype, np.float64))
+        intep_states[:3, :] = np.sum(basis[0] * pos + basis[1] * vel, axis=-1)
+        intep_states[3:, :] = np.sum(dbasis[0] * pos + dbasis[1] * vel, axis=-1)
+        return intep_states
+
+
+class Lagrange(IntervalInterpolator):
+    """Arbitrary order Lagrange polynomial interpolation of states on non-uniform time grids.
+
+    The barycentric weights of every window of `order + 1` consecutive samples are precomputed
+    at instantiation, so that queries only need a window lookup and a weighted sum.
+
+    Parameters
+    ----------
+    states
+        (6,n) array of states to interpolate between.
+    t
+        (n,) vector of strictly increasing, possibly non-uniform, times.
+    order
+        Polynomial degree, each query uses `order + 1` samples around it.
+    max_step
+        Sample spacings larger than this are treated as gaps in the data. Windows never span a
+        gap and queries inside a gap raise a `ValueError`. Defaults to 5 times the median
+        sample spacing.
+    weights
+        Precomputed barycentric weights, see `barycentric_weights`, e.g. from a saved
+        interpolator. Computed from `t` if not given.
+
+    Notes
+    -----
+    Barycentric form
+        With the weights $w_j = 1 / \\prod_{m \\neq j} (t_j - t_m)$ the interpolant is
+        $$
+            p(t) = \\frac{\\sum_j \\frac{w_j}{t - t_j} \\mathbf{x}_j}{\\sum_j \\frac{w_j}{t - t_j}}.
+        $$
+    """
+
+    def __init__(
+        self,
+        states: npt.NDArray,
+        t: npt.NDArray,
+        order: int = 8,
+        max_step: Optional[float] = None,
+        weights: Optional[npt.NDArray] = None,
+    ) -> None:
+        if order < 1:
+            raise ValueError(f"Lagrange interpolation order must be at least 1, got {order}")
+        self.order = order
+        self.points = order + 1
+        if len(t) < self.points:
+            raise ValueError(
+                f"Cannot performance {order}-degree interpolation with {len(t)} points"
+            )
+        super().__init__(states, t)
+
+        self.max_step = float(5 * np.median(self.t_diffs)) if max_step is None else max_step
+        gaps = self.t_diffs > self.max_step
+        segment = np.concatenate([[0], np.cumsum(gaps)])
+        seg_starts = np.concatenate([[0], np.flatnonzero(gaps) + 1])
+        seg_ends = np.concatenate([np.flatnonzero(gaps), [self.t.size - 1]])
+        self.gaps = gaps
+        self.segment_start = seg_starts[segment]
+        self.segment_end = seg_ends[segment]
+
+        self.weights = barycentric_weights(self.t, self.points) if weights is None else weights
+
+    def _saved_arrays(self) -> dict[str, npt.NDArray]:
+        return {"states": self.states, "t": self.t, "weights": self.weights}
+
+    def _saved_params(self) -> dict[str, Any]:
+        return {"order": self.order, "max_step": float(self.max_step)}
+
+    @classmethod
+    def _from_saved(
+        cls: type[InterpolatorType], arrays: dict[str, npt.NDArray], params: dict[str, Any]
+    ) -> InterpolatorType:
+        return cls(arrays["states"], arrays["t"], **dict(params, weights=arrays["weights"]))
+
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        window, coefs = self.get_coefficients(t, derivative=derivative)
+        return np.einsum("pk,ipk->ip", coefs, self.states[:, window])
+
+    def get_coefficients(
+        self, t: npt.NDArray, derivative: int = 0
+    ) -> tuple[npt.NDArray, npt.NDArray]:
+        """Get the (P, order + 1) sample indices and interpolation coefficients of each query.
+
+        The coefficients only depend on the time grid and can be applied to any data sampled
+        on it, the interpolated value of query `p` is `sum(coefs[p, :] * data[..., window[p, :]])`.
+        With `derivative=k` the coefficients give the k-th time derivative of the interpolant.
+        """
+        _check_derivative(derivative)
+        in_t = self.check_range(t)
+        inds = self.get_indices(in_t)
+        # the last sample before a gap belongs to the previous interval
+        before_gap = self.gaps[inds] & (in_t == self.t[inds]) & (inds > 0)
+        inds[before_gap] -= 1
+        if np.any(self.gaps[inds]):
+            raise ValueError(f"Query times inside data gaps longer than max_step={self.max_step}")
+
+        seg_start = self.segment_start[inds]
+        seg_end = self.segment_end[inds]
+        if np.any(seg_end - seg_start + 1 < self.points):
+            raise ValueError(f"Query times in data segments with less than {self.points} points")
+
+        if self.order % 2 == 0:
+            # odd number of points, centre the window on the closest sample
+            closer = (in_t - self.t[inds]) >= 0.5 * self.t_diffs[inds]
+            start = inds - self.order // 2 + closer
+        else:
+            start = inds - (self.points // 2 - 1)
+        start = np.clip(start, seg_start, seg_end - self.points + 1)
+        window = start[:, np.newaxis] + np.arange(self.points)[np.newaxis, :]
+
+        if derivative == 0:
+            coefs = barycentric_coefficients(in_t, self.t[window], self.weights[start, :])
+        else:
+            coefs = lagrange_basis_derivatives(
+                in_t, self.t[window], self.weights[start, :], derivative
+            )[-1]
+        return window, coefs
+
+
+class BatchedLagrange(Lagrange):
+    """Lagrange interpolation of many objects sampled on the same time grid.
+
+    The window lookup and interpolation coefficients depend only on the time grid, so they are
+    computed once per query time and applied to all objects in a single tensor contraction.
+    See `Lagrange` for the parameters, except that `states` is a (K, D, n) array of K objects.
+    Interpolating with order 8 on a uniform grid is equivalent to `Legendre8`.
+
+    Parameters
+    ----------
+    chunk_size
+        Maximum number of query times contracted at once, the gathered windows need
+        `K * D * chunk_size * (order + 1)` values of memory.
+    """
+
+    def __init__(
+        self,
+        states: npt.NDArray,
+        t: npt.NDArray,
+        order: int = 8,
+        max_step: Optional[float] = None,
+        weights: Optional[npt.NDArray] = None,
+        chunk_size: int = 1024,
+    ) -> None:
+        if states.ndim != 3:
+            raise ValueError(
+                f"BatchedLagrange states must be a (K, D, n) array, got shape {states.shape}"
+            )
+        super().__init__(states, t, order=order, max_step=max_step, weights=weights)
+        self.chunk_size = chunk_size
+
+    def _saved_params(self) -> dict[str, Any]:
+        return {
+            "order": self.order,
+            "max_step": float(self.max_step),
+            "chunk_size": self.chunk_size,
+        }
+
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        """Interpolate all objects, returns a (K, D, P) array."""
+        window, coefs = self.get_coefficients(t, derivative=derivative)
+        P = window.shape[0]
+        K, D, _ = self.states.shape
+
+        intep_states = np.empty((K, D, P), dtype=np.result_type(self.states.dtype, np.float64))
+        for start in range(0, P, self.chunk_size):
+            six = slice(start, min(start + self.chunk_size, P))
+            intep_states[:, :, six] = np.einsum(
+                "pk,odpk->odp", coefs[six], self.states[:, :, window[six]]
+            )
+        return intep_states
+
+
+class StreamingLagrange(Interpolator):
+    """Append-only Lagrange interpolator backed by a fixed-capacity ring buffer.
+
+    New samples are added with `append` in time proportional to the batch size and the oldest
+    samples are evicted once `capacity` is reached. The buffer is stored twice in a row
+    (a "mirrored" ring buffer) so that the current samples are always available as a contiguous
+    view through `states` and `t`, and queries never copy or reallocate the buffer.
+
+    Parameters
+    ----------
+    capacity
+        Maximum number of samples kept.
+    order
+        Polynomial degree, each query uses `order + 1` samples around it.
+    max_extrapolation
+        Queries up to this long after the latest sample are extrapolated with the polynomial
+        of the last window, e.g. to predict slightly ahead of real-time data.
+    dims
+        Number of state dimensions.
+    """
+
+    def __init__(
+        self, capacity: int, order: int = 3, max_extrapolation: float = 0.0, dims: int = 6
+    ) -> None:
+        if capacity < order + 1:
+            raise ValueError(f"Capacity {capacity} too small for {order}-degree interpolation")
+        self.capacity = capacity
+        self.order = order
+        self.points = order + 1
+        self.max_extrapolation = max_extrapolation
+        self._states = np.empty((dims, 2 * capacity), dtype=np.float64)
+        self._t = np.empty((2 * capacity,), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _saved_params(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "order": self.order,
+            "max_extrapolation": float(self.max_extrapolation),
+            "dims": self._states.shape[0],
+        }
+
+    @classmethod
+    def _from_saved(
+        cls: type[InterpolatorType], arrays: dict[str, npt.NDArray], params: dict[str, Any]
+    ) -> InterpolatorType:
+        """The ring buffer is mutable and always copied into memory when loaded."""
+        stream = cls(**params)
+        stream.append(arrays["states"], arrays["t"])  # type: ignore[attr-defined]
+        return stream
+
+    @property
+    def states(self) -> npt.NDArray:  # type: ignore[override]
+        """(dims, size) view of the buffered states in time order."""
+        return self._states[:, self._start:self._start + self._size]
+
+    @property
+    def t(self) -> npt.NDArray:  # type: ignore[override]
+        """(size,) view of the buffered times in time order."""
+        return self._t[self._start:self._start + self._size]
+
+    def append(self, states: npt.NDArray, t: npt.NDArray) -> None:
+        """Append a batch of (dims, b) states at (b,) strictly increasing times after the
+        latest buffered time. If the batch is larger than the capacity only its tail is kept.
+        """
+        t = np.atleast_1d(t)
+        states = states.reshape(self._states.shape[0], t.size)
+        if t.size == 0:
+            return
+        if np.any(np.diff(t) <= 0) or (
+            self._size > 0 and t[0] <= self._t[self._start + self._size - 1]
+        ):
+            raise ValueError(
+                "Appended times must be strictly increasing and after the latest sample"
+            )
+        if t.size > self.capacity:
+            states, t = states[:, -self.capacity:], t[-self.capacity:]
+
+        batch = t.size
+        end = (self._start + self._size) % self.capacity
+        # write every sample to both halves of the mirrored buffer, wrapping around once
+        first = min(batch, self.capacity - end)
+        for offset in (0, self.capacity):
+            self._t[offset + end:offset + end + first] = t[:first]
+            self._states[:, offset + end:offset + end + first] = states[:, :first]
+            self._t[offset:offset + batch - first] = t[first:]
+            self._states[:, offset:offset + batch - first] = states[:, first:]
+
+        evicted = max(0, self._size + batch - self.capacity)
+        self._start = (self._start + evicted) % self.capacity
+        self._size = min(self._size + batch, self.capacity)
+
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        _check_derivative(derivative)
+        in_t = np.atleast_1d(t).flatten()
+        t_buf = self.t
+        if self._size < self.points:
+            raise ValueError(
+                f"Cannot performance {self.order}-degree interpolation with {self._size} points"
+            )
+        t_max = t_buf[-1] + self.max_extrapolation
+        if np.any(in_t < t_buf[0]) or np.any(in_t > t_max):
+            raise ValueError(f"Query times outside of buffered range [{t_buf[0]}, {t_max}]")
+
+        inds = np.clip(np.searchsorted(t_buf, in_t, side="right") - 1, 0, self._size - 2)
+        start = np.clip(inds - (self.points // 2 - 1), 0, self._size - self.points)
+        window = start[:, np.newaxis] + np.arange(self.points)[np.newaxis, :]
+        nodes = t_buf[window]
+
+        weights = np.ones_like(nodes)
+        for j in range(self.points):
+            for m in range(self.points):
+                if m != j:
+                    weights[:, j] *= nodes[:, j] - nodes[:, m]
+
+        if derivative == 0:
+            coefs = barycentric_coefficients(in_t, nodes, 1.0 / weights)
+        else:
+            coefs = lagrange_basis_derivatives(in_t, nodes, 1.0 / weights, derivative)[-1]
+        return np.einsum("pk,ipk->ip", coefs, self.states[:, window])
+
+
+class Chebyshev(Interpolator):
+    """Piecewise Chebyshev polynomial representation of states, similar to SPK type 3 segments.
+
+    The time span is divided into uniform segments and every state component of every segment is
+    represented by `degree + 1` Chebyshev coefficients. Queries locate their segment by index
+    arithmetic and are evaluated with the vectorized Clenshaw recurrence, see
+    `chebyshev_clenshaw`. Instances are usually created with `Chebyshev.fit` which compresses
+    another `Interpolator` to a given tolerance.
+
+    Parameters
+    ----------
+    coefficients
+        (S, D, K) array of K Chebyshev coefficients for the D state components of S segments.
+    t_start
+        Start time of the first segment.
+    intlen
+        Length of each segment.
+
+    Attributes
+    ----------
+    max_error
+        (D,) maximum absolute error found when fitting, NaN if not created by `fit`.
+    compression_ratio
+        Number of values in the source table divided by the number of stored coefficients,
+        NaN if not created by `fit`.
+    """
+
+    def __init__(self, coefficients: npt.NDArray, t_start: float, intlen: float) -> None:
+        self.coefficients = coefficients
+        self.t_start = t_start
+        self.intlen = intlen
+        segments, dims, _ = coefficients.shape
+        self.segments = segments
+        self.max_error = np.full((dims,), np.nan)
+        self.compression_ratio = np.nan
+
+        t = t_start + intlen * np.arange(segments + 1)
+        super().__init__(np.empty((dims, 0)), t)
+
+    @property
+    def degree(self) -> int:
+        return self.coefficients.shape[2] - 1
+
+    def _saved_arrays(self) -> dict[str, npt.NDArray]:
+        return {"coefficients": self.coefficients, "max_error": self.max_error}
+
+    def _saved_params(self) -> dict[str, Any]:
+        return {
+            "t_start": float(self.t_start),
+            "intlen": float(self.intlen),
+            "compression_ratio": float(self.compression_ratio),
+        }
+
+    @classmethod
+    def _from_saved(
+        cls: type[InterpolatorType], arrays: dict[str, npt.NDArray], params: dict[str, Any]
+    ) -> InterpolatorType:
+        cheb = cls(  # type: ignore[call-arg]
+            arrays["coefficients"], params["t_start"], params["intlen"]
+        )
+        cheb.max_error = np.array(arrays["max_error"])  # type: ignore[attr-defined]
+        cheb.compression_ratio = params["compression_ratio"]  # type: ignore[attr-defined]
+        return cheb
+
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        _check_derivative(derivative)
+        in_t = np.atleast_1d(t).flatten()
+        if np.any(in_t < self.t[0]) or np.any(in_t > self.t[-1]):
+            raise ValueError(
+                f"Query times outside of interpolation range [{self.t[0]}, {self.t[-1]}]"
+            )
+
+        inds = np.clip(
+            np.floor((in_t - self.t_start) / self.intlen).astype(np.int64), 0, self.segments - 1
+        )
+        s = 2.0 * (in_t - self.t_start - inds * self.intlen) / self.intlen - 1.0
+        coefficients = self.coefficients[inds, ...]
+        if derivative > 0:
+            coefficients = np.polynomial.chebyshev.chebder(
+                coefficients, m=derivative, scl=2.0 / self.intlen, axis=2
+            )
+        return chebyshev_clenshaw(coefficients, s).T
+
+    @classmethod
+    def fit(
+        cls,
+        source: Interpolator,
+        tolerance: float | npt.NDArray,
+        degree: int = 12,
+        check_points: int = 4,
+    ) -> "Chebyshev":
+        """Compress an `Interpolator` into piecewise Chebyshev coefficients.
+
+        Starting from a single segment, the number of segments is doubled until the maximum
+        error against `source` is below `tolerance` for every component. Each segment is
+        fitted by sampling `source` at the `degree + 1` Chebyshev nodes of the first kind
+        and the error is evaluated at `check_points * (degree + 1)` uniformly spaced points
+        per segment.
+
+        Parameters
+        ----------
+        source
+            Interpolator to compress, the full time span `source.t` is covered.
+        tolerance
+            Maximum absolute error, either a scalar or one value per state component,
+            e.g. different tolerances for positions and velocities.
+        degree
+            Degree of the Chebyshev polynomials.
+        check_points
+            Number of error check points per polynomial coefficient.
+
+        Returns
+        -------
+            Compressed interpolator with `max_error` and `compression_ratio` set.
+
+        """
+        t0, t1 = float(np.min(source.t)), float(np.max(source.t))
+        table_size = source.t.size * source.states.shape[0]
+        n = degree + 1
+
+        k = np.arange(n)
+        nodes = np.cos(np.pi * (k + 0.5) / n)  # {n}
+        # {j, k}
+        transform = 2.0 / n * np.cos(np.pi * k[:, np.newaxis] * (k[np.newaxis, :] + 0.5) / n)
+        transform[0, :] *= 0.5
+        s_check = np.linspace(-1, 1, check_points * n)
+
+        segments = 1
+        while True:
+            intlen = (t1 - t0) / segments
+            starts = t0 + intlen * np.arange(segments)
+            t_nodes = (starts[:, np.newaxis] + 0.5 * intlen * (nodes[np.newaxis, :] + 1)).flatten()
+            values = source.get_state(t_nodes)  # {D, S*n}
+            dims = values.shape[0]
+            values = values.reshape(dims, segments, n)
+            coefficients = np.einsum("jk,dsk->sdj", transform, values)
+
+            cheb = cls(coefficients, t0, intlen)
+            t_check = (
+                starts[:, np.newaxis] + 0.5 * intlen * (s_check[np.newaxis, :] + 1)
+            ).flatten()
+            t_check = np.clip(t_check, t0, t1)
+            err = np.max(np.abs(cheb.get_state(t_check) - source.get_state(t_check)), axis=1)
+            if np.all(err <= tolerance):
+                break
+            if coefficients.size * 2 > table_size:
+                raise ValueError(
+                    f"Could not reach tolerance {tolerance} without exceeding the source table "
+                    f"size, maximum error {err} with {segments} segments"
+                )
+            segments *= 2
+
+        cheb.max_error = err
+        cheb.compression_ratio = table_size / coefficients.size
+        return cheb
+
+
+def barycentric_weights(t: npt.NDArray, points: int) -> npt.NDArray:
+    """Compute the barycentric Lagrange weights of all windows of `points` consecutive samples.
+
+    Parameters
+    ----------
+    t
+        (n,) vector of sample times.
+    points
+        Number of samples in each window.
+
+    Returns
+    -------
+        (n - points + 1, points) array where row `s` contains the weights
+        $w_j = 1 / \\prod_{m \\neq j} (t_{s + j} - t_{s + m})$ of the window starting at sample `s`.
+    """
+    windows = t.size - points + 1
+    weights = np.ones((windows, points), dtype=np.float64)
+    for j in range(points):
+        for m in range(points):
+            if m != j:
+                weights[:, j] *= t[j:j + windows] - t[m:m + windows]
+    return 1.0 / weights
+
+
+def barycentric_coefficients(
+    t: npt.NDArray, nodes: npt.NDArray, weights: npt.NDArray
+) -> npt.NDArray:
+    """Compute the Lagrange interpolation coefficients of query times from barycentric weights.
+
+    Parameters
+    ----------
+    t
+        (P,) vector of query times.
+    nodes
+        (P, k) array of the window node times for each query time.
+    weights
+        (P, k) array of the barycentric weights of each window, see `barycentric_weights`.
+
+    Returns
+    -------
+        (P, k) array of coefficients to multiply the window samples with. Query times that
+        coincide with a node get a unit coefficient on that node.
+    """
+    dt = t[:, np.newaxis] - nodes
+    exact = dt == 0
+    err_save = np.seterr(divide="ignore", invalid="ignore")
+    coefs = weights / dt
+    np.seterr(**err_save)
+
+    hits = np.any(exact, axis=1)
+    coefs[hits, :] = exact[hits, :]
+    coefs /= np.sum(coefs, axis=1)[:, np.newaxis]
+    return coefs
+
+
+def lagrange_basis_derivatives(
+    t: npt.NDArray, nodes: npt.NDArray, weights: npt.NDArray, derivative: int
+) -> npt.NDArray:
+    """Compute the Lagrange basis polynomials and their time derivatives up to a given order.
+
+    Parameters
+    ----------
+    t
+        (P,) vector of query times.
+    nodes
+        (P, k) array of the window node times for each query time.
+    weights
+        (P, k) array of the barycentric weights of each window, see `barycentric_weights`.
+    derivative
+        Highest derivative order to compute.
+
+    Returns
+    -------
+        (derivative + 1, P, k) array where entry `i` contains the i-th time derivatives of the
+        k basis polynomials, the interpolated i-th derivative of query `p` is
+        `sum(basis[i, p, :] * data[..., window[p, :]])`.
+
+    Notes
+    -----
+    Derivatives of the node polynomial
+        The basis polynomials are $L_j(t) = w_j \\prod_{m \\neq j} (t - t_m)$ and the i-th
+        derivative of a product of $k - 1$ linear factors is $i!$ times their elementary
+        symmetric polynomial of degree $k - 1 - i$. These are computed for all queries and
+        basis polynomials at once with the recurrence $e_i \\leftarrow e_i + x e_{i-1}$ over
+        the factors $x = t - t_m$, where the excluded factor $m = j$ is set to zero.
+    """
+    P, k = nodes.shape
+    dt = t[:, np.newaxis] - nodes  # {P, k}
+
+    # elementary symmetric polynomials e_i of {t - t_m : m != j}, {i, P, j}
+    esym = np.zeros((k, P, k), dtype=np.float64)
+    esym[0] = 1.0
+    for m in range(k):
+        factor = np.broadcast_to(dt[:, m, np.newaxis], (P, k)).copy()
+        factor[:, m] = 0
+        esym[1:] = esym[1:] + factor * esym[:-1]
+
+    basis = np.zeros((derivative + 1, P, k), dtype=np.float64)
+    for i in range(min(derivative, k - 1) + 1):
+        basis[i] = factorial(i) * weights * esym[k - 1 - i]
+    return basis
+
+
+def chebyshev_clenshaw(coefficients: npt.NDArray, s: npt.NDArray) -> npt.NDArray:
+    """Evaluate Chebyshev series using the Clenshaw recurrence.
+
+    Parameters
+    ----------
+    coefficients
+        (P, C, K) array of K Chebyshev coefficients for C components at P evaluation points.
+    s
+        (P,) vector of normalized evaluation points in [-1, 1].
+
+    Returns
+    -------
+        (P, C) array of values.
+
+    Notes
+    -----
+    The recurrence $b_k = c_k + 2 s b_{k+1} - b_{k+2}$ is vectorized over all evaluation points
+    and components, the only loop is over the (typically small) number of coefficients.
+    """
+    s = s[:, None]
+    s2 = 2.0 * s
+
+    b1 = np.zeros(coefficients.shape[:2], dtype=np.float64)
+    b2 = np.zeros_like(b1)
+    for k in range(coefficients.shape[2] - 1, 0, -1):
+        b1, b2 = coefficients[:, :, k] + s2 * b1 - b2, b1
+
+    return coefficients[:, :, 0] + s * b1 - b2
+
+
+def chebyshev_clenshaw_and_differentiate(
+    coefficients: npt.NDArray, s: npt.NDArray
+) -> tuple[npt.NDArray, npt.NDArray]:
+    """Evaluate Chebyshev series and their derivatives with respect to `s` using the Clenshaw
+    recurrence, see `chebyshev_clenshaw`.
+
+    The derivative recurrence $b'_k = 2 b_{k+1} + 2 s b'_{k+1} - b'_{k+2}$ is computed in the
+    same pass as the values.
+
+    Returns
+    -------
+        (P, C) array of values and (P, C) array of derivatives.
+    """
+    s = s[:, None]
+    s2 = 2.0 * s
+
+    b1 = np.zeros(coefficients.shape[:2], dtype=np.float64)
+    b2 = np.zeros_like(b1)
+    db1 = np.zeros_like(b1)
+    db2 = np.zeros_like(b1)
+    for k in range(coefficients.shape[2] - 1, 0, -1):
+        db1, db2 = 2.0 * b1 + s2 * db1 - db2, db1
+        b1, b2 = coefficients[:, :, k] + s2 * b1 - b2, b1
+
+    return coefficients[:, :, 0] + s * b1 - b2, b1 + s * db1 - db2
+
+
+def hermite_basis(
+    t: npt.NDArray, nodes: npt.NDArray, derivative: int = 0
+) -> tuple[npt.NDArray, npt.NDArray]:
+    """Compute Lagrange-Hermite basis functions and their derivatives.
+
+    Parameters
+    ----------
+    t
+        (P,) vector of query times.
+    nodes
+        (P, k) array of the window node times for each query time.
+    derivative
+        Time derivative order of the returned basis functions.
+
+    Returns
+    -------
+        (2, P, k) array of the `derivative`-th time derivatives of the value and derivative
+        basis functions evaluated at `t` and the (2, P, k) array of the next time derivatives.
+
+    Notes
+    -----
+    With $a_j = 1 - 2 c_j (t - t_j)$, $c_j = \\sum_{m \\neq j} 1 / (t_j - t_m)$ the basis functions
+    are $a_j L_j^2$ and $(t - t_j) L_j^2$, their derivatives follow from the Leibniz rule since
+    $a_j$ and $t - t_j$ are linear and the derivatives of $L_j$ are given by
+    `lagrange_basis_derivatives`.
+    """
+    P, k = nodes.shape
+    dt = t[:, np.newaxis] - nodes  # {P, k}
+
+    node_diff = nodes[:, :, np.newaxis] - nodes[:, np.newaxis, :]  # {P, j, m}
+    node_diff[:, np.arange(k), np.arange(k)] = np.inf
+    c = np.sum(1.0 / node_diff, axis=2)
+    node_diff[:, np.arange(k), np.arange(k)] = 1.0
+    weights = 1.0 / np.prod(node_diff, axis=2)
+
+    L = lagrange_basis_derivatives(t, nodes, weights, derivative + 1)
+    # derivatives of L^2 by the Leibniz rule
+    L2 = np.stack(
+        [sum(comb(n, i) * L[i] * L[n - i] for i in range(n + 1)) for n in range(derivative + 2)]
+    )
+    a = 1.0 - 2.0 * c * dt
+
+    bases = []
+    for n in (derivative, derivative + 1):
+        prev = L2[n - 1] if n > 0 else np.zeros_like(dt)
+        bases.append(np.stack([a * L2[n] - 2.0 * n * c * prev, dt * L2[n] + n * prev], axis=0))
+    return bases[0], bases[1]
+
+
+LEGENDRE8_DENOMINATORS = np.array(
+    [40320.0, -5040.0, 1440.0, -720.0, 576.0, -720.0, 1440.0, -5040.0, 40320.0]
+)
+"""Denominators of the order-8 Lagrange basis polynomials on the nodes 0, ..., 8,
+i.e. -1^n*n!*(8-n)! for n in [0, ..., 8] (https://oeis.org/A098361)
+"""
+
+LEGENDRE8_GATHER_RATIO = 32
+"""Below this number of query times per spanned node interval `legendre8` uses the gather
+based implementation `legendre8_gather` instead of looping over intervals.
+"""
+
+
 def legendre8(
+    table: npt.NDArray,
+    t1: int | float,
+    tN: int | float,
+    t: npt.NDArray,
+    ti: Optional[npt.NDArray] = None,
+    method: str = "auto",
+    derivative: int = 0,
+) -> npt.NDArray:
+    """Order-8 Legendre polynomial interpolation
+
+    Dispatches between the two vectorization strategies `legendre8_intervals` and
+    `legendre8_gather`. With `method="auto"` the interval loop is used when there are many query
+    times per spanned node interval, otherwise the loop-free gather implementation is used.
+    Time derivatives of the interpolating polynomial are only implemented by the gather strategy.
+
+    Parameters
+    ----------
+    table
+        M vectors (M >= 9) to interpolate between, each containing N
+        values, e.g. for a position vector N=3 (x, y, z) table.shape = (M, N)
+    t1
+        time corresponding to M=0
+    tN
+        time corresponding to M=N-1
+    t
+        times at which to provide N-dimensional answer.
+    ti
+        indices which sort t in monotonic order, only used by the interval loop
+    method
+        One of `"auto"`, `"intervals"` or `"gather"`.
+    derivative
+        Order of the time derivative to evaluate.
+
+    """
+    _check_derivative(derivative)
+    t = np.atleast_1d(t)
+    if method == "auto" and derivative > 0:
+        method = "gather"
+    elif method == "auto":
+        M = table.shape[0]
+        if len(t) == 0:
+            method = "gather"
+        else:
+            span = (np.max(t) - np.min(t)) / (tN - t1) * (M - 1)
+            intervals = min(M - 8, int(np.ceil(span)) + 1)
+            method = "intervals" if len(t) >= LEGENDRE8_GATHER_RATIO * intervals else "gather"
+
+    if method == "intervals":
+        if derivative > 0:
+            raise ValueError('The "intervals" legendre8 method does not support derivatives')
+        return legendre8_intervals(table, t1, tN, t, ti=ti)
+    elif method == "gather":
+        return legendre8_gather(table, t1, tN, t, derivative=derivative)
+    else:
+        raise ValueError(f'Unknown legendre8 method "{method}"')
+
+
+def legendre8_weights(
+    trel: npt.NDArray, M: int, derivative: int = 0
+) -> tuple[npt.NDArray, npt.NDArray]:
+    """Compute the 9-point window start indices and Lagrange weights for relative times.
+
+    Parameters
+    ----------
+    trel
+        (P,) vector of times in units of table steps relative to the first table entry.
+    M
+        Number of table entries.
+    derivative
+        Order of the derivative with respect to `trel`, see `lagrange_basis_derivatives`.
+
+    Returns
+    -------
+        (P,) vector of window start indices and (P, 9) array of weights. Times that
+        coincide with a table entry get a unit weight on that entry.
+    """
+    tind = np.clip(np.round(trel - 4), 0, M - 9).astype(np.int64)
+    if derivative > 0:
+        P = trel.size
+        nodes = np.broadcast_to(np.arange(9, dtype=np.float64), (P, 9))
+        weights = np.broadcast_to(1.0 / LEGENDRE8_DENOMINATORS, (P, 9))
+        return tind, lagrange_basis_derivatives(trel - tind, nodes, weights, derivative)[-1]
+
+    xx = (trel - tind)[:, np.newaxis] - np.arange(9)[np.newaxis, :]  # {P, 9}
+    num = np.prod(xx, axis=1)  # {P}
+
+    err_save = np.seterr(invalid="ignore", divide="ignore")
+    weights = num[:, np.newaxis] / LEGENDRE8_DENOMINATORS[np.newaxis, :] / xx
+    np.seterr(**err_save)
+
+    zz = np.where(num == 0)[0]
+    if len(zz):
+        weights[zz, :] = 0
+        weights[zz, np.argmin(np.abs(xx[zz, :]), axis=1)] = 1
+    return tind, weights
+
+
+def legendre8_gather(
+    table: npt.NDArray,
+    t1: int | float,
+    tN: int | float,
+    t: npt.NDArray,
+    chunk_size: int = 2**16,
+    derivative: int = 0,
+) -> npt.NDArray:
+    """Order-8 Legendre polynomial interpolation
+
+    This version does not require t to be sorted and has no loop over node intervals.
+    The window indices and weights of all query times are computed at once, see
+    `legendre8_weights`, and contracted with the gathered (P, 9, N) table windows in a single
+    einsum. Queries are processed in chunks of `chunk_size` to bound the memory use.
+    This is efficient when query times are spread out over many intervals.
+
+    Parameters
+    ----------
+    table
+        M vectors (M >= 9) to interpolate between, each containing N
+        values, e.g. for a position vector N=3 (x, y, z) table.shape = (M, N)
+    t1
+        time corresponding to M=0
+    tN
+        time corresponding to M=N-1
+    t
+        times at which to provide N-dimensional answer.
+    chunk_size
+        Maximum number of query times to process at once.
+    derivative
+        Order of the time derivative to evaluate.
+
+    """
+    M, N = table.shape
+    t = np.atleast_1d(t)
+    P = len(t)
+    scale = ((M - 1) / (tN - t1)) ** derivative
+
+    rval = np.empty((P, N), dtype=np.result_type(table.dtype, np.float64))
+    window = np.arange(9)
+    for start in range(0, P, chunk_size):
+        six = slice(start, min(start + chunk_size, P))
+        trel = (t[six] - t1) / (tN - t1) * (M - 1)
+        tind, weights = legendre8_weights(trel, M, derivative=derivative)
+        rval[six] = np.einsum(
+            "pk,pkn->pn", weights, table[tind[:, np.newaxis] + window[np.newaxis, :]]
+        )
+    if derivative > 0:
+        rval *= scale
+    return rval
+
+
+def legendre8_intervals(
     table: npt.NDArray, t1: int | float, tN: int | float, t: npt.NDArray, ti: Optional[npt.NDArray] = None
 ) -> npt.NDArray:
     """Order-8 Legendre polynomial interpolation
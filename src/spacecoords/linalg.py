@@ -2,6 +2,8 @@
 
 """Useful utility functions related to linear algebra"""
 
+from typing import Optional
+
 import numpy as np
 import numpy.typing as npt
 from .types import (
@@ -12,9 +14,11 @@ from .types import (
     NDArray_3x3,
     NDArray_3x3xN,
     NDArray_2x2,
-    NDArray_NxN,
 )
 
+VEC_TO_VEC_ANTIPARALLEL_TOL = 1e-12
+"""Vectors with $1 + \\cos\\theta$ below this are treated as antiparallel in `vec_to_vec`."""
+
 
 def vector_angle(
     a: NDArray_3 | NDArray_3xN, b: NDArray_3 | NDArray_3xN, degrees: bool = False
@@ -77,8 +81,90 @@ def vector_angle(
     return theta
 
 
+PAIRWISE_CHUNK_ELEMENTS = 2**22
+"""Default number of pair elements evaluated per chunk in `pairwise_vector_angle`."""
+
+
+def pairwise_vector_angle(
+    a: NDArray_3 | NDArray_3xN,
+    b: NDArray_3 | NDArray_3xN,
+    degrees: bool = False,
+    max_angle: Optional[float] = None,
+    chunk_size: int = PAIRWISE_CHUNK_ELEMENTS,
+) -> npt.NDArray | tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """Angles between every vector in `a` and every vector in `b`.
+
+    The vectors are normalized once and the cosines of the angles are computed with matrix
+    products over chunks of the columns of `b`, so that at most `chunk_size` pairs are held in
+    memory at once besides the output. With `max_angle` only the pairs within that angle are
+    returned, e.g. to screen a large catalog of directions against a set of beams.
+
+    Parameters
+    ----------
+    a
+        (3, N) or (3,) vector of Cartesian coordinates.
+    b
+        (3, M) or (3,) vector of Cartesian coordinates.
+    degrees
+        If `True`, use degrees. Else all angles are given in radians.
+    max_angle
+        If given, return only the pairs separated by at most this angle.
+    chunk_size
+        Maximum number of pairs evaluated at once.
+
+    Returns
+    -------
+        (N, M) matrix of angles, or if `max_angle` is given, the (K,) indices into `a`,
+        the (K,) indices into `b` and the (K,) angles of the K pairs within `max_angle`,
+        sorted by the index into `b`. The thresholded angles are computed from the cross and
+        dot products, which is accurate also for small separations, and the threshold is
+        applied to these angles.
+
+    """
+    a_unit = a.reshape(3, -1) / np.linalg.norm(a.reshape(3, -1), axis=0)
+    b_unit = b.reshape(3, -1) / np.linalg.norm(b.reshape(3, -1), axis=0)
+    N, M = a_unit.shape[1], b_unit.shape[1]
+    step = max(1, chunk_size // max(N, 1))
+    a_rows = np.ascontiguousarray(a_unit.T)
+
+    if max_angle is None:
+        angles = np.empty((N, M), dtype=np.float64)
+        for start in range(0, M, step):
+            six = slice(start, min(start + step, M))
+            proj = a_rows @ b_unit[:, six]
+            np.clip(proj, -1.0, 1.0, out=proj)
+            np.arccos(proj, out=angles[:, six])
+        return np.degrees(angles) if degrees else angles
+
+    max_rad = np.radians(max_angle) if degrees else max_angle
+    # loose candidate test only, the cosine can not resolve angles below ~1e-8 rad
+    min_cos = np.cos(max_rad) - 16 * np.finfo(np.float64).eps
+    a_inds, b_inds = [], []
+    for start in range(0, M, step):
+        six = slice(start, min(start + step, M))
+        # transposed so that the hits come out ordered by the index into b
+        hit_b, hit_a = np.nonzero((a_rows @ b_unit[:, six]).T >= min_cos)
+        a_inds.append(hit_a)
+        b_inds.append(hit_b + start)
+    a_ind = np.concatenate(a_inds) if a_inds else np.empty((0,), dtype=np.int64)
+    b_ind = np.concatenate(b_inds) if b_inds else np.empty((0,), dtype=np.int64)
+
+    va, vb = a_unit[:, a_ind], b_unit[:, b_ind]
+    hit_angles = np.arctan2(
+        np.linalg.norm(np.cross(va, vb, axis=0), axis=0), np.sum(va * vb, axis=0)
+    )
+    keep = hit_angles <= max_rad
+    a_ind, b_ind, hit_angles = a_ind[keep], b_ind[keep], hit_angles[keep]
+    if degrees:
+        hit_angles = np.degrees(hit_angles)
+    return a_ind, b_ind, hit_angles
+
+
 def rot_mat_x(
-    theta: NDArray_N | float, dtype: npt.DTypeLike = np.float64, degrees: bool = False
+    theta: NDArray_N | float,
+    dtype: npt.DTypeLike = np.float64,
+    degrees: bool = False,
+    layout: str = "3x3xN",
 ) -> NDArray_3x3xN | NDArray_3x3:
     """Compute matrix for rotation of R3 vector through angle theta
     around the X-axis. For frame rotation, use the transpose.
@@ -91,32 +177,33 @@ def rot_mat_x(
         Numpy datatype of the rotation matrix.
     degrees
         If `True`, use degrees. Else all angles are given in radians.
+    layout
+        Layout of the tensor for vector input, either `"3x3xN"` or `"Nx3x3"`, the latter is
+        a contiguous stack of matrices that can be used directly with `np.matmul`.
 
     Returns
     -------
-        (3, 3) Rotation matrix, or (3, 3, n) tensor if theta is vector input.
+        (3, 3) Rotation matrix, or (3, 3, n) or (n, 3, 3) tensor if theta is vector input.
 
     """
     if degrees:
         theta = np.radians(theta)
-    size: tuple[int, ...]
-    if isinstance(theta, np.ndarray) and theta.ndim > 0:
-        size = (3, 3, len(theta))
-    else:
-        size = (3, 3)
 
     ca, sa = np.cos(theta), np.sin(theta)
-    rot = np.zeros(size, dtype=dtype)
+    rot_out, rot = _rot_mat_alloc(theta, dtype, layout)
     rot[0, 0, ...] = 1
     rot[1, 1, ...] = ca
     rot[1, 2, ...] = -sa
     rot[2, 1, ...] = sa
     rot[2, 2, ...] = ca
-    return rot
+    return rot_out
 
 
 def rot_mat_y(
-    theta: NDArray_N | float, dtype: npt.DTypeLike = np.float64, degrees: bool = False
+    theta: NDArray_N | float,
+    dtype: npt.DTypeLike = np.float64,
+    degrees: bool = False,
+    layout: str = "3x3xN",
 ) -> NDArray_3x3xN | NDArray_3x3:
     """Compute matrix for rotation of R3 vector through angle theta
     around the Y-axis. For frame rotation, use the transpose.
@@ -129,32 +216,33 @@ def rot_mat_y(
         Numpy datatype of the rotation matrix.
     degrees
         If `True`, use degrees. Else all angles are given in radians.
+    layout
+        Layout of the tensor for vector input, either `"3x3xN"` or `"Nx3x3"`, the latter is
+        a contiguous stack of matrices that can be used directly with `np.matmul`.
 
     Returns
     -------
-        (3, 3) Rotation matrix, or (3, 3, n) tensor if theta is vector input.
+        (3, 3) Rotation matrix, or (3, 3, n) or (n, 3, 3) tensor if theta is vector input.
 
     """
     if degrees:
         theta = np.radians(theta)
-    size: tuple[int, ...]
-    if isinstance(theta, np.ndarray) and theta.ndim > 0:
-        size = (3, 3, len(theta))
-    else:
-        size = (3, 3)
 
     ca, sa = np.cos(theta), np.sin(theta)
-    rot = np.zeros(size, dtype=dtype)
+    rot_out, rot = _rot_mat_alloc(theta, dtype, layout)
     rot[0, 0, ...] = ca
     rot[0, 2, ...] = sa
     rot[1, 1, ...] = 1
     rot[2, 0, ...] = -sa
     rot[2, 2, ...] = ca
-    return rot
+    return rot_out
 
 
 def rot_mat_z(
-    theta: NDArray_N | float, dtype: npt.DTypeLike = np.float64, degrees: bool = False
+    theta: NDArray_N | float,
+    dtype: npt.DTypeLike = np.float64,
+    degrees: bool = False,
+    layout: str = "3x3xN",
 ) -> NDArray_3x3xN | NDArray_3x3:
     """Compute matrix for rotation of R3 vector through angle theta
     around the Z-axis. For frame rotation, use the transpose.
@@ -167,28 +255,122 @@ def rot_mat_z(
         Numpy datatype of the rotation matrix.
     degrees
         If `True`, use degrees. Else all angles are given in radians.
+    layout
+        Layout of the tensor for vector input, either `"3x3xN"` or `"Nx3x3"`, the latter is
+        a contiguous stack of matrices that can be used directly with `np.matmul`.
 
     Returns
     -------
-        (3, 3) Rotation matrix, or (3, 3, n) tensor if theta is vector input.
+        (3, 3) Rotation matrix, or (3, 3, n) or (n, 3, 3) tensor if theta is vector input.
 
     """
     if degrees:
         theta = np.radians(theta)
-    size: tuple[int, ...]
-    if isinstance(theta, np.ndarray) and theta.ndim > 0:
-        size = (3, 3, len(theta))
-    else:
-        size = (3, 3)
 
     ca, sa = np.cos(theta), np.sin(theta)
-    rot = np.zeros(size, dtype=dtype)
+    rot_out, rot = _rot_mat_alloc(theta, dtype, layout)
     rot[0, 0, ...] = ca
     rot[0, 1, ...] = -sa
     rot[1, 0, ...] = sa
     rot[1, 1, ...] = ca
     rot[2, 2, ...] = 1
-    return rot
+    return rot_out
+
+
+def _rot_mat_alloc(
+    theta: NDArray_N | float, dtype: npt.DTypeLike, layout: str
+) -> tuple[npt.NDArray, npt.NDArray]:
+    """Allocate a zeroed rotation tensor in the given layout and a (3, 3, ...) view of it."""
+    if layout not in ("3x3xN", "Nx3x3"):
+        raise ValueError(f'Unknown rotation matrix layout "{layout}", expected "3x3xN" or "Nx3x3"')
+    if not (isinstance(theta, np.ndarray) and theta.ndim > 0):
+        rot = np.zeros((3, 3), dtype=dtype)
+        return rot, rot
+    elif layout == "3x3xN":
+        rot = np.zeros((3, 3, len(theta)), dtype=dtype)
+        return rot, rot
+    rot = np.zeros((len(theta), 3, 3), dtype=dtype)
+    return rot, np.moveaxis(rot, 0, -1)
+
+
+def _rotate_plane(
+    theta: NDArray_N | float,
+    vecs: NDArray_3 | NDArray_3xN,
+    out: Optional[NDArray_3 | NDArray_3xN],
+    degrees: bool,
+    i: int,
+    j: int,
+) -> NDArray_3 | NDArray_3xN:
+    """Rotate vectors by theta in the plane from axis `i` towards axis `j`."""
+    if degrees:
+        theta = np.radians(theta)
+    ca, sa = np.cos(theta), np.sin(theta)
+
+    rot_i = ca * vecs[i, ...] - sa * vecs[j, ...]
+    rot_j = sa * vecs[i, ...] + ca * vecs[j, ...]
+    if out is None:
+        shape = np.broadcast_shapes(vecs.shape, (3,) + np.shape(rot_i))
+        out = np.empty(shape, dtype=np.result_type(vecs.dtype, rot_i.dtype))
+    k = 3 - i - j
+    if out is not vecs:
+        out[k, ...] = vecs[k, ...]
+    out[i, ...] = rot_i
+    out[j, ...] = rot_j
+    return out
+
+
+def rotate_x(
+    theta: NDArray_N | float,
+    vecs: NDArray_3 | NDArray_3xN,
+    out: Optional[NDArray_3 | NDArray_3xN] = None,
+    degrees: bool = False,
+) -> NDArray_3 | NDArray_3xN:
+    """Rotate R3 vectors through angle theta around the X-axis, equivalent to
+    `rot_mat_x(theta) @ vecs` without constructing the rotation matrices.
+
+    Parameters
+    ----------
+    theta
+        Angle to rotate, a scalar or (N,) vector with one angle per vector.
+    vecs
+        (3,) or (3, N) vectors to rotate.
+    out
+        Optional (3, N) output array, may be `vecs` itself for an in-place rotation.
+    degrees
+        If `True`, use degrees. Else all angles are given in radians.
+
+    Returns
+    -------
+        (3,) or (3, N) rotated vectors.
+
+    """
+    return _rotate_plane(theta, vecs, out, degrees, 1, 2)
+
+
+def rotate_y(
+    theta: NDArray_N | float,
+    vecs: NDArray_3 | NDArray_3xN,
+    out: Optional[NDArray_3 | NDArray_3xN] = None,
+    degrees: bool = False,
+) -> NDArray_3 | NDArray_3xN:
+    """Rotate R3 vectors through angle theta around the Y-axis, equivalent to
+    `rot_mat_y(theta) @ vecs` without constructing the rotation matrices.
+    See `rotate_x` for the parameters.
+    """
+    return _rotate_plane(theta, vecs, out, degrees, 2, 0)
+
+
+def rotate_z(
+    theta: NDArray_N | float,
+    vecs: NDArray_3 | NDArray_3xN,
+    out: Optional[NDArray_3 | NDArray_3xN] = None,
+    degrees: bool = False,
+) -> NDArray_3 | NDArray_3xN:
+    """Rotate R3 vectors through angle theta around the Z-axis, equivalent to
+    `rot_mat_z(theta) @ vecs` without constructing the rotation matrices.
+    See `rotate_x` for the parameters.
+    """
+    return _rotate_plane(theta, vecs, out, degrees, 0, 1)
 
 
 def rot_mat_2d(
@@ -245,46 +427,126 @@ def scale_mat_2d(
     return M_scale
 
 
-def vec_to_vec(vec_in: NDArray_N, vec_out: NDArray_N) -> NDArray_NxN:
+def vec_to_vec(
+    vec_in: NDArray_3 | NDArray_3xN, vec_out: NDArray_3 | NDArray_3xN
+) -> NDArray_3x3 | npt.NDArray:
     """Get the rotation matrix that rotates `vec_in` to `vec_out` along the
-    plane containing both. Uses quaternion calculations.
+    plane containing both. Uses the closed form Rodrigues rotation formula.
+
+    Parameters
+    ----------
+    vec_in
+        (3,) or (3, N) vectors to rotate from, need not be normalized.
+    vec_out
+        (3,) or (3, N) vectors to rotate to, need not be normalized.
+
+    Returns
+    -------
+        (3, 3) rotation matrix, or (N, 3, 3) stack of rotation matrices if any input is (3, N).
+
+    Notes
+    -----
+    Rodrigues formula
+        With the normalized vectors $\\mathbf{a}$, $\\mathbf{b}$,
+        $c = \\mathbf{a} \\cdot \\mathbf{b}$ and the (unnormalized) axis
+        $\\mathbf{k} = \\mathbf{a} \\times \\mathbf{b}$ the rotation is
+        $$
+            R = c I + [\\mathbf{k}]_\\times + \\frac{\\mathbf{k} \\mathbf{k}^T}{1 + c},
+        $$
+        which is exact for parallel vectors. For antiparallel vectors the rotation is
+        by $\\pi$ around an arbitrary axis $\\mathbf{u}$ perpendicular to $\\mathbf{a}$,
+        i.e. $R = 2 \\mathbf{u} \\mathbf{u}^T - I$.
     """
-    N = len(vec_in)
-    if N != len(vec_out):
+    vec_in = np.asarray(vec_in, dtype=np.float64)
+    vec_out = np.asarray(vec_out, dtype=np.float64)
+    if vec_in.shape[0] != vec_out.shape[0]:
         raise ValueError("Input and output vectors must be same dimensionality.")
-    assert N == 3, "Only implemented for 3d vectors"
+    assert vec_in.shape[0] == 3, "Only implemented for 3d vectors"
+    single = vec_in.ndim == 1 and vec_out.ndim == 1
+
+    a, b, c, k, anti = _rodrigues_axis(vec_in, vec_out)
+    # {N, i, j}
+    R = np.einsum("in,jn->nij", k, k) / np.where(anti, 1.0, 1.0 + c)[:, None, None]
+    R += c[:, None, None] * np.eye(3)[None, :, :]
+    R[:, 0, 1] -= k[2]
+    R[:, 0, 2] += k[1]
+    R[:, 1, 0] += k[2]
+    R[:, 1, 2] -= k[0]
+    R[:, 2, 0] -= k[1]
+    R[:, 2, 1] += k[0]
+    if np.any(anti):
+        u = _perpendicular(a[:, anti])
+        R[anti] = 2 * np.einsum("in,jn->nij", u, u) - np.eye(3)[None, :, :]
+
+    return R[0] if single else R
+
+
+def apply_vec_to_vec(
+    vec_in: NDArray_3 | NDArray_3xN,
+    vec_out: NDArray_3 | NDArray_3xN,
+    vectors: NDArray_3 | NDArray_3xN,
+) -> NDArray_3 | NDArray_3xN:
+    """Apply the rotations of `vec_to_vec` directly to vectors without forming the matrices.
 
-    a = vec_in / np.linalg.norm(vec_in)
-    b = vec_out / np.linalg.norm(vec_out)
+    Parameters
+    ----------
+    vec_in
+        (3,) or (3, N) vectors to rotate from.
+    vec_out
+        (3,) or (3, N) vectors to rotate to.
+    vectors
+        (3,) or (3, N) vectors to rotate, e.g. antenna pattern directions rotated from
+        boresight to the target direction.
+
+    Returns
+    -------
+        (3,) or (3, N) rotated vectors, (3,) only if all inputs are (3,).
+    """
+    vec_in = np.asarray(vec_in, dtype=np.float64)
+    vec_out = np.asarray(vec_out, dtype=np.float64)
+    vectors = np.asarray(vectors, dtype=np.float64)
+    single = vec_in.ndim == 1 and vec_out.ndim == 1 and vectors.ndim == 1
+    a, b, c, k, anti = _rodrigues_axis(vec_in, vec_out)
+    v = vectors.reshape(3, -1)
 
-    adotb = np.dot(a, b)
-    axb = np.cross(a, b)
-    axb_norm = np.linalg.norm(axb)
+    kv = np.sum(k * v, axis=0)
+    rot = c * v + np.cross(k, v, axis=0) + k * kv / np.where(anti, 1.0, 1.0 + c)
+    if np.any(anti):
+        anti = np.broadcast_to(anti, rot.shape[1:])
+        u = _perpendicular(np.broadcast_to(a, rot.shape)[:, anti])
+        va = np.broadcast_to(v, rot.shape)[:, anti]
+        rot[:, anti] = 2 * u * np.sum(u * va, axis=0) - va
 
-    # rotation in the plane frame of `vec_in` and `vec_out`
-    G = np.zeros((N, N), dtype=vec_in.dtype)
-    G[0, 0] = adotb
-    G[0, 1] = -axb_norm
-    G[1, 0] = axb_norm
-    G[1, 1] = adotb
-    G[2, 2] = 1
+    return rot[:, 0] if single else rot
 
-    # inverse of change of basis from standard orthonormal to `vec_in` and `vec_out` plane
-    F = np.zeros((N, N), dtype=vec_in.dtype)
-    F[:, 0] = a
-    F[:, 1] = (b - adotb * a) / np.linalg.norm(b - adotb * a)
-    F[:, 2] = axb
 
-    # go to frame, rotation in plane, leave frame
-    R = F @ G @ np.linalg.inv(F)
+def _rodrigues_axis(
+    vec_in: npt.NDArray, vec_out: npt.NDArray
+) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray, npt.NDArray]:
+    """Normalized (3, N) inputs, cosines, unnormalized rotation axes and antiparallel mask."""
+    a = vec_in.reshape(3, -1) / np.linalg.norm(vec_in.reshape(3, -1), axis=0)
+    b = vec_out.reshape(3, -1) / np.linalg.norm(vec_out.reshape(3, -1), axis=0)
+    a, b = np.broadcast_arrays(a, b)
+    c = np.sum(a * b, axis=0)
+    k = np.cross(a, b, axis=0)
+    anti = 1.0 + c <= VEC_TO_VEC_ANTIPARALLEL_TOL
+    return a, b, c, k, anti
 
-    return R
+
+def _perpendicular(a: NDArray_3xN) -> NDArray_3xN:
+    """Unit vectors perpendicular to the (3, N) unit vectors `a`."""
+    # cross with the coordinate axis least aligned with each vector
+    axis = np.zeros_like(a)
+    axis[np.argmin(np.abs(a), axis=0), np.arange(a.shape[1])] = 1
+    u = np.cross(a, axis, axis=0)
+    return u / np.linalg.norm(u, axis=0)
 
 
 def triangulation_system(
-    directions: NDArray_3xN,
-    points: NDArray_3xN,
-) -> tuple[NDArray_Nx3, NDArray_N]:
+    directions: NDArray_3xN | npt.NDArray,
+    points: NDArray_3xN | npt.NDArray,
+    weights: Optional[NDArray_N | npt.NDArray] = None,
+) -> tuple[NDArray_3x3 | npt.NDArray, NDArray_3 | npt.NDArray]:
     """Calculate the linear system for finding the point closest to N lines.
 
     Denote a point on the line $i$ as $\\mathbf{a}_i$,
@@ -294,37 +556,506 @@ def triangulation_system(
     we start from the sum squared distance to all lines from this point
 
     $$
-        D = \\sum_{i}^N | \\mathbf{d}_i \\cross (\\mathbf{a}_i - \\mathbf{p}) |^2.
+        D = \\sum_{i}^N w_i | \\mathbf{d}_i \\cross (\\mathbf{a}_i - \\mathbf{p}) |^2.
     $$
 
     Solving $\\nabla D = \\mathbf{0}$ yilds an equation system of the form
     $ M \\mathbf{x} = \\mathbf{b} $.
 
     This function computes $M$ and $\\mathbf{b}$.
-    """
-    M = np.zeros((3, 3))
-    b = np.zeros((3,))
-    Im = np.eye(3)
 
-    for ind in range(directions.shape[1]):
-        d = directions[:, ind]
-        a = points[:, ind]
-        da = np.dot(d, a)
+    Parameters
+    ----------
+    directions
+        (3, N) normalized line directions, or (K, 3, N) for K independent systems.
+    points
+        (3, N) or (K, 3, N) points on the lines.
+    weights
+        (N,) or (K, N) line weights $w_i$, all lines have unit weight if not given.
 
-        M += np.outer(d, d) - Im
-        b += da * d - a
+    Returns
+    -------
+        (3, 3) or (K, 3, 3) system matrices $M$ and (3,) or (K, 3) vectors $\\mathbf{b}$.
+    """
+    if weights is None:
+        weights = np.ones(directions.shape[:-2] + directions.shape[-1:], dtype=np.float64)
+    da = np.sum(directions * points, axis=-2)
 
+    M = np.einsum("...in,...jn,...n->...ij", directions, directions, weights)
+    M -= np.eye(3) * np.sum(weights, axis=-1)[..., None, None]
+    b = np.einsum("...in,...n->...i", directions, weights * da) - np.einsum(
+        "...in,...n->...i", points, weights
+    )
     return M, b
 
 
+def solve_triangulation(
+    directions: NDArray_3xN | npt.NDArray,
+    points: NDArray_3xN | npt.NDArray,
+    weights: Optional[NDArray_N | npt.NDArray] = None,
+) -> tuple[NDArray_3 | NDArray_Nx3, float | NDArray_N]:
+    """Find the point closest to N lines in the weighted least squares sense,
+    see `triangulation_system`.
+
+    All K systems are built at once and solved with a single stacked `np.linalg.solve`,
+    e.g. to triangulate every time step of a track observed by a few stations.
+
+    Parameters
+    ----------
+    directions
+        (3, N) line directions, or (K, 3, N) for K independent targets. Directions are
+        normalized internally.
+    points
+        (3, N) or (K, 3, N) points on the lines, e.g. station positions.
+    weights
+        (N,) or (K, N) line weights, e.g. inverse angular variances times range squared.
+
+    Returns
+    -------
+        (3,) or (K, 3) closest points and the float or (K,) weighted root mean square
+        distances between each closest point and its lines.
+
+    """
+    directions = directions / np.linalg.norm(directions, axis=-2, keepdims=True)
+    if weights is None:
+        weights = np.ones(directions.shape[:-2] + directions.shape[-1:], dtype=np.float64)
+    M, b = triangulation_system(directions, points, weights)
+    target = np.linalg.solve(M, b[..., None])[..., 0]
+
+    dist2 = _line_distances(target, directions, points) ** 2
+    residuals = np.sqrt(np.sum(weights * dist2, axis=-1) / np.sum(weights, axis=-1))
+    if residuals.ndim == 0:
+        return target, float(residuals)
+    return target, residuals
+
+
+def _line_distances(
+    target: npt.NDArray, directions: npt.NDArray, points: npt.NDArray
+) -> npt.NDArray:
+    """Perpendicular distances (..., N) from (..., 3) targets to N lines with normalized
+    directions."""
+    diff = points - target[..., None]
+    perp = diff - np.sum(diff * directions, axis=-2, keepdims=True) * directions
+    return np.linalg.norm(perp, axis=-2)
+
+
+def _best_hypothesis_inliers(
+    directions: npt.NDArray, points: npt.NDArray, pairs: npt.NDArray, threshold: float
+) -> npt.NDArray:
+    """(K, N) inlier masks of the lowest cost line pair hypothesis of (K, 3, N) lines."""
+    # hypotheses {K, H, 3}, pseudo-inverse since a pair of parallel lines is singular
+    hyp_dirs = directions[..., None, :, :]
+    hyp_points = points[..., None, :, :]
+    M, b = triangulation_system(hyp_dirs, hyp_points, pairs)
+    hypotheses = np.einsum("...ij,...j->...i", np.linalg.pinv(M), b)
+
+    dist = _line_distances(hypotheses, hyp_dirs, hyp_points)  # {K, H, N}
+    cost = np.sum(np.minimum(dist, threshold) ** 2, axis=-1)
+    best = np.argmin(cost, axis=-1)
+    return np.take_along_axis(dist, best[..., None, None], axis=-2)[..., 0, :] < threshold
+
+
+def solve_triangulation_robust(
+    directions: NDArray_3xN | npt.NDArray,
+    points: NDArray_3xN | npt.NDArray,
+    threshold: float,
+    weights: Optional[NDArray_N | npt.NDArray] = None,
+    chunk_size: int = PAIRWISE_CHUNK_ELEMENTS,
+) -> tuple[NDArray_3 | NDArray_Nx3, npt.NDArray, float | NDArray_N]:
+    """Find the point closest to N lines while rejecting outlier lines, e.g. false
+    line-of-sight associations in a multi-station network.
+
+    Every pair of lines is a minimal hypothesis, the hypotheses of chunks of the K targets are
+    triangulated at once and scored by the truncated squared distance of all lines to the
+    hypothesis point (the MSAC cost), with lines closer than `threshold` counted as inliers.
+    The best hypothesis of each target is refitted with `solve_triangulation` on its inliers.
+    Since all pairs are enumerated the result is deterministic, at a cost of N (N - 1) / 2
+    hypotheses per target which is small for typical station counts.
+
+    Parameters
+    ----------
+    directions
+        (3, N) line directions, or (K, 3, N) for K independent targets, N >= 2.
+    points
+        (3, N) or (K, 3, N) points on the lines, e.g. station positions.
+    threshold
+        Maximum distance between an inlier line and the point.
+    weights
+        (N,) or (K, N) line weights used in the refit, see `solve_triangulation`.
+    chunk_size
+        Maximum number of hypothesis to line distances evaluated at once, the temporaries of
+        each chunk hold a few times `3 * chunk_size` doubles.
+
+    Returns
+    -------
+        (3,) or (K, 3) closest points, (N,) or (K, N) boolean inlier masks used in the refit
+        and the float or (K,) weighted root mean square distances between each point and its
+        inlier lines. Targets without a pair of lines agreeing within the threshold get NaN
+        points and residuals.
+
+    """
+    directions = directions / np.linalg.norm(directions, axis=-2, keepdims=True)
+    N = directions.shape[-1]
+    if N < 2:
+        raise ValueError(f"Robust triangulation needs at least 2 lines, got {N}")
+    pairs = np.zeros((N * (N - 1) // 2, N), dtype=np.float64)  # {H, N}
+    first, second = np.triu_indices(N, 1)
+    pairs[np.arange(pairs.shape[0]), first] = 1
+    pairs[np.arange(pairs.shape[0]), second] = 1
+
+    shape = np.broadcast_shapes(directions.shape, points.shape)
+    line_dirs = np.broadcast_to(directions, shape).reshape(-1, 3, N)
+    line_points = np.broadcast_to(points, shape).reshape(-1, 3, N)
+    K = line_dirs.shape[0]
+    chunk_inliers = np.empty((K, N), dtype=np.bool_)
+    step = max(1, chunk_size // (pairs.shape[0] * N))
+    for start in range(0, K, step):
+        six = slice(start, min(start + step, K))
+        chunk_inliers[six] = _best_hypothesis_inliers(
+            line_dirs[six], line_points[six], pairs, threshold
+        )
+    inliers = chunk_inliers.reshape(shape[:-2] + (N,))
+
+    valid = np.sum(inliers, axis=-1) >= 2
+    line_weights = (
+        np.ones(inliers.shape) if weights is None else np.broadcast_to(weights, inliers.shape)
+    )
+    # invalid targets are solved with all lines to keep the stacked systems regular
+    refit_weights = np.where(inliers | ~valid[..., None], line_weights, 0.0)
+    target, residuals = solve_triangulation(directions, points, refit_weights)
+
+    target = np.where(valid[..., None], target, np.nan)
+    residuals = np.where(valid, residuals, np.nan)
+    if residuals.ndim == 0:
+        return target, inliers, float(residuals)
+    return target, inliers, residuals
+
+
 def trilateration_system(
-    ranges: NDArray_N,
-    points: NDArray_3xN,
-) -> tuple[NDArray_Nx3, NDArray_N]:
-    """Calculate the linear system for finding the point closest to the intersection of N spheres."""
+    ranges: NDArray_N | npt.NDArray,
+    points: NDArray_3xN | npt.NDArray,
+) -> tuple[NDArray_Nx3 | npt.NDArray, NDArray_N | npt.NDArray]:
+    """Calculate the linear system for finding the point closest to the intersection of N spheres.
+
+    Subtracting the mean of the sphere equations $|\\mathbf{p} - \\mathbf{s}_i|^2 = r_i^2$
+    removes the quadratic term and gives the linear system $M \\mathbf{p} = \\mathbf{b}$.
+
+    Parameters
+    ----------
+    ranges
+        (N,) sphere radii, or (K, N) for K independent systems.
+    points
+        (3, N) sphere centres, or (K, 3, N) for K independent systems.
+
+    Returns
+    -------
+        (N, 3) or (K, N, 3) system matrices $M$ and (N,) or (K, N) vectors $\\mathbf{b}$.
+    """
     r2 = ranges**2
-    s2 = np.sum(points**2, axis=0)
-    b = (r2 - np.mean(r2)) - (s2 - np.mean(s2))
-    points_mean = np.mean(points, axis=1)
-    M = 2 * (points_mean[:, None] - points).T
+    s2 = np.sum(points**2, axis=-2)
+    b = (r2 - np.mean(r2, axis=-1, keepdims=True)) - (s2 - np.mean(s2, axis=-1, keepdims=True))
+    points_mean = np.mean(points, axis=-1, keepdims=True)
+    M = 2 * np.swapaxes(points_mean - points, -1, -2)
     return M, b
+
+
+def solve_trilateration(
+    ranges: NDArray_N | npt.NDArray,
+    points: NDArray_3xN | npt.NDArray,
+    iterations: int = 5,
+    range_std: Optional[float | npt.NDArray] = None,
+) -> tuple[NDArray_3 | NDArray_Nx3, NDArray_3x3 | npt.NDArray]:
+    """Find the points whose distances to N stations best match the measured ranges.
+
+    The linear system of `trilateration_system` is solved as an initial guess, its
+    linearization is biased for noisy ranges, so the nonlinear least squares problem
+    $\\min \\sum_i (|\\mathbf{p} - \\mathbf{s}_i| - r_i)^2 / \\sigma_i^2$ is then refined with a
+    fixed number of Gauss-Newton iterations, vectorized over all K targets.
+
+    Parameters
+    ----------
+    ranges
+        (N,) measured ranges, or (K, N) for K targets. At least 4 ranges per target.
+    points
+        (3, N) station positions shared by all targets, or (K, 3, N).
+    iterations
+        Number of Gauss-Newton iterations.
+    range_std
+        Range standard deviations $\\sigma_i$, a scalar, (N,) or (K, N). If not given
+        the ranges are equally weighted and the variance is estimated from the residuals,
+        which requires more than 3 ranges.
+
+    Returns
+    -------
+        (3,) or (K, 3) positions and (3, 3) or (K, 3, 3) covariance estimates of the positions
+        from the Gauss-Newton normal matrix at the solution.
+
+    """
+    ranges = np.asarray(ranges, dtype=np.float64)
+    N = ranges.shape[-1]
+    M, b = trilateration_system(ranges, points)
+    pos = np.einsum("...ij,...j->...i", np.linalg.pinv(M), b)
+
+    weights = (
+        np.ones_like(ranges)
+        if range_std is None
+        else np.broadcast_to(range_std, ranges.shape) ** -2.0
+    )
+
+    for ind in range(iterations + 1):
+        diff = pos[..., :, None] - points  # {K, 3, N}
+        dist = np.linalg.norm(diff, axis=-2)
+        jac = diff / dist[..., None, :]
+        res = dist - ranges
+        normal = np.einsum("...in,...n,...jn->...ij", jac, weights, jac)
+        if ind == iterations:
+            break
+        grad = np.einsum("...in,...n->...i", jac, weights * res)
+        pos = pos - np.linalg.solve(normal, grad[..., None])[..., 0]
+
+    cov = np.linalg.inv(normal)
+    if range_std is None:
+        variance = np.sum(res**2, axis=-1) / (N - 3) if N > 3 else np.full(res.shape[:-1], np.nan)
+        cov *= variance[..., None, None]
+    return pos, cov
+
+
+class Rotation:
+    """Array of N rotations stored as unit quaternions.
+
+    The quaternions are stored scalar-first, $(w, x, y, z)$, in a contiguous (4, N) array,
+    i.e. 4 instead of 9 doubles per rotation, and composing two rotations costs 16 instead
+    of 27 multiply-adds. Like the (3, N) vectors elsewhere the components are the first axis,
+    so that every component is contiguous and the vectorized arithmetic streams through memory.
+    Rotations are active like the `rot_mat_*` matrices, i.e.
+    `Rotation.from_matrix(rot_mat_x(theta))` rotates vectors through `theta` around the X-axis.
+    All operations are vectorized and broadcast an array of a single rotation against N.
+
+    Parameters
+    ----------
+    quat
+        (4, N) or (4,) quaternions, normalized on construction.
+
+    Examples
+    --------
+    Composition follows the matrix product, `(a @ b).apply(v)` equals `a.apply(b.apply(v))`.
+    """
+
+    __slots__ = ("quat",)
+
+    def __init__(self, quat: npt.NDArray) -> None:
+        quat = np.array(quat, dtype=np.float64, order="C").reshape(4, -1)
+        quat /= np.linalg.norm(quat, axis=0)
+        self.quat = quat
+
+    def __len__(self) -> int:
+        return self.quat.shape[1]
+
+    def __getitem__(self, key: int | slice | npt.NDArray) -> "Rotation":
+        return Rotation(self.quat[:, key])
+
+    def __repr__(self) -> str:
+        return f"Rotation(N={len(self)})"
+
+    def __matmul__(self, other: "Rotation") -> "Rotation":
+        """Compose rotations, the result applies `other` first and then `self`."""
+        w1, x1, y1, z1 = self.quat
+        w2, x2, y2, z2 = other.quat
+        quat = np.empty((4, max(len(self), len(other))), dtype=np.float64)
+        quat[0] = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+        quat[1] = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
+        quat[2] = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
+        quat[3] = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+        return Rotation._from_unit(quat)
+
+    @classmethod
+    def _from_unit(cls, quat: npt.NDArray) -> "Rotation":
+        """Wrap (4, N) quaternions that are already normalized without copying."""
+        rot = object.__new__(cls)
+        rot.quat = quat
+        return rot
+
+    @classmethod
+    def identity(cls, num: int = 1) -> "Rotation":
+        quat = np.zeros((4, num), dtype=np.float64)
+        quat[0] = 1
+        return cls(quat)
+
+    @classmethod
+    def from_axis_angle(
+        cls, axis: NDArray_3 | NDArray_3xN, theta: NDArray_N | float, degrees: bool = False
+    ) -> "Rotation":
+        """Rotations through `theta` around the (3,) or (3, N) axes, need not be normalized."""
+        if degrees:
+            theta = np.radians(theta)
+        axis = np.asarray(axis, dtype=np.float64).reshape(3, -1)
+        axis = axis / np.linalg.norm(axis, axis=0)
+        half = np.atleast_1d(theta) / 2
+        quat = np.empty((4, max(axis.shape[1], half.size)), dtype=np.float64)
+        quat[0] = np.cos(half)
+        quat[1:] = axis * np.sin(half)
+        return cls(quat)
+
+    @classmethod
+    def from_euler(cls, seq: str, angles: npt.NDArray, degrees: bool = False) -> "Rotation":
+        """Rotations from a sequence of rotations around coordinate axes.
+
+        Parameters
+        ----------
+        seq
+            Axis sequence, e.g. `"zyx"`, the rotation equals the matrix product
+            `rot_mat_z(angles[0]) @ rot_mat_y(angles[1]) @ rot_mat_x(angles[2])`.
+        angles
+            (len(seq),) or (len(seq), N) angles.
+        degrees
+            If `True`, use degrees. Else all angles are given in radians.
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        if angles.shape[0] != len(seq):
+            raise ValueError(f"Need one row of angles per axis in {seq}, got shape {angles.shape}")
+        rot = cls.identity()
+        for axis_name, theta in zip(seq, angles):
+            rot = rot @ cls.from_axis_angle(_AXES[axis_name], theta, degrees=degrees)
+        return rot
+
+    @classmethod
+    def from_matrix(cls, matrix: npt.NDArray, layout: str = "3x3xN") -> "Rotation":
+        """Rotations from (3, 3) or stacked rotation matrices in the given layout,
+        see `rot_mat_x`. The quaternions are extracted with Shepperd's method.
+        """
+        if matrix.ndim == 2:
+            mat = matrix[None, :, :]
+        elif layout == "3x3xN":
+            mat = np.moveaxis(matrix, -1, 0)
+        elif layout == "Nx3x3":
+            mat = matrix
+        else:
+            raise ValueError(
+                f'Unknown rotation matrix layout "{layout}", expected "3x3xN" or "Nx3x3"'
+            )
+
+        # {N, 4, 4}, four algebraically equivalent solutions, each stable when its pivot is large
+        tr = np.trace(mat, axis1=1, axis2=2)
+        candidates = np.empty(mat.shape[:1] + (4, 4), dtype=np.float64)
+        candidates[:, 0] = np.stack(
+            [
+                1 + tr,
+                mat[:, 2, 1] - mat[:, 1, 2],
+                mat[:, 0, 2] - mat[:, 2, 0],
+                mat[:, 1, 0] - mat[:, 0, 1],
+            ],
+            axis=1,
+        )
+        for i in range(3):
+            j, k = (i + 1) % 3, (i + 2) % 3
+            cand = candidates[:, i + 1]
+            cand[:, 0] = mat[:, k, j] - mat[:, j, k]
+            cand[:, i + 1] = 1 + 2 * mat[:, i, i] - tr
+            cand[:, j + 1] = mat[:, j, i] + mat[:, i, j]
+            cand[:, k + 1] = mat[:, k, i] + mat[:, i, k]
+        pivot = np.argmax(np.abs(candidates[:, np.arange(4), np.arange(4)]), axis=1)
+        return cls(candidates[np.arange(mat.shape[0]), pivot].T)
+
+    def inv(self) -> "Rotation":
+        """Inverse rotations, i.e. the conjugate quaternions."""
+        return Rotation._from_unit(self.quat * np.array([1.0, -1.0, -1.0, -1.0])[:, None])
+
+    def apply(self, vecs: NDArray_3 | NDArray_3xN) -> NDArray_3 | NDArray_3xN:
+        """Rotate (3,) or (3, N) vectors, returns the same shape unless N rotations
+        are applied to a (3,) vector.
+        """
+        w = self.quat[0]
+        u = self.quat[1:]
+        v = vecs.reshape(3, -1)
+        uv = np.cross(u, v, axis=0)
+        rot = v + 2 * w * uv + 2 * np.cross(u, uv, axis=0)
+        if vecs.ndim == 1 and rot.shape[1] == 1:
+            return rot[:, 0]
+        return rot
+
+    def as_matrix(self, layout: str = "3x3xN") -> npt.NDArray:
+        """Rotation matrices in the given layout, see `rot_mat_x`."""
+        w, x, y, z = self.quat
+        mat = np.empty((len(self), 3, 3), dtype=np.float64)
+        mat[:, 0, 0] = 1 - 2 * (y * y + z * z)
+        mat[:, 0, 1] = 2 * (x * y - w * z)
+        mat[:, 0, 2] = 2 * (x * z + w * y)
+        mat[:, 1, 0] = 2 * (x * y + w * z)
+        mat[:, 1, 1] = 1 - 2 * (x * x + z * z)
+        mat[:, 1, 2] = 2 * (y * z - w * x)
+        mat[:, 2, 0] = 2 * (x * z - w * y)
+        mat[:, 2, 1] = 2 * (y * z + w * x)
+        mat[:, 2, 2] = 1 - 2 * (x * x + y * y)
+        if layout == "Nx3x3":
+            return mat
+        elif layout == "3x3xN":
+            return np.moveaxis(mat, 0, -1)
+        raise ValueError(f'Unknown rotation matrix layout "{layout}", expected "3x3xN" or "Nx3x3"')
+
+    def as_euler(self, seq: str, degrees: bool = False) -> npt.NDArray:
+        """Decompose into a sequence of three rotations around coordinate axes, the inverse of
+        `from_euler`. Both Tait-Bryan (e.g. `"zyx"`) and proper Euler (e.g. `"zxz"`) sequences
+        are supported.
+
+        Returns
+        -------
+            (3, N) angles, the first and last angles are in $[-\\pi, \\pi]$ and the middle angle
+            in $[-\\pi/2, \\pi/2]$ for Tait-Bryan and in $[0, \\pi]$ for proper Euler sequences.
+            At gimbal lock the last angle is set to zero.
+        """
+        if len(seq) != 3 or seq[1] in (seq[0], seq[2]):
+            raise ValueError(f'Invalid Euler sequence "{seq}"')
+        i, j, k = (_AXES_INDEX[name] for name in seq)
+        mat = self.as_matrix(layout="Nx3x3")
+        # parity of the axis permutation
+        proper = i == k
+        last = 3 - i - j if proper else k
+        sign = 1.0 if (j - i) % 3 == 1 else -1.0
+
+        if proper:
+            off_axis = np.hypot(mat[:, i, j], mat[:, i, last])
+            middle = np.arctan2(off_axis, mat[:, i, i])
+            third = np.arctan2(mat[:, i, j], sign * mat[:, i, last])
+        else:
+            off_axis = np.hypot(mat[:, i, i], mat[:, i, j])
+            middle = np.arctan2(sign * mat[:, i, k], off_axis)
+            third = np.arctan2(-sign * mat[:, i, j], mat[:, i, i])
+        third[off_axis < EULER_GIMBAL_LOCK_TOL] = 0
+
+        # the first angle is the remaining rotation around the first axis
+        rest = self @ Rotation.from_euler(seq[1:], np.stack([middle, third])).inv()
+        p, q = (i + 1) % 3, (i + 2) % 3
+        rest_mat = rest.as_matrix(layout="Nx3x3")
+        first = np.arctan2(rest_mat[:, q, p], rest_mat[:, p, p])
+
+        angles = np.stack([first, middle, third])
+        return np.degrees(angles) if degrees else angles
+
+    def slerp(self, other: "Rotation", t: NDArray_N | float) -> "Rotation":
+        """Spherical linear interpolation from `self` (t = 0) to `other` (t = 1) along the
+        shortest arc, vectorized over the rotations and/or the (N,) fractions `t`.
+        """
+        q0 = self.quat
+        q1 = other.quat
+        dot = np.sum(q0 * q1, axis=0)
+        # q and -q are the same rotation, take the shortest arc
+        q1 = np.where(dot < 0, -q1, q1)
+        dot = np.abs(dot)
+        t = np.atleast_1d(t)
+
+        omega = np.arccos(np.clip(dot, -1, 1))
+        sin_omega = np.sin(omega)
+        close = sin_omega < 1e-12
+        safe = np.where(close, 1.0, sin_omega)
+        w0 = np.where(close, 1 - t, np.sin((1 - t) * omega) / safe)
+        w1 = np.where(close, t, np.sin(t * omega) / safe)
+        return Rotation(w0 * q0 + w1 * q1)
+
+
+_AXES = {"x": np.array([1.0, 0, 0]), "y": np.array([0, 1.0, 0]), "z": np.array([0, 0, 1.0])}
+_AXES_INDEX = {"x": 0, "y": 1, "z": 2}
+
+EULER_GIMBAL_LOCK_TOL = 1e-9
+"""Below this value of the cosine (Tait-Bryan) or sine (proper Euler) of the middle angle
+`Rotation.as_euler` treats the rotation as gimbal locked and sets the last angle to zero.
+"""
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+"""Process-pool evaluation of functions over large epoch arrays.
+
+The epoch array is split into contiguous chunks that are evaluated in separate worker processes.
+Each worker writes its result directly into a shared-memory output array so that results are
+never pickled back to the parent process, and the returned array is a view of that memory so
+that it is never copied either.
+"""
+
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Any
+
+import numpy as np
+import numpy.typing as npt
+
+
+def _shared_chunk_worker(
+    func: Callable[..., npt.NDArray],
+    shm_name: str,
+    shape: tuple[int, ...],
+    start: int,
+    stop: int,
+    epochs: tuple[npt.NDArray, ...],
+    args: tuple,
+) -> None:
+    shm = SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        out[..., start:stop] = func(*epochs, *args)
+        del out
+    finally:
+        shm.close()
+
+
+def epoch_pool_map(
+    func: Callable[..., npt.NDArray],
+    epochs: tuple[npt.NDArray, ...],
+    shape: tuple[int, ...],
+    workers: int,
+    args: tuple[Any, ...] = (),
+    chunks_per_worker: int = 4,
+) -> npt.NDArray:
+    """Evaluate `func(*epoch_chunks, *args)` over chunks of the epoch arrays in a process pool.
+
+    Parameters
+    ----------
+    func
+        Picklable (i.e. module level) function that takes the chunks of all `epochs` arrays
+        followed by `args` and returns an array of shape `shape[:-1] + (chunk_size,)`.
+        Expensive resources, such as kernel files, should be opened inside `func` so that
+        every worker opens them independently.
+    epochs
+        Tuple of (N,) arrays that are split along their only axis, e.g. the two parts of a
+        Julian date.
+    shape
+        Shape of the full output array, the last axis must have length N.
+    workers
+        Number of worker processes.
+    args
+        Additional picklable arguments passed to every call.
+    chunks_per_worker
+        Number of chunks per worker, more chunks improve load balancing.
+
+    Returns
+    -------
+        Array of `shape` with the reassembled results, a view of the shared memory that is
+        released once the array and all views of it are garbage collected.
+
+    """
+    size = shape[-1]
+    bounds = np.linspace(0, size, min(size, workers * chunks_per_worker) + 1).astype(np.int64)
+
+    shm = SharedMemory(create=True, size=max(int(np.prod(shape)), 1) * 8)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _shared_chunk_worker,
+                    func,
+                    shm.name,
+                    shape,
+                    int(start),
+                    int(stop),
+                    tuple(epoch[start:stop] for epoch in epochs),
+                    args,
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            for future in futures:
+                future.result()
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+
+    # the name is not needed anymore, the mapping stays valid until it is closed
+    shm.unlink()
+    out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    weakref.finalize(out, shm.close)
+    return out
@@ -1,6 +1,40 @@
 import numpy.typing as npt
 import numpy as np
 
+MOLLWEIDE_NEWTON_TOL = 1e-14
+"""Absolute tolerance on the residual of the Mollweide auxiliary angle equation."""
+NEWTON_MAX_ITER = 50
+"""Maximum number of Newton iterations in the Mollweide forward and Aitoff inverse projections."""
+AITOFF_INVERSE_TOL = 1e-12
+"""Absolute tolerance in projection plane units of the Aitoff inverse projection."""
+
+
+def _center_lon(
+    lon: npt.NDArray | float,
+    ref_lon: npt.NDArray | float | None,
+) -> npt.NDArray:
+    """Longitude relative to the reference (if given) wrapped to [-pi, pi), except that exactly
+    pi is kept as pi so that it maps to the right edge of the map."""
+    if ref_lon is not None:
+        # sun centered
+        lon = np.mod(-(lon - ref_lon - 1.5 * np.pi), 2 * np.pi)
+    lon = np.asarray(lon, dtype=np.float64)
+    return np.where(lon == np.pi, np.pi, np.mod(lon + np.pi, 2 * np.pi) - np.pi)
+
+
+def _uncenter_lon(
+    lambdas: npt.NDArray,
+    ref_lon: npt.NDArray | float | None,
+) -> npt.NDArray:
+    """Inverse of `_center_lon`, the Longitudes are wrapped to (-pi, pi]."""
+    if ref_lon is not None:
+        lambdas = ref_lon + 1.5 * np.pi - lambdas
+    return np.pi - np.mod(np.pi - lambdas, 2 * np.pi)
+
+
+def _inside_ellipse(x: npt.NDArray, y: npt.NDArray, a: float, b: float) -> npt.NDArray:
+    return (x / a) ** 2 + (y / b) ** 2 <= 1 + 1e-12
+
 
 def latlon_to_hammer(
     lon: npt.NDArray | float,
@@ -12,32 +46,306 @@ def latlon_to_hammer(
     Longitude to align the data against.
 
     Typical usage is producing sun centered hammer projection
-    of ecliptic radians."""
+    of ecliptic radians. The map is the ellipse $(x/2)^2 + y^2 \\leq 1$."""
     if degrees:
         lon = np.radians(lon)
         lat = np.radians(lat)
         if ref_lon is not None:
             ref_lon = np.radians(ref_lon)
 
-    if ref_lon is not None:
-        # sun centered
-        lambdas = np.mod(np.mod(-(lon - ref_lon - 1.5 * np.pi), 2 * np.pi) + 2 * np.pi, 2 * np.pi)
-    else:
-        lambdas = lon
-    lambdas = np.array(lambdas)
-
     # Make longitude -pi:pi but make sure pi -> pi and not -pi
-    inds = lambdas == np.pi
-    lambdas = np.mod(lambdas + np.pi, 2 * np.pi) - np.pi
-    if len(lambdas.shape) == 0:
-        if inds:
-            lambdas = np.pi
-    else:
-        lambdas[inds] = np.pi
+    lambdas = _center_lon(lon, ref_lon)
 
     # hammer transform
-    norm = np.sqrt(1 + np.cos(lat) * np.cos(lambdas * 0.5))
-    hx = 2 * np.cos(lat) * np.sin(lambdas * 0.5) / norm
+    cos_lat = np.cos(lat)
+    norm = np.sqrt(1 + cos_lat * np.cos(lambdas * 0.5))
+    hx = 2 * cos_lat * np.sin(lambdas * 0.5) / norm
     hy = np.sin(lat) / norm
 
     return hx, hy
+
+
+def hammer_to_latlon(
+    hx: npt.NDArray | float,
+    hy: npt.NDArray | float,
+    ref_lon: npt.NDArray | float | None = None,
+    degrees: bool = False,
+) -> tuple[npt.NDArray | float, npt.NDArray | float]:
+    """Inverse of `latlon_to_hammer`, returns the Longitudes in (-pi, pi] and Latitudes of the
+    projected points and NaN for points outside of the map."""
+    if degrees and ref_lon is not None:
+        ref_lon = np.radians(ref_lon)
+    hx = np.asarray(hx, dtype=np.float64)
+    hy = np.asarray(hy, dtype=np.float64)
+
+    # in the standard scaling x = sqrt(2) hx and y = sqrt(2) hy
+    z2 = 1 - 0.125 * hx**2 - 0.5 * hy**2
+    z = np.sqrt(np.maximum(z2, 0))
+    lambdas = 2 * np.arctan2(np.sqrt(2) * z * hx, 2 * (2 * z2 - 1))
+    lat = np.arcsin(np.clip(np.sqrt(2) * z * hy, -1, 1))
+    lon = _uncenter_lon(lambdas, ref_lon)
+
+    outside = ~_inside_ellipse(hx, hy, 2.0, 1.0)
+    lon = np.where(outside, np.nan, lon)
+    lat = np.where(outside, np.nan, lat)
+    if degrees:
+        lon, lat = np.degrees(lon), np.degrees(lat)
+    return lon, lat
+
+
+def latlon_to_aitoff(
+    lon: npt.NDArray | float,
+    lat: npt.NDArray | float,
+    ref_lon: npt.NDArray | float | None = None,
+    degrees: bool = False,
+) -> tuple[npt.NDArray | float, npt.NDArray | float]:
+    """Project given Latitudes and Longitudes with the Aitoff projection, with the same
+    reference Longitude convention as `latlon_to_hammer`. The map is the ellipse
+    $(x/\\pi)^2 + (2y/\\pi)^2 \\leq 1$."""
+    if degrees:
+        lon = np.radians(lon)
+        lat = np.radians(lat)
+        if ref_lon is not None:
+            ref_lon = np.radians(ref_lon)
+
+    lambdas = _center_lon(lon, ref_lon)
+
+    cos_lat = np.cos(lat)
+    alpha = np.arccos(cos_lat * np.cos(lambdas * 0.5))
+    # unnormalized sinc, i.e. sin(alpha) / alpha
+    sinc = np.sinc(alpha / np.pi)
+    ax = 2 * cos_lat * np.sin(lambdas * 0.5) / sinc
+    ay = np.sin(lat) / sinc
+
+    return ax, ay
+
+
+def aitoff_to_latlon(
+    ax: npt.NDArray | float,
+    ay: npt.NDArray | float,
+    ref_lon: npt.NDArray | float | None = None,
+    degrees: bool = False,
+) -> tuple[npt.NDArray | float, npt.NDArray | float]:
+    """Inverse of `latlon_to_aitoff`, returns the Longitudes in (-pi, pi] and Latitudes of the
+    projected points and NaN for points outside of the map.
+
+    There is no closed form inverse, the forward projection is inverted with a vectorized
+    Newton iteration started from $(\\lambda, \\phi) = (x, y)$, which is exact along the
+    equator and the central meridian."""
+    if degrees and ref_lon is not None:
+        ref_lon = np.radians(ref_lon)
+    ax = np.asarray(ax, dtype=np.float64)
+    ay = np.asarray(ay, dtype=np.float64)
+    outside = ~_inside_ellipse(ax, ay, np.pi, 0.5 * np.pi)
+
+    lambdas = np.clip(ax, -np.pi, np.pi)
+    lat = np.clip(ay, -0.5 * np.pi, 0.5 * np.pi)
+    for _ in range(NEWTON_MAX_ITER):
+        cos_lat, sin_lat = np.cos(lat), np.sin(lat)
+        cos_l2, sin_l2 = np.cos(lambdas * 0.5), np.sin(lambdas * 0.5)
+        u = cos_lat * cos_l2
+        one_u2 = 1 - u * u
+        # d = alpha / sin(alpha) with u = cos(alpha) and its derivative with respect to u
+        d = 1 / np.sinc(np.arccos(np.clip(u, -1, 1)) / np.pi)
+        small = one_u2 < 1e-8
+        dd = np.where(small, -1.0 / 3, (u * d - 1) / np.where(small, 1, one_u2))
+        du_dlat = -sin_lat * cos_l2
+        du_dlon = -0.5 * cos_lat * sin_l2
+
+        fx = 2 * d * cos_lat * sin_l2 - ax
+        fy = d * sin_lat - ay
+        if np.all(np.abs(fx[~outside]) < AITOFF_INVERSE_TOL) and np.all(
+            np.abs(fy[~outside]) < AITOFF_INVERSE_TOL
+        ):
+            break
+
+        jx_lat = 2 * sin_l2 * (dd * du_dlat * cos_lat - d * sin_lat)
+        jx_lon = 2 * cos_lat * (dd * du_dlon * sin_l2 + 0.5 * d * cos_l2)
+        jy_lat = dd * du_dlat * sin_lat + d * cos_lat
+        jy_lon = dd * du_dlon * sin_lat
+        det = jx_lat * jy_lon - jx_lon * jy_lat
+        det = np.where(det == 0, np.finfo(np.float64).tiny, det)
+
+        lat = np.clip(lat - (jy_lon * fx - jx_lon * fy) / det, -0.5 * np.pi, 0.5 * np.pi)
+        lambdas = np.clip(lambdas - (jx_lat * fy - jy_lat * fx) / det, -np.pi, np.pi)
+
+    lon = _uncenter_lon(lambdas, ref_lon)
+    lon = np.where(outside, np.nan, lon)
+    lat = np.where(outside, np.nan, lat)
+    if degrees:
+        lon, lat = np.degrees(lon), np.degrees(lat)
+    return lon, lat
+
+
+def _mollweide_theta(lat: npt.NDArray | float) -> npt.NDArray:
+    """Solve $2\\theta + \\sin 2\\theta = \\pi \\sin \\phi$ for the auxiliary angle with Newton
+    iterations on all points at once. Close to the poles the derivative vanishes, there the
+    iteration starts from the cubic expansion of the equation around the pole."""
+    lat = np.asarray(lat, dtype=np.float64)
+    sin_lat = np.sin(lat)
+    target = np.pi * sin_lat
+    polar = np.pi - np.cbrt(6 * np.pi * (1 - np.abs(sin_lat)))
+    t = np.where(np.abs(lat) > 0.5, np.copysign(polar, lat), 2 * lat)
+    for _ in range(NEWTON_MAX_ITER):
+        residual = t + np.sin(t) - target
+        if np.all(np.abs(residual) <= MOLLWEIDE_NEWTON_TOL):
+            break
+        t -= residual / np.maximum(1 + np.cos(t), np.finfo(np.float64).tiny)
+    return 0.5 * t
+
+
+def latlon_to_mollweide(
+    lon: npt.NDArray | float,
+    lat: npt.NDArray | float,
+    ref_lon: npt.NDArray | float | None = None,
+    degrees: bool = False,
+) -> tuple[npt.NDArray | float, npt.NDArray | float]:
+    """Project given Latitudes and Longitudes with the equal-area Mollweide projection, with
+    the same reference Longitude convention as `latlon_to_hammer`. The map is the ellipse
+    $(x/(2\\sqrt{2}))^2 + (y/\\sqrt{2})^2 \\leq 1$."""
+    if degrees:
+        lon = np.radians(lon)
+        lat = np.radians(lat)
+        if ref_lon is not None:
+            ref_lon = np.radians(ref_lon)
+
+    lambdas = _center_lon(lon, ref_lon)
+    theta = _mollweide_theta(lat)
+    mx = 2 * np.sqrt(2) / np.pi * lambdas * np.cos(theta)
+    my = np.sqrt(2) * np.sin(theta)
+
+    return mx, my
+
+
+def mollweide_to_latlon(
+    mx: npt.NDArray | float,
+    my: npt.NDArray | float,
+    ref_lon: npt.NDArray | float | None = None,
+    degrees: bool = False,
+) -> tuple[npt.NDArray | float, npt.NDArray | float]:
+    """Inverse of `latlon_to_mollweide`, returns the Longitudes in (-pi, pi] and Latitudes of
+    the projected points and NaN for points outside of the map."""
+    if degrees and ref_lon is not None:
+        ref_lon = np.radians(ref_lon)
+    mx = np.asarray(mx, dtype=np.float64)
+    my = np.asarray(my, dtype=np.float64)
+
+    theta = np.arcsin(np.clip(my / np.sqrt(2), -1, 1))
+    lat = np.arcsin(np.clip((2 * theta + np.sin(2 * theta)) / np.pi, -1, 1))
+    cos_theta = np.cos(theta)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lambdas = np.where(cos_theta > 0, np.pi * mx / (2 * np.sqrt(2) * cos_theta), 0.0)
+    lon = _uncenter_lon(lambdas, ref_lon)
+
+    outside = ~_inside_ellipse(mx, my, 2 * np.sqrt(2), np.sqrt(2))
+    lon = np.where(outside, np.nan, lon)
+    lat = np.where(outside, np.nan, lat)
+    if degrees:
+        lon, lat = np.degrees(lon), np.degrees(lat)
+    return lon, lat
+
+
+PROJECTIONS = {
+    "hammer": (latlon_to_hammer, hammer_to_latlon, (2.0, 1.0)),
+    "aitoff": (latlon_to_aitoff, aitoff_to_latlon, (np.pi, 0.5 * np.pi)),
+    "mollweide": (latlon_to_mollweide, mollweide_to_latlon, (2 * np.sqrt(2), np.sqrt(2))),
+}
+"""Forward projection, inverse projection and the semi-axes of the elliptic map by name."""
+
+
+class ProjectionHistogram:
+    """Streaming 2D histogram of projected Longitudes and Latitudes.
+
+    Points are added chunk by chunk with `add`, each chunk is projected and binned into the
+    counts with `np.bincount`, so that maps of arbitrarily many points can be built while
+    only holding one chunk of at most `chunk_size` points and its temporaries in memory.
+
+    Parameters
+    ----------
+    projection
+        Name of the projection in `PROJECTIONS`.
+    bins
+        Number of bins along x and y, the bins cover the bounding box of the map.
+    ref_lon
+        Reference Longitude passed to the projection.
+    degrees
+        If :code:`True` all input/output angles are in degrees, else they are in radians.
+    chunk_size
+        Maximum number of points projected at once.
+
+    Examples
+    --------
+    >>> hist = ProjectionHistogram("mollweide", bins=(360, 180))
+    >>> for lon, lat in chunks:  # doctest: +SKIP
+    ...     hist.add(lon, lat)
+    >>> plt.pcolormesh(hist.x_edges, hist.y_edges, hist.counts.T)  # doctest: +SKIP
+
+    """
+
+    def __init__(
+        self,
+        projection: str = "hammer",
+        bins: tuple[int, int] = (360, 180),
+        ref_lon: float | None = None,
+        degrees: bool = False,
+        chunk_size: int = 2**20,
+    ) -> None:
+        if projection not in PROJECTIONS:
+            raise ValueError(f'Unknown projection "{projection}", choose from {list(PROJECTIONS)}')
+        self.projection = projection
+        self.forward, self.inverse, (a, b) = PROJECTIONS[projection]
+        self.bins = bins
+        self.ref_lon = ref_lon
+        self.degrees = degrees
+        self.chunk_size = chunk_size
+        self.x_edges = np.linspace(-a, a, bins[0] + 1)
+        self.y_edges = np.linspace(-b, b, bins[1] + 1)
+        self.counts = np.zeros(bins, dtype=np.float64)
+        self.total = 0
+
+    def __repr__(self) -> str:
+        return f'ProjectionHistogram("{self.projection}", bins={self.bins}, total={self.total})'
+
+    def add(
+        self,
+        lon: npt.NDArray,
+        lat: npt.NDArray,
+        weights: npt.NDArray | None = None,
+    ) -> None:
+        """Project and bin a chunk of points, optionally weighted. Points with non-finite
+        coordinates or outside of the bins are dropped and not counted in `total`."""
+        lon = np.ravel(lon)
+        lat = np.ravel(lat)
+        if weights is not None:
+            weights = np.ravel(weights)
+        nx, ny = self.bins
+        x0, y0 = self.x_edges[0], self.y_edges[0]
+        x1, y1 = self.x_edges[-1], self.y_edges[-1]
+        sx, sy = nx / (x1 - x0), ny / (y1 - y0)
+        flat = self.counts.reshape(-1)
+        for start in range(0, lon.size, self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            with np.errstate(invalid="ignore"):
+                px, py = self.forward(
+                    lon[chunk], lat[chunk], ref_lon=self.ref_lon, degrees=self.degrees
+                )
+            # the comparisons are False for NaN, the last bins include their right edge
+            keep = (px >= x0) & (px <= x1) & (py >= y0) & (py <= y1)
+            px, py = np.asarray(px)[keep], np.asarray(py)[keep]
+            ix = np.minimum(((px - x0) * sx).astype(np.int64), nx - 1)
+            iy = np.minimum(((py - y0) * sy).astype(np.int64), ny - 1)
+            flat += np.bincount(
+                ix * ny + iy,
+                weights=None if weights is None else weights[chunk][keep],
+                minlength=nx * ny,
+            )
+            self.total += int(np.count_nonzero(keep))
+
+    def bin_centers(self) -> tuple[npt.NDArray, npt.NDArray]:
+        """Longitudes and Latitudes of the bin centers as (nx, ny) arrays, NaN outside of the
+        map."""
+        xc = 0.5 * (self.x_edges[1:] + self.x_edges[:-1])
+        yc = 0.5 * (self.y_edges[1:] + self.y_edges[:-1])
+        xx, yy = np.meshgrid(xc, yc, indexing="ij")
+        lon, lat = self.inverse(xx, yy, ref_lon=self.ref_lon, degrees=self.degrees)
+        return np.asarray(lon), np.asarray(lat)
@@ -4,7 +4,7 @@
 
 import numpy as np
 from numpy.typing import NDArray
-from .types import NDArray_3, NDArray_3xN, NDArray_N
+from .types import NDArray_2xN, NDArray_3, NDArray_3x3, NDArray_3xN, NDArray_N
 
 from . import linalg
 
@@ -16,7 +16,11 @@ def arctime_to_degrees(minutes: NDArray | float, seconds: NDArray | float) -> ND
     return (minutes + seconds / 60.0) / 60.0
 
 
-def cart_to_sph(vec: NDArray_3 | NDArray_3xN, degrees: bool = False) -> NDArray_3 | NDArray_3xN:
+def cart_to_sph(
+    vec: NDArray_3 | NDArray_3xN,
+    degrees: bool = False,
+    out: NDArray_3 | NDArray_3xN | None = None,
+) -> NDArray_3 | NDArray_3xN:
     """Convert from Cartesian coordinates (east, north, up) to Spherical
     coordinates (azimuth, elevation, range) in a angle east of north and
     elevation fashion. Returns azimuth between [-pi, pi] and elevation between
@@ -29,11 +33,14 @@ def cart_to_sph(vec: NDArray_3 | NDArray_3xN, degrees: bool = False) -> NDArray_
         This argument is vectorized in the second array dimension.
     degrees
         If `True`, use degrees. Else all angles are given in radians.
+    out
+        Optional output array of the same shape as `vec`, may be `vec` itself.
 
     Returns
     -------
         (3, N) or (3, ) vector of Spherical coordinates
-        (azimuth, elevation, range).
+        (azimuth, elevation, range). Floating point inputs keep their precision,
+        e.g. float32 is not upcast.
 
     Notes
     -----
@@ -42,33 +49,31 @@ def cart_to_sph(vec: NDArray_3 | NDArray_3xN, degrees: bool = False) -> NDArray_
         if the point is close to the pole and sets the azimuth by definition
         to 0 "at" the poles for consistency.
 
-    """
-
-    r2_ = vec[0, ...] ** 2 + vec[1, ...] ** 2
-
-    sph = np.empty(vec.shape, dtype=vec.dtype)
+    Both angles are computed with `arctan2`, which is well conditioned everywhere, and
+    the pole convention is applied with masked copies instead of fancy indexing so that
+    no temporaries beyond the horizontal distance and the pole mask are created.
 
-    if len(vec.shape) == 1:
-        if r2_ < CLOSE_TO_POLE_LIMIT:
-            sph[0] = 0.0
-            sph[1] = np.sign(vec[2]) * np.pi * 0.5
-        else:
-            sph[0] = np.arctan2(vec[0], vec[1])
-            sph[1] = np.arctan(vec[2] / np.sqrt(r2_))
-    else:
-        inds_ = r2_ < CLOSE_TO_POLE_LIMIT
-        not_inds_ = np.logical_not(inds_)
-
-        sph[0, inds_] = 0.0
-        sph[1, inds_] = np.sign(vec[2, inds_]) * np.pi * 0.5
-        sph[0, not_inds_] = np.arctan2(vec[0, not_inds_], vec[1, not_inds_])
-        sph[1, not_inds_] = np.arctan(vec[2, not_inds_] / np.sqrt(r2_[not_inds_]))
+    """
+    vec = np.asarray(vec)
+    if out is None:
+        dtype = vec.dtype if np.issubdtype(vec.dtype, np.floating) else np.float64
+        out = np.empty(vec.shape, dtype=dtype)
+
+    x, y, z = vec[0, ...], vec[1, ...], vec[2, ...]
+    rho = np.hypot(x, y)
+    pole = rho * rho < CLOSE_TO_POLE_LIMIT
+
+    # the order allows `out is vec`, every input row is read before it is overwritten
+    np.arctan2(x, y, out=out[0, ...])
+    np.copyto(out[0, ...], 0, where=pole)
+    np.arctan2(z, rho, out=out[1, ...])
+    np.copyto(out[1, ...], np.sign(z) * (np.pi * 0.5), where=pole)
+    np.hypot(rho, z, out=out[2, ...])
 
-    sph[2, ...] = np.sqrt(r2_ + vec[2, ...] ** 2)
     if degrees:
-        sph[:2, ...] = np.degrees(sph[:2, ...])
+        np.degrees(out[:2, ...], out=out[:2, ...])
 
-    return sph
+    return out
 
 
 def sph_to_cart(vec: NDArray_3 | NDArray_3xN, degrees: bool = False) -> NDArray_3 | NDArray_3xN:
@@ -160,6 +165,7 @@ def az_el_vs_cart_angle(
     elevation: NDArray_N | float,
     cart: NDArray_3xN | NDArray_3,
     degrees: bool = False,
+    pairwise: bool = False,
 ) -> NDArray_N | float:
     """Get angle between azimuth and elevation and pointing direction.
 
@@ -172,6 +178,10 @@ def az_el_vs_cart_angle(
     degrees : bool
         If :code:`True` all input/output angles are in degrees,
         else they are in radians.
+    pairwise : bool
+        If :code:`True` return the (N, M) angles between all N pointing directions and all
+        M given directions, see `linalg.pairwise_vector_angle` which also supports only
+        returning the pairs within a maximum angle.
 
     Returns
     -------
@@ -181,30 +191,503 @@ def az_el_vs_cart_angle(
     """
     sph = az_el_to_sph(azimuth, elevation)
     k = sph_to_cart(sph, degrees=degrees)
+    if pairwise:
+        return linalg.pairwise_vector_angle(k, cart, degrees=degrees)  # type: ignore[return-value]
     return linalg.vector_angle(cart, k, degrees=degrees)
 
 
+def array_face_frame(
+    azimuth: float,
+    elevation: float,
+    degrees: bool = False,
+) -> NDArray_3x3:
+    """Rotation matrix from (east, north, up) to the local frame of a tilted array face.
+
+    The local frame $(u, v, w)$ has $w$ along the boresight of the face, pointing towards
+    `azimuth` and `elevation`, and is built by tilting the face away from zenith around the
+    east axis and then turning it around the up axis, i.e. for a face pointing at zenith
+    with zero azimuth the local frame is (east, north, up).
+
+    Parameters
+    ----------
+    azimuth
+        Azimuth east of north of the boresight.
+    elevation
+        Elevation from horizon of the boresight.
+    degrees
+        If :code:`True` all input angles are in degrees, else they are in radians.
+
+    Returns
+    -------
+        (3, 3) matrix whose rows are the $u$, $v$ and $w$ axes in (east, north, up), i.e.
+        `frame @ enu` gives direction cosines and `frame.T @ uvw` the inverse.
+
+    """
+    if degrees:
+        azimuth, elevation = np.radians(azimuth), np.radians(elevation)
+    face_to_enu = linalg.rot_mat_z(-azimuth) @ linalg.rot_mat_x(elevation - np.pi / 2)
+    return face_to_enu.T
+
+
+def az_el_to_uvw(
+    azimuth: NDArray_N | float,
+    elevation: NDArray_N | float,
+    degrees: bool = False,
+    frame: NDArray_3x3 | None = None,
+) -> NDArray_3xN | NDArray_3:
+    """Direction cosines $(u, v, w)$ of azimuth and elevation pointing directions.
+
+    Parameters
+    ----------
+    azimuth
+        Azimuth east of north of pointing direction.
+    elevation
+        Elevation from horizon of pointing direction.
+    degrees
+        If :code:`True` all input angles are in degrees, else they are in radians.
+    frame
+        Optional array face frame from `array_face_frame`, if not given the direction
+        cosines are with respect to (east, north, up).
+
+    Returns
+    -------
+        (3, N) or (3,) direction cosines.
+
+    """
+    if degrees:
+        azimuth, elevation = np.radians(azimuth), np.radians(elevation)
+    cos_el = np.cos(elevation)
+    uvw = np.stack(
+        np.broadcast_arrays(cos_el * np.sin(azimuth), cos_el * np.cos(azimuth), np.sin(elevation))
+    )
+    if frame is not None:
+        uvw = frame @ uvw
+    return uvw
+
+
+def uvw_to_az_el(
+    uvw: NDArray_2xN | NDArray_3xN | NDArray_3,
+    degrees: bool = False,
+    frame: NDArray_3x3 | None = None,
+) -> NDArray_2xN:
+    """Azimuth and elevation of direction cosines, the inverse of `az_el_to_uvw`.
+
+    Parameters
+    ----------
+    uvw
+        (3, N) or (3,) direction cosines, or (2, N) or (2,) $(u, v)$ in which case $w$ is
+        taken as positive, i.e. in front of the array face.
+    degrees
+        If :code:`True` all output angles are in degrees, else they are in radians.
+    frame
+        Optional array face frame from `array_face_frame` that the direction cosines are
+        given in.
+
+    Returns
+    -------
+        (2, N) or (2,) azimuth east of north and elevation from horizon.
+
+    """
+    uvw = np.asarray(uvw, dtype=np.float64)
+    if uvw.shape[0] == 2:
+        w = np.sqrt(np.maximum(1 - uvw[0, ...] ** 2 - uvw[1, ...] ** 2, 0))
+        uvw = np.stack([uvw[0, ...], uvw[1, ...], w])
+    if frame is not None:
+        uvw = frame.T @ uvw
+    az_el = np.empty((2,) + uvw.shape[1:], dtype=np.float64)
+    np.arctan2(uvw[0, ...], uvw[1, ...], out=az_el[0, ...])
+    np.arctan2(uvw[2, ...], np.hypot(uvw[0, ...], uvw[1, ...]), out=az_el[1, ...])
+    if degrees:
+        np.degrees(az_el, out=az_el)
+    return az_el
+
+
+class SteeringGrid:
+    """Beam positions of a phased array on a regular grid in direction cosine space.
+
+    The $(u, v)$ grid of the face is computed once, and the (east, north, up) directions
+    and azimuth and elevation of all beam positions are computed in a single matrix product
+    per array orientation and cached by orientation, so that a scan schedule is just an
+    index into the returned arrays. The cached arrays are read-only.
+
+    Parameters
+    ----------
+    num
+        Number of grid points along $u$ and $v$, an even number is rounded up to the next odd
+        number so that the grid is symmetric around and includes boresight.
+    max_angle
+        Maximum scan angle off boresight, grid points outside are dropped.
+    degrees
+        If :code:`True` all input/output angles are in degrees, else they are in radians.
+
+    """
+
+    def __init__(self, num: int, max_angle: float, degrees: bool = False) -> None:
+        if num < 1:
+            raise ValueError(f"Need at least one grid point, got num={num}")
+        self.degrees = degrees
+        max_sin = np.sin(np.radians(max_angle) if degrees else max_angle)
+        half = np.linspace(0, max_sin, num // 2 + 1)
+        grid = np.concatenate([-half[:0:-1], half])
+        u, v = np.meshgrid(grid, grid, indexing="ij")
+        keep = u**2 + v**2 <= max_sin**2 * (1 + 1e-12)
+        u, v = u[keep], v[keep]
+        self.uvw = np.stack([u, v, np.sqrt(np.maximum(1 - u**2 - v**2, 0))])
+        self.uvw.flags.writeable = False
+        self._cache: dict[tuple[float, float], tuple[NDArray_3xN, NDArray_2xN]] = {}
+
+    def __len__(self) -> int:
+        return self.uvw.shape[1]
+
+    def __repr__(self) -> str:
+        return f"SteeringGrid(N={len(self)}, orientations={len(self._cache)})"
+
+    def _get(self, azimuth: float, elevation: float) -> tuple[NDArray_3xN, NDArray_2xN]:
+        key = (float(azimuth), float(elevation))
+        if key not in self._cache:
+            frame = array_face_frame(azimuth, elevation, degrees=self.degrees)
+            enu = frame.T @ self.uvw
+            az_el = uvw_to_az_el(enu, degrees=self.degrees)
+            enu.flags.writeable = False
+            az_el.flags.writeable = False
+            self._cache[key] = (enu, az_el)
+        return self._cache[key]
+
+    def directions(self, azimuth: float, elevation: float) -> NDArray_3xN:
+        """(3, N) (east, north, up) unit vectors of the beam positions for an array face with
+        boresight towards `azimuth` and `elevation`."""
+        return self._get(azimuth, elevation)[0]
+
+    def az_el(self, azimuth: float, elevation: float) -> NDArray_2xN:
+        """(2, N) azimuth and elevation of the beam positions for an array face with boresight
+        towards `azimuth` and `elevation`."""
+        return self._get(azimuth, elevation)[1]
+
+    def clear_cache(self) -> None:
+        """Drop all cached orientations."""
+        self._cache.clear()
+
+
+def _great_circle(
+    elevation_a: NDArray | float,
+    elevation_b: NDArray | float,
+    dlon: NDArray | float,
+    method: str,
+) -> NDArray | float:
+    """Broadcasted great circle angle in radians."""
+    if method == "cosine":
+        cos_ang = np.sin(elevation_a) * np.sin(elevation_b) + np.cos(elevation_a) * np.cos(
+            elevation_b
+        ) * np.cos(dlon)
+        return np.arccos(np.clip(cos_ang, -1, 1))
+    elif method == "haversine":
+        hav = (
+            np.sin(0.5 * (elevation_b - elevation_a)) ** 2
+            + np.cos(elevation_a) * np.cos(elevation_b) * np.sin(0.5 * dlon) ** 2
+        )
+        return 2 * np.arcsin(np.sqrt(np.clip(hav, 0, 1)))
+    elif method == "vincenty":
+        sa, ca = np.sin(elevation_a), np.cos(elevation_a)
+        sb, cb = np.sin(elevation_b), np.cos(elevation_b)
+        cos_dlon = np.cos(dlon)
+        y = np.hypot(cb * np.sin(dlon), ca * sb - sa * cb * cos_dlon)
+        x = sa * sb + ca * cb * cos_dlon
+        return np.arctan2(y, x)
+    else:
+        raise ValueError(f'Unknown method "{method}", use "cosine", "haversine" or "vincenty"')
+
+
 def great_circle_distance(
     elevation_a: NDArray_N | float,
     azimuth_a: NDArray_N | float,
     elevation_b: NDArray_N | float,
     azimuth_b: NDArray_N | float,
     degrees: bool = False,
-) -> NDArray_N | float:
+    method: str = "vincenty",
+    pairwise: bool = False,
+    k: int | None = None,
+    chunk_size: int = linalg.PAIRWISE_CHUNK_ELEMENTS,
+) -> NDArray | float | tuple[NDArray, NDArray]:
     """Calculate the great circle distance between two spherical points in terms of angular
     separation.
+
+    Parameters
+    ----------
+    elevation_a, azimuth_a
+        N points, scalars or arrays.
+    elevation_b, azimuth_b
+        M points, scalars or arrays that broadcast against the `a` points unless `pairwise`
+        or `k` is given.
+    degrees
+        If :code:`True` all input/output angles are in degrees, else they are in radians.
+    method
+        The formula used, "vincenty" is accurate for all separations, "haversine" is
+        accurate for small separations but loses precision close to antipodal points and
+        "cosine" (the spherical law of cosines) loses precision for small separations.
+    pairwise
+        If :code:`True` return the (N, M) distances between all points, evaluated over
+        chunks of the `b` points so that at most `chunk_size` pairs are held in temporaries.
+    k
+        If given, return the `k` nearest `b` points of every `a` point as a tuple of
+        `(distances, indices)` of shape (k, N). The search uses a `SphericalIndex` on the
+        `b` points and never forms the full distance matrix.
+    chunk_size
+        Maximum number of pairs evaluated at once in `pairwise` mode.
+
+    Returns
+    -------
+    float or NDArray or tuple of NDArray
+        Angular separation between the points.
+
     """
+    if k is not None:
+        index = SphericalIndex.from_az_el(
+            np.atleast_1d(azimuth_b), np.atleast_1d(elevation_b), degrees=degrees
+        )
+        return index.query(
+            az_el_point(np.atleast_1d(azimuth_a), np.atleast_1d(elevation_a), degrees=degrees),
+            k=k,
+            degrees=degrees,
+        )
+
     if degrees:
         elevation_a = np.radians(elevation_a)
         elevation_b = np.radians(elevation_b)
         azimuth_a = np.radians(azimuth_a)
         azimuth_b = np.radians(azimuth_b)
 
-    x1 = np.sin(elevation_a) * np.sin(elevation_b)
-    x2 = np.cos(elevation_a) * np.cos(elevation_b)
-
-    angle_sep = np.arccos(x1 + x2 * np.cos(np.abs(azimuth_a - azimuth_b)))
+    angle_sep: NDArray | float
+    if pairwise:
+        elevation_a = np.atleast_1d(elevation_a)[:, None]
+        azimuth_a = np.atleast_1d(azimuth_a)[:, None]
+        elevation_b = np.atleast_1d(elevation_b)[None, :]
+        azimuth_b = np.atleast_1d(azimuth_b)[None, :]
+        N, M = elevation_a.shape[0], elevation_b.shape[1]
+        angle_sep = np.empty((N, M), dtype=np.float64)
+        step = max(1, chunk_size // max(N, 1))
+        for start in range(0, M, step):
+            chunk = slice(start, start + step)
+            angle_sep[:, chunk] = _great_circle(
+                elevation_a, elevation_b[:, chunk], azimuth_b[:, chunk] - azimuth_a, method
+            )
+    else:
+        angle_sep = _great_circle(elevation_a, elevation_b, azimuth_b - azimuth_a, method)
 
     if degrees:
         angle_sep = np.degrees(angle_sep)
     return angle_sep
+
+
+def _expand_ranges(starts: NDArray, stops: NDArray) -> tuple[NDArray, NDArray]:
+    """Concatenate `arange(starts[i], stops[i])` for all i without a Python loop, returning
+    the index i of the range each value came from and the values."""
+    counts = np.maximum(stops - starts, 0)
+    group = np.repeat(np.arange(counts.size), counts)
+    offsets = np.cumsum(counts) - counts
+    values = np.arange(group.size) - offsets[group] + starts[group]
+    return group, values
+
+
+class SphericalIndex:
+    """Spatial index of directions on the unit sphere for cone searches and nearest
+    neighbour queries.
+
+    The sphere is divided into rings of equal area (i.e. equal steps in $z$) and every ring
+    into equally wide azimuthal pixels, with the number of pixels chosen so that pixels are
+    roughly square. The directions are sorted by pixel so that the directions in a range of
+    pixels along a ring are a contiguous slice. A cone search only visits the pixels that
+    overlap the bounding box of the cone in colatitude and longitude, and the candidates are
+    then tested exactly, so the cost scales with the number of directions close to the cone
+    instead of the size of the catalog. All queries are vectorized over many cones.
+
+    Parameters
+    ----------
+    vectors
+        (3, N) or (3,) directions, normalized on construction.
+    rings
+        Number of rings, defaults to giving about 16 directions per pixel.
+
+    """
+
+    def __init__(self, vectors: NDArray_3xN | NDArray_3, rings: int | None = None) -> None:
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(3, -1)
+        size = vectors.shape[1]
+        if rings is None:
+            rings = max(1, int(np.sqrt(size / 32)))
+        self.rings = rings
+
+        z_edges = np.linspace(1, -1, rings + 1)
+        theta_edges = np.arccos(z_edges)
+        theta_mid = np.arccos(0.5 * (z_edges[:-1] + z_edges[1:]))
+        width = np.diff(theta_edges)
+        ring_pixels = np.round(2 * np.pi * np.sin(theta_mid) / width)
+        self.ring_pixels = np.maximum(1, ring_pixels).astype(np.int64)
+        self.ring_offsets = np.concatenate([[0], np.cumsum(self.ring_pixels)])
+        self.pixels = int(self.ring_offsets[-1])
+
+        unit = vectors / np.linalg.norm(vectors, axis=0)
+        pixel = self.pixel(unit)
+        self.order = np.argsort(pixel, kind="stable")
+        self.vectors = np.ascontiguousarray(unit[:, self.order])
+        self.pixel_start = np.searchsorted(pixel[self.order], np.arange(self.pixels + 1))
+
+    @classmethod
+    def from_az_el(
+        cls,
+        azimuth: NDArray_N,
+        elevation: NDArray_N,
+        degrees: bool = False,
+        rings: int | None = None,
+    ) -> "SphericalIndex":
+        """Build the index from azimuth east of north and elevation from horizon."""
+        return cls(az_el_point(azimuth, elevation, degrees=degrees), rings=rings)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[1]
+
+    def __repr__(self) -> str:
+        return f"SphericalIndex(N={len(self)}, rings={self.rings}, pixels={self.pixels})"
+
+    def _ring(self, z: NDArray) -> NDArray:
+        return np.clip(np.floor((1 - z) * 0.5 * self.rings), 0, self.rings - 1).astype(np.int64)
+
+    def pixel(self, vectors: NDArray_3xN | NDArray_3) -> NDArray_N:
+        """Pixel number of the given (3, N) unit vectors."""
+        vectors = np.asarray(vectors).reshape(3, -1)
+        ring = self._ring(vectors[2])
+        npix = self.ring_pixels[ring]
+        phi = np.mod(np.arctan2(vectors[1], vectors[0]), 2 * np.pi)
+        pix = np.minimum(np.floor(phi / (2 * np.pi) * npix).astype(np.int64), npix - 1)
+        return self.ring_offsets[ring] + pix
+
+    def cone_search(
+        self,
+        centers: NDArray_3xN | NDArray_3,
+        radius: NDArray_N | float,
+        degrees: bool = False,
+    ) -> tuple[NDArray_N, NDArray_N, NDArray_N]:
+        """Find all directions within `radius` of the cone centers.
+
+        Parameters
+        ----------
+        centers
+            (3, K) or (3,) cone axes, need not be normalized.
+        radius
+            Cone half-angle, a scalar or one per cone.
+        degrees
+            If :code:`True` all input/output angles are in degrees, else they are in radians.
+
+        Returns
+        -------
+        tuple of NDArray
+            `(cone_ind, ind, angles)` of every direction `ind` (into the directions the index
+            was built from) inside the cone `cone_ind`, sorted by cone and then direction,
+            together with the angle between them.
+
+        """
+        centers = np.asarray(centers, dtype=np.float64).reshape(3, -1)
+        centers = centers / np.linalg.norm(centers, axis=0)
+        size = centers.shape[1]
+        radius = np.broadcast_to(
+            np.radians(radius) if degrees else np.asarray(radius, dtype=np.float64), size
+        )
+
+        # colatitude and longitude bounding box of each cone, padded against round-off
+        theta = np.arccos(np.clip(centers[2], -1, 1))
+        phi = np.mod(np.arctan2(centers[1], centers[0]), 2 * np.pi)
+        search = radius + 1e-9
+        ring_lo = self._ring(np.cos(np.clip(theta - search, 0, np.pi)))
+        ring_hi = self._ring(np.cos(np.clip(theta + search, 0, np.pi)))
+        full = (theta - search <= 0) | (theta + search >= np.pi) | (search >= np.pi / 2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dphi = np.where(
+                full, np.pi, np.arcsin(np.minimum(np.sin(search) / np.sin(theta), 1)) + 1e-9
+            )
+
+        # one entry per visited (cone, ring), split into at most two pixel ranges at the 2 pi wrap
+        cone, ring = _expand_ranges(ring_lo, ring_hi + 1)
+        npix = self.ring_pixels[ring]
+        pix_lo = np.floor((phi[cone] - dphi[cone]) / (2 * np.pi) * npix).astype(np.int64)
+        pix_hi = np.floor((phi[cone] + dphi[cone]) / (2 * np.pi) * npix).astype(np.int64)
+        count = np.minimum(pix_hi - pix_lo + 1, npix)
+        count[full[cone]] = npix[full[cone]]
+        pix_lo = np.where(count == npix, 0, np.mod(pix_lo, npix))
+        first_end = np.minimum(pix_lo + count, npix)
+        wrap_end = pix_lo + count - npix
+
+        offset = self.ring_offsets[ring]
+        starts = self.pixel_start[np.concatenate([offset + pix_lo, offset])]
+        stops = self.pixel_start[
+            np.concatenate([offset + first_end, offset + np.maximum(wrap_end, 0)])
+        ]
+        pair, cand = _expand_ranges(starts, stops)
+        cand_cone = np.concatenate([cone, cone])[pair]
+
+        # exact test on the chord length, accurate also for small angles
+        chord = np.linalg.norm(self.vectors[:, cand] - centers[:, cand_cone], axis=0)
+        angles = 2 * np.arcsin(np.minimum(chord * 0.5, 1))
+        keep = angles <= radius[cand_cone]
+        cand_cone, ind, angles = cand_cone[keep], self.order[cand[keep]], angles[keep]
+
+        srt = np.lexsort((ind, cand_cone))
+        angles = angles[srt]
+        if degrees:
+            angles = np.degrees(angles)
+        return cand_cone[srt], ind[srt], angles
+
+    def query(
+        self,
+        vectors: NDArray_3xN | NDArray_3,
+        k: int = 1,
+        degrees: bool = False,
+    ) -> tuple[NDArray, NDArray]:
+        """Find the `k` nearest directions to each query direction.
+
+        The search starts with a cone about the size of a pixel and the radius is doubled
+        for the queries that have not yet found `k` directions.
+
+        Parameters
+        ----------
+        vectors
+            (3, K) or (3,) query directions.
+        k
+            Number of neighbours.
+        degrees
+            If :code:`True` the output angles are in degrees, else they are in radians.
+
+        Returns
+        -------
+        tuple of NDArray
+            `(angles, ind)` both of shape (k, K), ordered from the nearest neighbour.
+
+        """
+        if k < 1 or k > len(self):
+            raise ValueError(f"k={k} must be between 1 and the number of directions {len(self)}")
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(3, -1)
+        size = vectors.shape[1]
+        angles = np.empty((k, size), dtype=np.float64)
+        ind = np.empty((k, size), dtype=np.int64)
+
+        todo = np.arange(size)
+        radius = np.sqrt(4 * np.pi / self.pixels * k)
+        while todo.size > 0:
+            cone, cand, dist = self.cone_search(vectors[:, todo], min(radius, np.pi))
+            counts = np.bincount(cone, minlength=todo.size)
+            done = (counts >= k) | (radius >= np.pi)
+            select = done[cone]
+            cone, cand, dist = cone[select], cand[select], dist[select]
+
+            srt = np.lexsort((dist, cone))
+            cone, cand, dist = cone[srt], cand[srt], dist[srt]
+            counts = np.where(done, counts, 0)
+            rank = np.arange(cone.size) - (np.cumsum(counts) - counts)[cone]
+            select = rank < k
+            angles[rank[select], todo[cone[select]]] = dist[select]
+            ind[rank[select], todo[cone[select]]] = cand[select]
+
+            todo = todo[~done]
+            radius *= 2
+
+        if degrees:
+            angles = np.degrees(angles)
+        return angles, ind
@@ -1,10 +1,34 @@
+"""Direct interaction with JPL SPK kernels.
+
+The `get_solarsystem_body_states` function uses `jplephem` to evaluate the kernel while the
+`MemmapSPK` reader and `get_solarsystem_body_states_native` only depend on numpy and can be used
+in deployments where neither `jplephem` nor `astropy` are available.
+"""
+
 from collections import OrderedDict
+import struct
 import numpy as np
 import numpy.typing as npt
-from jplephem.spk import SPK
-from astropy.time import Time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional, Callable, TYPE_CHECKING
+
+try:
+    from jplephem.spk import SPK
+except ImportError:
+    SPK = None  # type: ignore
+
+if TYPE_CHECKING:
+    from astropy.time import Time
+
+from .types import NDArray_N, NDArray_3xN, NDArray_6xN, NDArray_6
+from .interpolation import Legendre8, chebyshev_clenshaw, chebyshev_clenshaw_and_differentiate
+from .parallel import epoch_pool_map
+
+J2000_JD: float = 2451545.0
+"""Julian date of the J2000 epoch, the zero point of the ephemeris time (ET) used in SPK files."""
+
+SECONDS_PER_DAY: float = 86400.0
+"""Number of seconds per day, the ephemeris time is counted in TDB seconds."""
 
 """Mapping from body name to integer id's used by the kernels.
 
@@ -27,51 +51,496 @@ BODY_NAME_TO_KERNEL_SPEC = OrderedDict(
     ]
 )
 
+DAF_RECORD_LENGTH = 1024
+"""Length in bytes of a record in a DAF file."""
+DAF_RECORD_DOUBLES = DAF_RECORD_LENGTH // 8
+"""Number of doubles per record in a DAF file."""
+DAF_FORMATS = {b"LTL-IEEE": "<", b"BIG-IEEE": ">"}
+"""Mapping from the binary format identifier of a DAF file to the struct byte order."""
+
 
 def get_solarsystem_body_states(
-    bodies: list[str], epoch: Time, kernel: str, units: Optional[list] = None
+    bodies: list[str],
+    epoch: "Time",
+    kernel: str,
+    units: Optional[list] = None,
+    workers: Optional[int] = None,
 ) -> dict[str, npt.NDArray[np.float64]]:
     """Open a kernel file and get the statates of the given bodies at epoch in ICRS.
 
+    Returns (6,) states for scalar epochs and (6, N) states for vector epochs. If `workers` is
+    given, vector epochs are split across a process pool where each worker opens the kernel
+    independently, see `parallel.epoch_pool_map`. The `units` are a length factor and a time
+    divisor applied to the kernel positions in km and velocities in km/day, the default
+    :code:`[1e3, 86400.0]` gives SI units.
+
     Note: All outputs from kernel computations are in the Barycentric (ICRS) "eternal" frame.
     """
     assert SPK is not None, "jplephem package needed to directly interact with kernels"
-    states = {}
+    for body in bodies:
+        if body.lower().strip() not in BODY_NAME_TO_KERNEL_SPEC:
+            raise ValueError(f'Body name "{body}" not recognized')
+
+    epoch_ = epoch.tdb  # jplephem uses Barycentric Dynamical Time (TDB)
+    jd1 = np.atleast_1d(epoch_.jd1).astype(np.float64)
+    jd2 = np.atleast_1d(epoch_.jd2).astype(np.float64)
+
+    if workers is None or workers < 2 or epoch.size < 2:
+        all_states = _kernel_body_states(jd1, jd2, bodies, kernel, units)
+    else:
+        all_states = epoch_pool_map(
+            _kernel_body_states,
+            (jd1, jd2),
+            (len(bodies), 6, epoch.size),
+            workers,
+            args=(bodies, kernel, units),
+        )
+
+    shape: tuple[int, ...] = (6,) if epoch.isscalar else (6, epoch.size)
+    return {body: all_states[ind, ...].reshape(shape) for ind, body in enumerate(bodies)}
+
+
+def _kernel_body_states(
+    jd1: NDArray_N,
+    jd2: NDArray_N,
+    bodies: list[str],
+    kernel: str,
+    units: Optional[list],
+) -> npt.NDArray[np.float64]:
+    """Compute (len(bodies), 6, N) states for the (N,) TDB julian dates using jplephem."""
+    states = np.zeros((len(bodies), 6, jd1.size), dtype=np.float64)
 
     kernel_spk = SPK.open(kernel)
+    try:
+        for ind, body in enumerate(bodies):
+            body_ = body.lower().strip()
 
-    epoch_ = epoch.tdb  # jplephem uses Barycentric Dynamical Time (TDB)
-    jd1, jd2 = epoch_.jd1, epoch_.jd2
+            # if there are multiple steps to go from states to
+            # ICRS barycentric, iterate trough and combine
+            for pair in BODY_NAME_TO_KERNEL_SPEC[body_]:
+                spk = kernel_spk[pair]
+                if spk.data_type == 3:
+                    # Type 3 kernels contain both position and velocity.
+                    states[ind, ...] += spk.compute(jd1, jd2)
+                else:
+                    pos_, vel_ = spk.compute_and_differentiate(jd1, jd2)
+                    states[ind, :3, :] += pos_
+                    states[ind, 3:, :] += vel_
+    finally:
+        kernel_spk.close()
 
-    for body in bodies:
-        body_ = body.lower().strip()
+    # units from kernels are usually in km and km/day
+    if units is None:
+        states *= 1e3
+        states[:, 3:, :] /= 86400.0
+    else:
+        states *= units[0]
+        states[:, 3:, :] /= units[1]
 
-        if body_ not in BODY_NAME_TO_KERNEL_SPEC:
-            raise ValueError(f'Body name "{body}" not recognized')
+    return states
 
-        states[body] = np.zeros((6,), dtype=np.float64)
 
-        # if there are multiple steps to go from states to
-        # ICRS barycentric, iterate trough and combine
-        for pair in BODY_NAME_TO_KERNEL_SPEC[body_]:
-            spk = kernel_spk[pair]
-            if spk.data_type == 3:
-                # Type 3 kernels contain both position and velocity.
-                posvel = spk.compute(jd1, jd2).flatten()
-            else:
-                pos_, vel_ = spk.compute_and_differentiate(jd1, jd2)
-                posvel = np.zeros((6,), dtype=np.float64)
-                posvel[:3] = pos_
-                posvel[3:] = vel_
+def jd_to_et(jd1: NDArray_N | float, jd2: NDArray_N | float = 0.0) -> NDArray_N | float:
+    """Convert a (two part) TDB Julian date to ephemeris time (ET), i.e. TDB seconds past J2000.
 
-            states[body] += posvel
+    The two parts are kept separate until the final sum to retain precision.
+    """
+    return ((jd1 - J2000_JD) + jd2) * SECONDS_PER_DAY
 
-        # units from kernels are usually in km and km/day
-        if units is None:
-            states[body] *= 1e3
-            states[body][3:] /= 86400.0
+
+class MemmapSegment:
+    """A type 2 or type 3 (Chebyshev) segment of a memory-mapped SPK file.
+
+    The segment coefficients are never read into memory, instead the records needed for a
+    query are located by direct index arithmetic on the memory-map.
+
+    Parameters
+    ----------
+    data
+        Memory-mapped array of all doubles in the file.
+    summary
+        Tuple of (start_second, end_second, target, center, frame, data_type, start_i, end_i)
+        as stored in the DAF segment summary.
+    name
+        Segment name as stored in the DAF name record.
+    """
+
+    def __init__(self, data: npt.NDArray, summary: tuple, name: str = "") -> None:
+        (
+            self.start_second,
+            self.end_second,
+            self.target,
+            self.center,
+            self.frame,
+            self.data_type,
+            self.start_i,
+            self.end_i,
+        ) = summary
+        self.name = name
+
+        if self.data_type == 2:
+            self.components = 3
+        elif self.data_type == 3:
+            self.components = 6
+        else:
+            raise ValueError(f"SPK data type {self.data_type} not supported, only type 2 and 3")
+
+        init, intlen, rsize, n = data[self.end_i - 4:self.end_i]
+        self.init = float(init)
+        self.intlen = float(intlen)
+        self.rsize = int(rsize)
+        self.records = int(n)
+        self.coefficient_count = (self.rsize - 2) // self.components
+        self.data = data[self.start_i - 1:self.start_i - 1 + self.records * self.rsize].reshape(
+            self.records, self.rsize
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"MemmapSegment(center={self.center}, target={self.target}, "
+            f"type={self.data_type}, records={self.records})"
+        )
+
+    def _locate(self, et: NDArray_N) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+        if np.any((et < self.start_second) | (et > self.end_second)):
+            raise ValueError(
+                f"Epochs outside of segment coverage [{self.start_second}, {self.end_second}] ET"
+            )
+        index = np.floor((et - self.init) / self.intlen).astype(np.int64)
+        # the final epoch, and epochs a few ulp below it after rounding, belong to the last record
+        index = np.minimum(index, self.records - 1)
+
+        records = self.data[index, :]
+        s = (et - records[:, 0]) / records[:, 1]
+        coefficients = records[:, 2:].reshape(len(et), self.components, self.coefficient_count)
+        return coefficients, s, records[:, 1]
+
+    def compute(self, et: NDArray_N | float) -> NDArray_3xN:
+        """Compute the position components at ephemeris time(s) `et` [s past J2000 TDB].
+
+        Returns
+        -------
+            (3, N) or (3,) positions, usually in km.
+        """
+        et_ = np.atleast_1d(np.asarray(et, dtype=np.float64))
+        coefficients, s, _ = self._locate(et_)
+        pos = chebyshev_clenshaw(coefficients[:, :3, :], s)
+        pos = pos.T
+        if np.ndim(et) == 0:
+            pos = pos[:, 0]
+        return pos
+
+    def compute_and_differentiate(self, et: NDArray_N | float) -> NDArray_6xN:
+        """Compute the position and velocity at ephemeris time(s) `et` [s past J2000 TDB].
+
+        For type 2 segments the velocity is the analytic derivative of the position polynomial,
+        for type 3 segments the velocity is evaluated from its own stored polynomial.
+
+        Returns
+        -------
+            (6, N) or (6,) states, usually in km and km/s.
+        """
+        et_ = np.atleast_1d(np.asarray(et, dtype=np.float64))
+        coefficients, s, radius = self._locate(et_)
+        state = np.empty((6, len(et_)), dtype=np.float64)
+        if self.data_type == 3:
+            state[...] = chebyshev_clenshaw(coefficients, s).T
         else:
-            states[body] *= units[0]
-            states[body][3:] /= units[1]
+            pos, dpos = chebyshev_clenshaw_and_differentiate(coefficients, s)
+            state[:3, :] = pos.T
+            state[3:, :] = dpos.T / radius[None, :]
+        if np.ndim(et) == 0:
+            state = state[:, 0]
+        return state
+
+
+class MemmapSPK:
+    """Dependency free reader of DAF/SPK files with type 2 and 3 segments using `np.memmap`.
+
+    Parameters
+    ----------
+    path
+        Path to the SPK kernel file.
+
+    Notes
+    -----
+    Segments of other data types than 2 and 3 are skipped when reading the segment summaries.
+
+    Examples
+    --------
+    >>> with MemmapSPK("de440s.bsp") as kernel:  # doctest: +SKIP
+    ...     states = kernel[0, 3].compute_and_differentiate(et)
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            file_record = fh.read(DAF_RECORD_LENGTH)
+
+        locidw = file_record[:8].upper().rstrip()
+        if not locidw.startswith(b"DAF/"):
+            raise ValueError(f"File starts with {locidw!r}, not a supported DAF file")
+        locfmt = file_record[88:96]
+        if locfmt not in DAF_FORMATS:
+            raise ValueError(f"Unknown DAF binary format {locfmt!r}")
+        self.endian = DAF_FORMATS[locfmt]
+
+        self.nd, self.ni = struct.unpack(self.endian + "ii", file_record[8:16])
+        (self.fward,) = struct.unpack(self.endian + "i", file_record[76:80])
+
+        self.data = np.memmap(self.path, dtype=np.dtype(self.endian + "f8"), mode="r")
+        self.segments = self._read_summaries()
+        self.pairs = {(seg.center, seg.target): seg for seg in self.segments}
+
+    def _read_summaries(self) -> list[MemmapSegment]:
+        summary_doubles = self.nd + (self.ni + 1) // 2
+        int_format = self.endian + "i" * self.ni
+
+        segments = []
+        record = self.fward
+        while record > 0:
+            start = (record - 1) * DAF_RECORD_DOUBLES
+            control = self.data[start:start + 3]
+            names = bytes(self.data[start + DAF_RECORD_DOUBLES:start + 2 * DAF_RECORD_DOUBLES])
+
+            for ind in range(int(control[2])):
+                sstart = start + 3 + ind * summary_doubles
+                summary_data = self.data[sstart:sstart + summary_doubles]
+                floats = tuple(float(x) for x in summary_data[: self.nd])
+                ints = struct.unpack(int_format, bytes(summary_data[self.nd:])[: 4 * self.ni])
+                if ints[3] not in (2, 3):
+                    continue
+                name = names[ind * 8 * summary_doubles:(ind + 1) * 8 * summary_doubles]
+                segments.append(
+                    MemmapSegment(self.data, floats + ints, name.decode("ascii", "replace").strip())
+                )
+            record = int(control[0])
+        return segments
+
+    def __getitem__(self, key: tuple[int, int]) -> MemmapSegment:
+        """Get the segment for a given (center, target) pair."""
+        return self.pairs[key]
+
+    def __enter__(self) -> "MemmapSPK":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release all references to the memory-map of the file."""
+        self.segments = []
+        self.pairs = {}
+        del self.data
+
+
+def get_solarsystem_body_states_native(
+    bodies: list[str], et: NDArray_N | float, kernel: str | Path, units: Optional[list] = None
+) -> dict[str, npt.NDArray[np.float64]]:
+    """Get the states of the given bodies at ephemeris time `et` in ICRS using only numpy.
+
+    Parameters
+    ----------
+    bodies
+        Names of the bodies, see `BODY_NAME_TO_KERNEL_SPEC`.
+    et
+        Ephemeris time(s), TDB seconds past J2000, see `jd_to_et`.
+    kernel
+        Path to the SPK kernel file.
+    units
+        Length factor and time divisor applied to the kernel positions in km and velocities in
+        km/day, as in `get_solarsystem_body_states`, the default :code:`[1e3, 86400.0]` gives
+        SI units.
+
+    Returns
+    -------
+        Dictionary of (6,) or (6, N) states for each body.
+
+    """
+    states = {}
+    with MemmapSPK(kernel) as kernel_spk:
+        for body in bodies:
+            body_ = body.lower().strip()
+
+            if body_ not in BODY_NAME_TO_KERNEL_SPEC:
+                raise ValueError(f'Body name "{body}" not recognized')
+
+            posvel = sum(
+                kernel_spk[pair].compute_and_differentiate(et)
+                for pair in BODY_NAME_TO_KERNEL_SPEC[body_]
+            )
+            states[body] = np.asarray(posvel, dtype=np.float64)
+
+            if units is None:
+                states[body] *= 1e3
+            else:
+                # the segments give km/s, the units are defined relative to km/day
+                states[body] *= units[0]
+                states[body][3:] *= SECONDS_PER_DAY / units[1]
 
     return states
+
+
+class EphemerisTable(Legendre8):
+    """Precomputed table of body states on a uniform ephemeris time grid that serves arbitrary
+    time queries through order-8 Legendre interpolation, see `interpolation.legendre8`.
+
+    The table is built once by sampling a full accuracy ephemeris, e.g. with `from_kernel` or
+    `from_astropy`, after which queries only cost a table lookup and a 9-point interpolation.
+
+    Parameters
+    ----------
+    states
+        (6, M) array of sampled states.
+    t
+        (M,) vector of uniformly spaced ephemeris times [s past J2000 TDB].
+    error_bound
+        (6,) vector of the maximum absolute interpolation error for each state component,
+        see `estimate_error`.
+    body
+        Name of the tabulated body.
+
+    Notes
+    -----
+    Saved layout
+        Tables are saved and loaded with `Interpolator.save` and `Interpolator.load`, the
+        `error_bound` is stored as an extra `error_bound.npy` array and the `body` as a
+        parameter. Loading with `mmap=True` keeps the state table on disk.
+    """
+
+    def __init__(
+        self,
+        states: NDArray_6xN,
+        t: NDArray_N,
+        error_bound: Optional[NDArray_6] = None,
+        body: str = "",
+    ) -> None:
+        super().__init__(states, t)
+        self.body = body
+        self.error_bound = np.full((6,), np.nan) if error_bound is None else np.asarray(error_bound)
+
+    @property
+    def step(self) -> float:
+        """Time between table samples [s]."""
+        return float(self.t[1] - self.t[0])
+
+    def get_state(self, t: npt.NDArray, derivative: int = 0) -> npt.NDArray:
+        t = np.atleast_1d(t)
+        if np.any(t < self.t[0]) or np.any(t > self.t[-1]):
+            raise ValueError(
+                f"Query times outside of table coverage [{self.t[0]}, {self.t[-1]}] ET"
+            )
+        return super().get_state(t, derivative=derivative)
+
+    @classmethod
+    def from_function(
+        cls,
+        sampler: Callable[[NDArray_N], NDArray_6xN],
+        t_start: float,
+        t_end: float,
+        step: float,
+        validate: bool = True,
+        body: str = "",
+    ) -> "EphemerisTable":
+        """Sample `sampler(t)` on a uniform grid from `t_start` to (at least) `t_end`.
+
+        If `validate` is `True` the source is also sampled at all interval mid-points to
+        estimate the error bound, see `estimate_error`.
+        """
+        num = int(np.ceil((t_end - t_start) / step)) + 1
+        t = t_start + step * np.arange(max(num, 9), dtype=np.float64)
+        table = cls(sampler(t), t, body=body)
+        if validate:
+            table.estimate_error(sampler)
+        return table
+
+    @classmethod
+    def from_kernel(
+        cls,
+        body: str,
+        t_start: float,
+        t_end: float,
+        step: float,
+        kernel: str | Path,
+        native: bool = True,
+        validate: bool = True,
+    ) -> "EphemerisTable":
+        """Tabulate the ICRS state of `body` using `get_solarsystem_body_states_native` or, if
+        `native` is `False`, `get_solarsystem_body_states`.
+        """
+
+        def sampler(t: NDArray_N) -> NDArray_6xN:
+            if native:
+                return get_solarsystem_body_states_native([body], t, kernel)[body]
+            else:
+                return get_solarsystem_body_states([body], et_to_time(t), str(kernel))[body]
+
+        return cls.from_function(sampler, t_start, t_end, step, validate=validate, body=body)
+
+    @classmethod
+    def from_astropy(
+        cls,
+        body: str,
+        t_start: float,
+        t_end: float,
+        step: float,
+        kernel_dir: Path,
+        ephemeris: str = "jpl",
+        validate: bool = True,
+    ) -> "EphemerisTable":
+        """Tabulate the ICRS state of `body` using `celestial.astropy_get_body`."""
+        from .celestial import astropy_get_body
+
+        def sampler(t: NDArray_N) -> NDArray_6xN:
+            return astropy_get_body(body, et_to_time(t), kernel_dir, ephemeris=ephemeris)
+
+        return cls.from_function(sampler, t_start, t_end, step, validate=validate, body=body)
+
+    def estimate_error(self, sampler: Callable[[NDArray_N], NDArray_6xN]) -> NDArray_6:
+        """Estimate and set the `error_bound` by comparing the table against `sampler` at all
+        interval mid-points.
+
+        The interpolation error is proportional to the nodal polynomial
+        $\\omega(u) = \\prod_{k=0}^{8} (u - k)$ of the window. For interior intervals the window
+        switches at the interval mid-point, where $|\\omega|$ is largest, so the mid-point error
+        is the bound. In the first and last 4 intervals the window is clipped and the mid-point
+        error is scaled by the ratio of the maximum of $|\\omega|$ over the interval to its
+        mid-point value. An allowance for floating point round-off is also added.
+        """
+        M = self.t.size
+        t_mid = self.t[:-1] + 0.5 * self.step
+        err = np.abs(self.get_state(t_mid) - sampler(t_mid))
+
+        k = np.arange(M - 1)
+        edge = (k < 4) | (k > M - 6)
+        j = k[edge] - np.where(k[edge] < 4, 0, M - 9)
+        u = j[:, None] + np.linspace(0, 1, 65)[None, :]
+        omega_max = np.max(np.abs(np.prod(u[..., None] - np.arange(9), axis=-1)), axis=1)
+        omega_mid = np.abs(np.prod(j[:, None] + 0.5 - np.arange(9), axis=1))
+        err[:, edge] *= omega_max / omega_mid
+
+        roundoff = 16 * np.finfo(np.float64).eps * np.max(np.abs(self.states), axis=1)
+        self.error_bound = np.max(err, axis=1) + roundoff
+        return self.error_bound
+
+    def _saved_arrays(self) -> dict[str, npt.NDArray]:
+        return {**super()._saved_arrays(), "error_bound": self.error_bound}
+
+    def _saved_params(self) -> dict[str, Any]:
+        return {"body": self.body}
+
+    @classmethod
+    def _from_saved(
+        cls, arrays: dict[str, npt.NDArray], params: dict[str, Any]
+    ) -> "EphemerisTable":
+        return cls(
+            arrays["states"], arrays["t"], error_bound=np.array(arrays["error_bound"]), **params
+        )
+
+
+def et_to_time(et: NDArray_N | float) -> "Time":
+    """Convert ephemeris time(s) to an `astropy.time.Time` in the TDB scale."""
+    from astropy.time import Time
+
+    et_ = np.asarray(et, dtype=np.float64)
+    return Time(np.full(et_.shape, J2000_JD), et_ / SECONDS_PER_DAY, format="jd", scale="tdb")
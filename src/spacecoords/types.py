@@ -2,6 +2,7 @@
 This module contains convenient type information so that typing can be precise
 but not too verbose in the code itself.
 """
+
 from typing import TypeVar
 import numpy.typing as npt
 
@@ -16,6 +17,9 @@ NDArray_3 = npt.NDArray
 NDArray_6 = npt.NDArray
 "(6,) shaped ndarray"
 
+NDArray_2xN = npt.NDArray
+"(2,n) shaped ndarray"
+
 NDArray_3xN = npt.NDArray
 "(3,n) shaped ndarray"
 
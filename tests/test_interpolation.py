@@ -0,0 +1,482 @@
+#!/usr/bin/env python
+
+""" """
+
+import pathlib
+import tempfile
+import unittest
+import numpy as np
+import numpy.testing as nt
+
+from spacecoords import interpolation
+
+
+def polynomial_states(t, order):
+    return np.stack([(t / 10.0) ** k for k in range(order + 1)] + [np.cos(t)] * (5 - order), axis=0)
+
+
+def orbit_states(t, period=5800.0, radius=7e6):
+    w = 2 * np.pi / period
+    states = np.zeros((6, len(t)))
+    states[0] = radius * np.cos(w * t)
+    states[1] = radius * np.sin(w * t)
+    states[3] = -radius * w * np.sin(w * t)
+    states[4] = radius * w * np.cos(w * t)
+    return states
+
+
+def position_velocity_polynomial(t, degree):
+    coefs = np.arange(1, degree + 2) / 10.0
+    states = np.zeros((6, len(t)))
+    states[0] = np.polynomial.polynomial.polyval(t, coefs)
+    states[3] = np.polynomial.polynomial.polyval(t, np.polynomial.polynomial.polyder(coefs))
+    return states
+
+
+class TestLinear(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1234)
+        self.t_irregular = np.cumsum(rng.uniform(0.1, 2.0, size=200))
+        self.t_regular = np.linspace(0, 100, 201)
+        self.states = rng.normal(size=(6, 200))
+
+    def reference(self, states, t_samp, t):
+        return np.stack([np.interp(t, t_samp, x) for x in states], axis=0)
+
+    def test_irregular(self):
+        interp = interpolation.Linear(self.states, self.t_irregular)
+        self.assertFalse(interp.regular)
+        t = np.linspace(self.t_irregular[0], self.t_irregular[-1], 1001)
+        nt.assert_allclose(interp.get_state(t), self.reference(self.states, self.t_irregular, t))
+
+    def test_regular(self):
+        states = np.cos(self.t_regular)[None, :] * np.arange(1, 7)[:, None]
+        interp = interpolation.Linear(states, self.t_regular)
+        self.assertTrue(interp.regular)
+        t = np.random.default_rng(3).uniform(0, 100, size=1001)
+        nt.assert_allclose(
+            interp.get_state(t), self.reference(states, self.t_regular, t), atol=1e-12
+        )
+
+    def test_sample_points(self):
+        interp = interpolation.Linear(self.states, self.t_irregular)
+        nt.assert_allclose(interp.get_state(self.t_irregular), self.states, atol=1e-12)
+
+    def test_out_of_range(self):
+        interp = interpolation.Linear(self.states, self.t_irregular)
+        with self.assertRaises(ValueError):
+            interp.get_state(np.array([self.t_irregular[0] - 1e-3]))
+        with self.assertRaises(ValueError):
+            interp.get_state(np.array([self.t_irregular[-1] + 1e-3]))
+
+    def test_unsorted_samples(self):
+        with self.assertRaises(ValueError):
+            interpolation.Linear(self.states, self.t_irregular[::-1])
+
+
+class TestLegendre8(unittest.TestCase):
+
+    def test_polynomial_exact(self):
+        t_samp = np.linspace(0, 50, 51)
+        states = polynomial_states(t_samp, 5)
+        interp = interpolation.Legendre8(states, t_samp)
+        t = np.random.default_rng(5).uniform(0, 50, size=300)
+        nt.assert_allclose(
+            interp.get_state(t)[:6], polynomial_states(t, 5)[:6], rtol=1e-9, atol=1e-9
+        )
+
+    def test_strategies_agree(self):
+        rng = np.random.default_rng(9)
+        table = rng.normal(size=(500, 6))
+        t_samp = np.linspace(10.0, 20.0, 500)
+        t = np.concatenate([rng.uniform(10.0, 20.0, size=400), t_samp[[0, 7, 250, 499]]])
+        ref = interpolation.legendre8_loop(table, 10.0, 20.0, t)
+        for method in ["auto", "intervals", "gather"]:
+            res = interpolation.legendre8(table, 10.0, 20.0, t, method=method)
+            nt.assert_allclose(res, ref, rtol=1e-10, atol=1e-10)
+        res = interpolation.legendre8_gather(table, 10.0, 20.0, t, chunk_size=7)
+        nt.assert_allclose(res, ref, rtol=1e-10, atol=1e-10)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            interpolation.legendre8(np.zeros((10, 3)), 0.0, 1.0, np.array([0.5]), method="spline")
+
+
+class TestHermite(unittest.TestCase):
+
+    def test_polynomial_exact(self):
+        t_samp = np.cumsum(np.random.default_rng(4).uniform(0.5, 1.5, size=12))
+        t = np.linspace(t_samp[0], t_samp[-1], 333)
+        for order in [3, 5, 7]:
+            states = position_velocity_polynomial(t_samp, order)
+            interp = interpolation.Hermite(states, t_samp, order=order)
+            ref = position_velocity_polynomial(t, order)
+            nt.assert_allclose(interp.get_state(t), ref, rtol=1e-8, atol=1e-8)
+
+    def test_sample_points(self):
+        t_samp = np.linspace(0, 6000, 51)
+        states = orbit_states(t_samp)
+        interp = interpolation.Hermite(states, t_samp, order=5)
+        nt.assert_allclose(interp.get_state(t_samp), states, atol=1e-6)
+
+    def test_sparser_than_linear(self):
+        t_samp = np.linspace(0, 6000, 51)
+        t = np.linspace(0, 6000, 2001)
+        ref = orbit_states(t)
+        err_lin = np.abs(
+            interpolation.Linear(orbit_states(t_samp), t_samp).get_state(t) - ref
+        ).max()
+        err_herm = np.abs(
+            interpolation.Hermite(orbit_states(t_samp), t_samp).get_state(t) - ref
+        ).max()
+        err_herm5 = np.abs(
+            interpolation.Hermite(orbit_states(t_samp), t_samp, order=5).get_state(t) - ref
+        ).max()
+        self.assertLess(err_herm, err_lin * 1e-2)
+        self.assertLess(err_herm5, err_herm * 1e-1)
+
+    def test_invalid_order(self):
+        with self.assertRaises(ValueError):
+            interpolation.Hermite(np.zeros((6, 10)), np.arange(10.0), order=4)
+
+
+class TestLagrange(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(77)
+        self.t_samp = np.cumsum(rng.uniform(0.5, 1.5, size=60))
+
+    def test_polynomial_exact(self):
+        t = np.linspace(self.t_samp[0], self.t_samp[-1], 500)
+        for order in [1, 4, 8, 11]:
+            interp = interpolation.Lagrange(
+                polynomial_states(self.t_samp, 5), self.t_samp, order=order
+            )
+            res = interp.get_state(t)
+            ref = polynomial_states(t, 5)
+            deg = min(order, 5)
+            nt.assert_allclose(res[: deg + 1], ref[: deg + 1], rtol=1e-8, atol=1e-8)
+
+    def test_sample_points(self):
+        states = np.random.default_rng(3).normal(size=(6, self.t_samp.size))
+        interp = interpolation.Lagrange(states, self.t_samp, order=6)
+        nt.assert_allclose(interp.get_state(self.t_samp), states)
+
+    def test_legendre8_correspondence(self):
+        t_samp = np.linspace(0, 20, 41)
+        states = np.sin(t_samp)[None, :] * np.arange(1, 7)[:, None]
+        t = np.linspace(0, 20, 301)
+        res = interpolation.Lagrange(states, t_samp, order=8).get_state(t)
+        ref = interpolation.Legendre8(states, t_samp).get_state(t)
+        nt.assert_allclose(res, ref, atol=1e-6)
+
+    def test_gaps(self):
+        t_samp = np.concatenate([np.arange(20.0), 100.0 + np.arange(20.0)])
+        states = polynomial_states(t_samp, 3)
+        interp = interpolation.Lagrange(states, t_samp, order=4)
+        self.assertEqual(np.sum(interp.gaps), 1)
+
+        t = np.concatenate([np.linspace(0, 19, 50), np.linspace(100, 119, 50)])
+        nt.assert_allclose(
+            interp.get_state(t)[:4], polynomial_states(t, 3)[:4], rtol=1e-9, atol=1e-9
+        )
+        with self.assertRaises(ValueError):
+            interp.get_state(np.array([50.0]))
+
+        interp = interpolation.Lagrange(states, t_samp, order=4, max_step=100.0)
+        self.assertEqual(np.sum(interp.gaps), 0)
+        interp.get_state(np.array([50.0]))
+
+
+class TestStreamingLagrange(unittest.TestCase):
+
+    def test_append_and_evict(self):
+        stream = interpolation.StreamingLagrange(capacity=10, order=3)
+        t = np.arange(25.0)
+        states = polynomial_states(t, 3)
+        stream.append(states[:, :4], t[:4])
+        self.assertEqual(len(stream), 4)
+        for ind in range(4, 25, 3):
+            stream.append(states[:, ind:ind + 3], t[ind:ind + 3])
+        self.assertEqual(len(stream), 10)
+        nt.assert_array_equal(stream.t, t[-10:])
+        nt.assert_array_equal(stream.states, states[:, -10:])
+
+        stream.append(states[:, :1] * 0, np.array([100.0]))
+        nt.assert_array_equal(stream.t, np.concatenate([t[-9:], [100.0]]))
+
+    def test_large_batch(self):
+        stream = interpolation.StreamingLagrange(capacity=8, order=3)
+        t = np.arange(20.0)
+        stream.append(polynomial_states(t, 3), t)
+        nt.assert_array_equal(stream.t, t[-8:])
+
+    def test_interpolation(self):
+        stream = interpolation.StreamingLagrange(capacity=16, order=3, max_extrapolation=0.5)
+        t = np.arange(40.0) * 0.5
+        states = polynomial_states(t, 3)
+        for ind in range(0, 40, 5):
+            stream.append(states[:, ind:ind + 5], t[ind:ind + 5])
+            query = np.linspace(stream.t[0], stream.t[-1] + 0.5, 31)
+            res = stream.get_state(query)
+            nt.assert_allclose(res[:4], polynomial_states(query, 3)[:4], rtol=1e-9, atol=1e-9)
+            buffer_id = id(stream._states)
+        self.assertEqual(id(stream._states), buffer_id)
+
+        with self.assertRaises(ValueError):
+            stream.get_state(np.array([stream.t[0] - 1]))
+        with self.assertRaises(ValueError):
+            stream.get_state(np.array([stream.t[-1] + 1]))
+
+    def test_non_increasing_append(self):
+        stream = interpolation.StreamingLagrange(capacity=8, order=3)
+        stream.append(np.zeros((6, 3)), np.arange(3.0))
+        with self.assertRaises(ValueError):
+            stream.append(np.zeros((6, 1)), np.array([1.0]))
+
+
+class TestChebyshev(unittest.TestCase):
+
+    def test_fit(self):
+        t_samp = np.linspace(0, 86400.0, 86400 // 10 + 1)
+        source = interpolation.Legendre8(orbit_states(t_samp), t_samp)
+        tolerance = np.array([1.0, 1.0, 1.0, 1e-3, 1e-3, 1e-3])
+        cheb = interpolation.Chebyshev.fit(source, tolerance, degree=12)
+
+        self.assertTrue(np.all(cheb.max_error <= tolerance))
+        self.assertGreater(cheb.compression_ratio, 10)
+
+        t = np.random.default_rng(5).uniform(0, 86400.0, size=5000)
+        err = np.abs(cheb.get_state(t) - orbit_states(t))
+        self.assertTrue(np.all(np.max(err, axis=1) <= tolerance * 1.5))
+
+    def test_clenshaw(self):
+        coefs = np.random.default_rng(1).normal(size=(4, 2, 7))
+        s = np.linspace(-1, 1, 4)
+        res, dres = interpolation.chebyshev_clenshaw_and_differentiate(coefs, s)
+        nt.assert_allclose(interpolation.chebyshev_clenshaw(coefs, s), res)
+        for p in range(4):
+            for c in range(2):
+                ref = np.polynomial.chebyshev.chebval(s[p], coefs[p, c])
+                dref = np.polynomial.chebyshev.chebval(
+                    s[p], np.polynomial.chebyshev.chebder(coefs[p, c])
+                )
+                nt.assert_allclose(res[p, c], ref)
+                nt.assert_allclose(dres[p, c], dref)
+
+    def test_unreachable_tolerance(self):
+        t_samp = np.linspace(0, 100.0, 101)
+        states = np.random.default_rng(2).normal(size=(6, 101))
+        with self.assertRaises(ValueError):
+            interpolation.Chebyshev.fit(interpolation.Linear(states, t_samp), 1e-9, degree=8)
+
+
+class TestBatchedLagrange(unittest.TestCase):
+
+    def test_matches_single_object(self):
+        rng = np.random.default_rng(11)
+        t_samp = np.cumsum(rng.uniform(0.5, 1.5, size=80))
+        states = np.sin(t_samp[None, None, :] * rng.uniform(0.1, 0.3, size=(5, 6, 1)))
+        t = rng.uniform(t_samp[0], t_samp[-1], size=257)
+
+        batched = interpolation.BatchedLagrange(states, t_samp, order=6, chunk_size=50)
+        res = batched.get_state(t)
+        self.assertEqual(res.shape, (5, 6, 257))
+        for ind in range(5):
+            ref = interpolation.Lagrange(states[ind], t_samp, order=6).get_state(t)
+            nt.assert_allclose(res[ind], ref, rtol=1e-12, atol=1e-12)
+
+    def test_legendre8_correspondence(self):
+        t_samp = np.linspace(0, 20, 41)
+        states = np.stack(
+            [np.cos(t_samp * (1 + k / 10))[None, :].repeat(6, axis=0) for k in range(3)]
+        )
+        t = np.linspace(0, 20, 301)
+        res = interpolation.BatchedLagrange(states, t_samp, order=8).get_state(t)
+        for ind in range(3):
+            ref = interpolation.Legendre8(states[ind], t_samp).get_state(t)
+            nt.assert_allclose(res[ind], ref, atol=1e-10)
+
+    def test_shape_check(self):
+        with self.assertRaises(ValueError):
+            interpolation.BatchedLagrange(np.zeros((6, 20)), np.arange(20.0))
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmpdir.name)
+        t_samp = np.linspace(0, 5000.0, 301)
+        keep = np.r_[0:150, 200:301]
+        self.states = orbit_states(t_samp)
+        self.t_samp = t_samp
+        self.t = np.linspace(0, 1000.0, 53)
+        self.interpolators = [
+            interpolation.Linear(self.states, t_samp),
+            interpolation.Legendre8(self.states, t_samp),
+            interpolation.Hermite(self.states, t_samp, order=5),
+            interpolation.Lagrange(self.states[:, keep], t_samp[keep], order=6),
+            interpolation.BatchedLagrange(
+                np.stack([self.states, -self.states]), t_samp, chunk_size=7
+            ),
+            interpolation.Chebyshev.fit(
+                interpolation.Legendre8(self.states, t_samp), 1e-3, degree=10
+            ),
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def assert_same(self, loaded, interp):
+        self.assertIs(type(loaded), type(interp))
+        nt.assert_array_equal(loaded.get_state(self.t), interp.get_state(self.t))
+
+    def test_round_trip(self):
+        for ind, interp in enumerate(self.interpolators):
+            for name, mmap in [(f"{ind}.npz", False), (f"{ind}", False), (f"{ind}", True)]:
+                interp.save(self.path / name)
+                loaded = interpolation.Interpolator.load(self.path / name, mmap=mmap)
+                self.assert_same(loaded, interp)
+                if mmap:
+                    table = next(iter(loaded._saved_arrays().values()))
+                    self.assertIsInstance(table, np.memmap)
+                del loaded
+
+    def test_stray_files_ignored(self):
+        interp = interpolation.Lagrange(self.states, self.t_samp, order=4)
+        interp.save(self.path / "lagrange")
+        np.save(self.path / "lagrange" / "stale.npy", np.zeros(3))
+        loaded = interpolation.Interpolator.load(self.path / "lagrange")
+        self.assert_same(loaded, interp)
+
+    def test_parameters(self):
+        interp = interpolation.Lagrange(self.states, self.t_samp, order=4, max_step=100.0)
+        interp.save(self.path / "lagrange")
+        loaded = interpolation.Lagrange.load(self.path / "lagrange", mmap=True)
+        self.assertEqual(loaded.order, 4)
+        self.assertEqual(loaded.max_step, 100.0)
+        self.assertIsInstance(loaded.weights, np.memmap)
+
+        cheb = self.interpolators[-1]
+        cheb.save(self.path / "cheb.npz")
+        loaded = interpolation.Chebyshev.load(self.path / "cheb.npz")
+        nt.assert_array_equal(loaded.max_error, cheb.max_error)
+        self.assertEqual(loaded.compression_ratio, cheb.compression_ratio)
+
+    def test_streaming(self):
+        stream = interpolation.StreamingLagrange(capacity=20, order=3)
+        stream.append(self.states[:, :35], self.t_samp[:35])
+        stream.save(self.path / "stream")
+        loaded = interpolation.StreamingLagrange.load(self.path / "stream", mmap=True)
+        self.assertEqual(loaded.capacity, 20)
+        nt.assert_array_equal(loaded.t, stream.t)
+        loaded.append(self.states[:, 35:36], self.t_samp[35:36])
+        nt.assert_array_equal(loaded.t, self.t_samp[16:36])
+
+    def test_invalid(self):
+        self.interpolators[0].save(self.path / "linear.npz")
+        with self.assertRaises(ValueError):
+            interpolation.Interpolator.load(self.path / "linear.npz", mmap=True)
+        with self.assertRaises(ValueError):
+            interpolation.Hermite.load(self.path / "linear.npz")
+
+
+class TestDerivatives(unittest.TestCase):
+
+    def setUp(self):
+        self.t_samp = np.cumsum(np.random.default_rng(12).uniform(0.5, 1.5, size=30))
+        self.t = np.linspace(self.t_samp[0], self.t_samp[-1], 211)
+
+    def polynomial_derivative(self, t, order, derivative):
+        states = polynomial_states(t, order)
+        for k in range(order + 1):
+            coef = np.prod(np.arange(k - derivative + 1, k + 1)) / 10.0**derivative
+            states[k] = coef * (t / 10.0) ** (k - derivative) if k >= derivative else 0
+        return states[: order + 1]
+
+    def test_basis_derivatives(self):
+        rng = np.random.default_rng(3)
+        nodes = np.sort(rng.uniform(0, 5, size=(7, 5)), axis=1)
+        t = rng.uniform(0, 5, size=7)
+        weights = 1.0 / np.prod(
+            nodes[:, :, None] - nodes[:, None, :] + np.eye(5)[None, :, :], axis=2
+        )
+        basis = interpolation.lagrange_basis_derivatives(t, nodes, weights, 5)
+        self.assertEqual(basis.shape, (6, 7, 5))
+        for p in range(7):
+            for j in range(5):
+                poly = np.polynomial.Polynomial.fromroots(np.delete(nodes[p], j)) * weights[p, j]
+                for i in range(6):
+                    nt.assert_allclose(basis[i, p, j], poly.deriv(i)(t[p]), rtol=1e-9, atol=1e-12)
+
+    def test_lagrange(self):
+        interp = interpolation.Lagrange(polynomial_states(self.t_samp, 5), self.t_samp, order=5)
+        for derivative in [1, 2, 3]:
+            res = interp.get_state(self.t, derivative=derivative)
+            ref = self.polynomial_derivative(self.t, 5, derivative)
+            nt.assert_allclose(res, ref, rtol=1e-7, atol=1e-9)
+
+    def test_legendre8(self):
+        t_samp = np.linspace(0, 20, 41)
+        t = np.linspace(0, 20, 333)
+        interp = interpolation.Legendre8(polynomial_states(t_samp, 5), t_samp)
+        ref = interpolation.Lagrange(polynomial_states(t_samp, 5), t_samp, order=8)
+        for derivative in [1, 2]:
+            res = interp.get_state(t, derivative=derivative)
+            nt.assert_allclose(
+                res, self.polynomial_derivative(t, 5, derivative), rtol=1e-7, atol=1e-9
+            )
+            nt.assert_allclose(res, ref.get_state(t, derivative=derivative), rtol=1e-9, atol=1e-9)
+        with self.assertRaises(ValueError):
+            interpolation.legendre8(interp.states.T, 0, 20, t, method="intervals", derivative=1)
+
+    def test_linear(self):
+        states = polynomial_states(self.t_samp, 1)
+        interp = interpolation.Linear(states, self.t_samp)
+        nt.assert_allclose(
+            interp.get_state(self.t, derivative=1)[:2], [np.zeros_like(self.t), self.t * 0 + 0.1]
+        )
+        nt.assert_array_equal(interp.get_state(self.t, derivative=2), np.zeros((6, self.t.size)))
+        with self.assertRaises(ValueError):
+            interp.get_state(self.t, derivative=-1)
+
+    def test_hermite(self):
+        states = position_velocity_polynomial(self.t_samp, 5)
+        interp = interpolation.Hermite(states, self.t_samp, order=5)
+        coefs = np.arange(1, 7) / 10.0
+        for derivative in [1, 2]:
+            res = interp.get_state(self.t, derivative=derivative)
+            for row, der in [(0, derivative), (3, derivative + 1)]:
+                ref = np.polynomial.polynomial.polyval(
+                    self.t, np.polynomial.polynomial.polyder(coefs, der)
+                )
+                nt.assert_allclose(res[row], ref, rtol=1e-7, atol=1e-8)
+
+    def test_streaming(self):
+        stream = interpolation.StreamingLagrange(capacity=40, order=3)
+        stream.append(polynomial_states(self.t_samp, 3), self.t_samp)
+        res = stream.get_state(self.t, derivative=1)
+        nt.assert_allclose(res[:4], self.polynomial_derivative(self.t, 3, 1), rtol=1e-8, atol=1e-10)
+
+    def test_batched(self):
+        states = np.stack([polynomial_states(self.t_samp, 4), -polynomial_states(self.t_samp, 4)])
+        res = interpolation.BatchedLagrange(states, self.t_samp, order=6).get_state(
+            self.t, derivative=2
+        )
+        ref = interpolation.Lagrange(states[1], self.t_samp, order=6).get_state(
+            self.t, derivative=2
+        )
+        nt.assert_allclose(res[1], ref)
+
+    def test_chebyshev(self):
+        t_samp = np.linspace(0, 20000.0, 2001)
+        orbit = orbit_states(t_samp)
+        cheb = interpolation.Chebyshev.fit(interpolation.Legendre8(orbit, t_samp), 1e-4, degree=14)
+        t = np.linspace(0, 20000.0, 501)
+        ref = orbit_states(t)
+        vel = cheb.get_state(t, derivative=1)
+        nt.assert_allclose(vel[:3], ref[3:], atol=1e-5)
+        acc = cheb.get_state(t, derivative=2)
+        nt.assert_allclose(acc[:3], cheb.get_state(t, derivative=1)[3:], atol=1e-6)
@@ -5,6 +5,8 @@ import tempfile
 import numpy as np
 import numpy.testing as nt
 from astropy.time import Time
+from astropy.coordinates import EarthLocation
+import astropy.units as units
 
 from spacecoords import celestial
 
@@ -21,3 +23,34 @@ class TestKernelLoad(unittest.TestCase):
                 pathlib.Path(tmpdirname),
             )
         nt.assert_almost_equal(np.linalg.norm(state[:3]) / au, 1, decimal=1)
+
+    def test_astropy_get_body_workers(self):
+        time = (
+            Time("2025-03-20T09:01:00", format="isot", scale="utc")
+            + np.linspace(0, 30, 50) * units.day
+        )
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            ref = celestial.astropy_get_body(
+                "Earth", time, pathlib.Path(tmpdirname), ephemeris="builtin"
+            )
+            state = celestial.astropy_get_body(
+                "Earth", time, pathlib.Path(tmpdirname), ephemeris="builtin", workers=2
+            )
+        nt.assert_allclose(state, ref)
+
+    def test_astropy_get_body_workers_location(self):
+        location = EarthLocation.from_geodetic(
+            lon=20.2 * units.deg, lat=67.8 * units.deg, height=400 * units.m
+        )
+        time = Time("2025-03-20T09:01:00", format="isot", scale="utc", location=location)
+        time = time + np.linspace(0, 30, 50) * units.day
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            ref = celestial.astropy_get_body(
+                "Earth", time, pathlib.Path(tmpdirname), ephemeris="builtin"
+            )
+            state = celestial.astropy_get_body(
+                "Earth", time, pathlib.Path(tmpdirname), ephemeris="builtin", workers=2
+            )
+        # the topocentric TDB term moves the Earth by centimeters
+        nt.assert_allclose(state[:3], ref[:3], rtol=0, atol=1e-4)
+        nt.assert_allclose(state[3:], ref[3:], rtol=0, atol=1e-10)
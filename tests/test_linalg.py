@@ -187,6 +187,40 @@ class TestRotations(unittest.TestCase):
         basis = np.einsum("ijk,jk->ik", np.einsum("ijk->jik", R), r_basis)
         nt.assert_array_almost_equal(basis, self.basis)
 
+    def test_matmul_layout(self):
+        th = np.random.default_rng(6).uniform(0, 2 * np.pi, size=50)
+        for func in [linalg.rot_mat_x, linalg.rot_mat_y, linalg.rot_mat_z]:
+            R = func(th, layout="Nx3x3")
+            self.assertEqual(R.shape, (50, 3, 3))
+            self.assertTrue(R.flags.c_contiguous)
+            nt.assert_array_equal(R, np.moveaxis(func(th), -1, 0))
+            nt.assert_array_equal(func(th[0], layout="Nx3x3"), func(th[0]))
+        with self.assertRaises(ValueError):
+            linalg.rot_mat_x(th, layout="3xNx3")
+
+    def test_rotate(self):
+        rng = np.random.default_rng(7)
+        th = rng.uniform(0, 360, size=40)
+        vecs = rng.normal(size=(3, 40))
+        for rotate, func in [
+            (linalg.rotate_x, linalg.rot_mat_x),
+            (linalg.rotate_y, linalg.rot_mat_y),
+            (linalg.rotate_z, linalg.rot_mat_z),
+        ]:
+            ref = np.einsum("ijk,jk->ik", func(th, degrees=True), vecs)
+            nt.assert_allclose(rotate(th, vecs, degrees=True), ref, atol=1e-12)
+            nt.assert_allclose(
+                rotate(np.radians(th[0]), vecs), func(np.radians(th[0])) @ vecs, atol=1e-12
+            )
+            nt.assert_allclose(
+                rotate(np.pi / 2, self.basis[:, 0]), func(np.pi / 2) @ self.basis[:, 0], atol=1e-12
+            )
+
+            inplace = vecs.copy()
+            res = rotate(th, inplace, out=inplace, degrees=True)
+            self.assertIs(res, inplace)
+            nt.assert_allclose(inplace, ref, atol=1e-12)
+
 
 class TestScale(unittest.TestCase):
 
@@ -221,3 +255,376 @@ class TestScale(unittest.TestCase):
 
         bp = M @ a
         nt.assert_array_almost_equal(bp, b)
+
+
+class TestTriangulation(unittest.TestCase):
+
+    def setUp(self):
+        self.stations = np.array(
+            [
+                [1, 2, 0, 0],
+                [0, 1, -1, 0],
+                [0, 0, 0, 0],
+            ],
+            dtype=np.float64,
+        )
+        self.targets = np.random.default_rng(3).uniform(-20, 20, size=(50, 3)) + [0, 0, 40]
+
+    def test_loop_correspondence(self):
+        rng = np.random.default_rng(5)
+        dirs = self.targets[0][:, None] + rng.normal(size=(3, 4)) * 0.1 - self.stations
+        dirs /= np.linalg.norm(dirs, axis=0)
+        M_ref = np.zeros((3, 3))
+        b_ref = np.zeros((3,))
+        for ind in range(4):
+            d, a = dirs[:, ind], self.stations[:, ind]
+            M_ref += np.outer(d, d) - np.eye(3)
+            b_ref += np.dot(d, a) * d - a
+        M, b = linalg.triangulation_system(dirs, self.stations)
+        nt.assert_allclose(M, M_ref)
+        nt.assert_allclose(b, b_ref)
+
+    def test_exact(self):
+        points = np.broadcast_to(self.stations, (50, 3, 4))
+        dirs = self.targets[:, :, None] - points
+        target, resid = linalg.solve_triangulation(dirs, points)
+        self.assertEqual(target.shape, (50, 3))
+        self.assertEqual(resid.shape, (50,))
+        nt.assert_allclose(target, self.targets, atol=1e-8)
+        nt.assert_allclose(resid, 0, atol=1e-8)
+
+        target, resid = linalg.solve_triangulation(dirs[7], points[7])
+        nt.assert_allclose(target, self.targets[7], atol=1e-8)
+        self.assertIsInstance(resid, float)
+
+    def test_batch_matches_single(self):
+        rng = np.random.default_rng(9)
+        points = np.broadcast_to(self.stations, (50, 3, 4))
+        dirs = self.targets[:, :, None] + rng.normal(size=(50, 3, 4)) - points
+        weights = rng.uniform(0.5, 2, size=(50, 4))
+        target, resid = linalg.solve_triangulation(dirs, points, weights)
+        for ind in range(50):
+            ref, ref_resid = linalg.solve_triangulation(dirs[ind], points[ind], weights[ind])
+            nt.assert_allclose(target[ind], ref)
+            nt.assert_allclose(resid[ind], ref_resid)
+        self.assertTrue(np.all(resid > 0))
+
+    def test_weights(self):
+        points = self.stations.copy()
+        dirs = self.targets[0][:, None] - points
+        # the last line is off, down-weighting it moves the solution towards the target
+        dirs[:, 3] += [3, 0, 0]
+        err = []
+        for w in [1.0, 1e-6]:
+            target, _ = linalg.solve_triangulation(dirs, points, np.array([1, 1, 1, w]))
+            err.append(np.linalg.norm(target - self.targets[0]))
+        self.assertLess(err[1], err[0] * 1e-3)
+
+
+class TestTrilateration(unittest.TestCase):
+
+    def setUp(self):
+        self.stations = np.array(
+            [
+                [1, 10, 0, 0, -4],
+                [0, 1, -10, 0, 3],
+                [0, 0, 5, -5, 1],
+            ],
+            dtype=np.float64,
+        )
+        self.targets = np.random.default_rng(4).uniform(-10, 10, size=(200, 3)) + [0, 0, 20]
+        self.ranges = np.linalg.norm(self.targets[:, :, None] - self.stations[None, :, :], axis=1)
+
+    def test_linear_system_batch(self):
+        M, b = linalg.trilateration_system(self.ranges, self.stations)
+        self.assertEqual(M.shape, (5, 3))
+        self.assertEqual(b.shape, (200, 5))
+        M_ref, b_ref = linalg.trilateration_system(self.ranges[3], self.stations)
+        nt.assert_allclose(b[3], b_ref)
+        nt.assert_allclose(M @ self.targets[3], b_ref, atol=1e-9)
+
+    def test_exact(self):
+        pos, cov = linalg.solve_trilateration(self.ranges, self.stations)
+        self.assertEqual(pos.shape, (200, 3))
+        self.assertEqual(cov.shape, (200, 3, 3))
+        nt.assert_allclose(pos, self.targets, atol=1e-8)
+
+        pos, cov = linalg.solve_trilateration(self.ranges[0], self.stations, range_std=0.1)
+        self.assertEqual(cov.shape, (3, 3))
+        nt.assert_allclose(pos, self.targets[0], atol=1e-8)
+
+    def test_noisy_refinement(self):
+        std = 0.2
+        rng = np.random.default_rng(8)
+        ranges = self.ranges + rng.normal(size=self.ranges.shape) * std
+        points = np.broadcast_to(self.stations, (200, 3, 5))
+        lin, _ = linalg.solve_trilateration(ranges, points, iterations=0, range_std=std)
+        pos, cov = linalg.solve_trilateration(ranges, points, iterations=5, range_std=std)
+        err_lin = np.linalg.norm(lin - self.targets, axis=1)
+        err = np.linalg.norm(pos - self.targets, axis=1)
+        self.assertLess(np.mean(err), np.mean(err_lin))
+
+        # the normalized errors follow a chi-square distribution with 3 degrees of freedom
+        diff = pos - self.targets
+        chi2 = np.einsum("ki,kij,kj->k", diff, np.linalg.inv(cov), diff)
+        self.assertLess(abs(np.mean(chi2) - 3), 0.6)
+
+        _, cov_est = linalg.solve_trilateration(ranges, points)
+        ratio = np.median(np.trace(cov_est, axis1=1, axis2=2) / np.trace(cov, axis1=1, axis2=2))
+        self.assertLess(abs(ratio - 1), 0.5)
+
+
+class TestRobustTriangulation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(21)
+        self.stations = rng.uniform(-50, 50, size=(3, 6)) * np.array([1, 1, 0])[:, None]
+        self.targets = rng.uniform(-20, 20, size=(100, 3)) + [0, 0, 100]
+        self.dirs = self.targets[:, :, None] - self.stations[None, :, :]
+        self.dirs += rng.normal(size=self.dirs.shape) * 0.01
+        # false associations pointing at a different object
+        self.outliers = rng.uniform(size=(100, 6)) < 0.25
+        self.outliers[:, :3] = False
+        false_dirs = (
+            rng.uniform(-50, 50, size=(100, 3, 6)) + np.array([0, 0, 100])[:, None] - self.stations
+        )
+        self.dirs = np.where(self.outliers[:, None, :], false_dirs, self.dirs)
+
+    def test_outlier_rejection(self):
+        target, inliers, resid = linalg.solve_triangulation_robust(
+            self.dirs, self.stations, threshold=1.0
+        )
+        self.assertEqual(target.shape, (100, 3))
+        self.assertEqual(inliers.shape, (100, 6))
+        nt.assert_array_equal(inliers, ~self.outliers)
+        nt.assert_allclose(target, self.targets, atol=0.2)
+        self.assertTrue(np.all(resid < 1.0))
+
+        naive, _ = linalg.solve_triangulation(
+            self.dirs, np.broadcast_to(self.stations, self.dirs.shape)
+        )
+        err = np.linalg.norm(naive - self.targets, axis=1)
+        self.assertGreater(np.max(err[np.any(self.outliers, axis=1)]), 1.0)
+
+    def test_single_target(self):
+        target, inliers, resid = linalg.solve_triangulation_robust(
+            self.dirs[4], self.stations, threshold=1.0
+        )
+        ref, ref_inliers, ref_resid = linalg.solve_triangulation_robust(
+            self.dirs[:5], self.stations, threshold=1.0
+        )
+        nt.assert_allclose(target, ref[4])
+        nt.assert_array_equal(inliers, ref_inliers[4])
+        self.assertIsInstance(resid, float)
+
+    def test_chunks(self):
+        ref, ref_inliers, ref_resid = linalg.solve_triangulation_robust(
+            self.dirs, self.stations, threshold=1.0
+        )
+        for chunk_size in [1, 15 * 6 * 7]:
+            target, inliers, resid = linalg.solve_triangulation_robust(
+                self.dirs, self.stations, threshold=1.0, chunk_size=chunk_size
+            )
+            nt.assert_array_equal(target, ref)
+            nt.assert_array_equal(inliers, ref_inliers)
+            nt.assert_array_equal(resid, ref_resid)
+
+    def test_no_consensus(self):
+        dirs = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64)
+        points = np.array([[0, 0, 0], [0, 0, 100], [100, 100, 0]], dtype=np.float64).T
+        target, inliers, resid = linalg.solve_triangulation_robust(dirs, points, threshold=1.0)
+        self.assertTrue(np.all(np.isnan(target)))
+        self.assertTrue(np.isnan(resid))
+
+
+class TestVecToVec(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(17)
+        self.a = rng.normal(size=(3, 200))
+        self.b = rng.normal(size=(3, 200))
+        # parallel and antiparallel pairs, including vectors along the coordinate axes
+        self.b[:, 0] = self.a[:, 0] * 2
+        self.b[:, 1] = -self.a[:, 1]
+        self.a[:, 2], self.b[:, 2] = [0, 0, 1], [0, 0, -3]
+        self.a[:, 3], self.b[:, 3] = [1, 0, 0], [-1, 0, 0]
+
+    def assert_rotations(self, R, a, b):
+        nt.assert_allclose(
+            np.einsum("nij,nkj->nik", R, R), np.broadcast_to(np.eye(3), R.shape), atol=1e-12
+        )
+        nt.assert_allclose(np.linalg.det(R), 1.0)
+        an = a / np.linalg.norm(a, axis=0)
+        bn = b / np.linalg.norm(b, axis=0)
+        nt.assert_allclose(np.einsum("nij,jn->in", R, an), bn, atol=1e-12)
+
+    def test_batched(self):
+        R = linalg.vec_to_vec(self.a, self.b)
+        self.assertEqual(R.shape, (200, 3, 3))
+        self.assert_rotations(R, self.a, self.b)
+        nt.assert_allclose(R[0], np.eye(3), atol=1e-12)
+
+    def test_single(self):
+        for ind in [0, 1, 2, 10]:
+            R = linalg.vec_to_vec(self.a[:, ind], self.b[:, ind])
+            self.assertEqual(R.shape, (3, 3))
+            nt.assert_allclose(R, linalg.vec_to_vec(self.a, self.b)[ind])
+
+    def test_sequence_inputs(self):
+        R = linalg.vec_to_vec([1, 0, 0], (0, 1, 0))
+        nt.assert_allclose(R, linalg.rot_mat_z(np.pi / 2), atol=1e-12)
+        rot = linalg.apply_vec_to_vec([1, 0, 0], (0, 1, 0), [[1, 0], [0, 0], [0, 1]])
+        nt.assert_allclose(rot, [[0, 0], [1, 0], [0, 1]], atol=1e-12)
+
+    def test_minimal_rotation(self):
+        R = linalg.vec_to_vec(self.a[:, 4:], self.b[:, 4:])
+        axis = np.cross(self.a[:, 4:], self.b[:, 4:], axis=0)
+        nt.assert_allclose(np.einsum("nij,jn->in", R, axis), axis, atol=1e-12)
+        angle = np.arccos((np.trace(R, axis1=1, axis2=2) - 1) / 2)
+        nt.assert_allclose(angle, linalg.vector_angle(self.a[:, 4:], self.b[:, 4:]), atol=1e-7)
+
+    def test_apply(self):
+        v = np.random.default_rng(2).normal(size=(3, 200))
+        R = linalg.vec_to_vec(self.a, self.b)
+        nt.assert_allclose(
+            linalg.apply_vec_to_vec(self.a, self.b, v), np.einsum("nij,jn->in", R, v), atol=1e-12
+        )
+
+        rot = linalg.apply_vec_to_vec(self.a[:, 5], self.b[:, 5], v)
+        nt.assert_allclose(rot, R[5] @ v, atol=1e-12)
+        rot = linalg.apply_vec_to_vec(self.a[:, 1], self.b[:, 1], v[:, 7])
+        self.assertEqual(rot.shape, (3,))
+        nt.assert_allclose(rot, R[1] @ v[:, 7], atol=1e-12)
+
+
+class TestRotation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(31)
+        self.theta = rng.uniform(-np.pi, np.pi, size=(3, 100))
+        self.vecs = rng.normal(size=(3, 100))
+        self.rot_a = linalg.Rotation(rng.normal(size=(4, 100)))
+        self.rot_b = linalg.Rotation(rng.normal(size=(4, 100)))
+
+    def test_storage(self):
+        self.assertEqual(self.rot_a.quat.shape, (4, 100))
+        self.assertTrue(self.rot_a.quat.flags.c_contiguous)
+        nt.assert_allclose(np.linalg.norm(self.rot_a.quat, axis=0), 1)
+        with self.assertRaises(AttributeError):
+            self.rot_a.matrix = None
+        self.assertEqual(len(self.rot_a[:10]), 10)
+
+    def test_matrix_round_trip(self):
+        for func, axis in [
+            (linalg.rot_mat_x, "x"),
+            (linalg.rot_mat_y, "y"),
+            (linalg.rot_mat_z, "z"),
+        ]:
+            rot = linalg.Rotation.from_matrix(func(self.theta[0]))
+            nt.assert_allclose(rot.as_matrix(), func(self.theta[0]), atol=1e-12)
+            nt.assert_allclose(
+                linalg.Rotation.from_euler(axis, self.theta[:1]).as_matrix(layout="Nx3x3"),
+                func(self.theta[0], layout="Nx3x3"),
+                atol=1e-12,
+            )
+        mat = self.rot_a.as_matrix(layout="Nx3x3")
+        rot = linalg.Rotation.from_matrix(mat, layout="Nx3x3")
+        nt.assert_allclose(rot.as_matrix(layout="Nx3x3"), mat, atol=1e-12)
+        nt.assert_allclose(
+            linalg.Rotation.from_matrix(mat[0]).as_matrix()[:, :, 0], mat[0], atol=1e-12
+        )
+
+    def test_apply_and_compose(self):
+        mat_a = self.rot_a.as_matrix(layout="Nx3x3")
+        mat_b = self.rot_b.as_matrix(layout="Nx3x3")
+        ref = (mat_a @ mat_b @ self.vecs.T[:, :, None])[:, :, 0].T
+        nt.assert_allclose((self.rot_a @ self.rot_b).apply(self.vecs), ref, atol=1e-12)
+        nt.assert_allclose(self.rot_a.apply(self.rot_b.apply(self.vecs)), ref, atol=1e-12)
+        nt.assert_allclose(
+            self.rot_a.inv().apply(self.rot_a.apply(self.vecs)), self.vecs, atol=1e-12
+        )
+
+        single = self.rot_a[3:4]
+        nt.assert_allclose(single.apply(self.vecs[:, 5]), mat_a[3] @ self.vecs[:, 5], atol=1e-12)
+        nt.assert_allclose(
+            (single @ self.rot_b).as_matrix(layout="Nx3x3"), mat_a[3] @ mat_b, atol=1e-12
+        )
+
+    def test_euler(self):
+        for seq in ["xyz", "zyx", "yxz", "zxz", "xyx"]:
+            angles = self.theta.copy()
+            angles[1] = np.abs(angles[1]) if seq[0] == seq[2] else angles[1] / 2
+            rot = linalg.Rotation.from_euler(seq, angles)
+            funcs = {"x": linalg.rot_mat_x, "y": linalg.rot_mat_y, "z": linalg.rot_mat_z}
+            ref = np.stack(
+                [
+                    funcs[seq[0]](a) @ funcs[seq[1]](b) @ funcs[seq[2]](c)
+                    for a, b, c in angles[:, :5].T
+                ]
+            )
+            nt.assert_allclose(rot[:5].as_matrix(layout="Nx3x3"), ref, atol=1e-12)
+            nt.assert_allclose(rot.as_euler(seq), angles, atol=1e-10)
+
+        locked = linalg.Rotation.from_euler("zyx", [0.3, 90, 0.5], degrees=True)
+        angles = locked.as_euler("zyx", degrees=True)
+        self.assertEqual(angles[2, 0], 0)
+        nt.assert_allclose(
+            linalg.Rotation.from_euler("zyx", angles, degrees=True).quat, locked.quat, atol=1e-12
+        )
+
+    def test_slerp(self):
+        start = linalg.Rotation.identity()
+        end = linalg.Rotation.from_axis_angle(np.array([0, 0, 1]), np.pi / 2)
+        t = np.linspace(0, 1, 11)
+        path = start.slerp(end, t)
+        nt.assert_allclose(path.as_euler("zyx")[0], t * np.pi / 2, atol=1e-12)
+
+        mid = self.rot_a.slerp(self.rot_b, 0.5)
+        ang_a = 2 * np.arccos(np.clip(np.abs((mid.inv() @ self.rot_a).quat[0]), 0, 1))
+        ang_b = 2 * np.arccos(np.clip(np.abs((mid.inv() @ self.rot_b).quat[0]), 0, 1))
+        nt.assert_allclose(ang_a, ang_b, atol=1e-7)
+        nt.assert_allclose(self.rot_a.slerp(self.rot_a, 0.3).quat, self.rot_a.quat, atol=1e-12)
+
+
+class TestPairwiseAngles(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(41)
+        self.a = rng.normal(size=(3, 17))
+        self.b = rng.normal(size=(3, 500))
+
+    def test_dense(self):
+        ang = linalg.pairwise_vector_angle(self.a, self.b, degrees=True, chunk_size=100)
+        self.assertEqual(ang.shape, (17, 500))
+        for ind in range(17):
+            nt.assert_allclose(ang[ind], linalg.vector_angle(self.a[:, ind], self.b, degrees=True))
+
+        single = linalg.pairwise_vector_angle(self.a[:, 0], self.b)
+        self.assertEqual(single.shape, (1, 500))
+
+    def test_threshold(self):
+        dense = linalg.pairwise_vector_angle(self.a, self.b)
+        for chunk_size in [17, 1000, 10**6]:
+            a_ind, b_ind, ang = linalg.pairwise_vector_angle(
+                self.a, self.b, max_angle=20.0, degrees=True, chunk_size=chunk_size
+            )
+            ref_a, ref_b = np.nonzero(dense <= np.radians(20.0))
+            order = np.lexsort((ref_a, ref_b))
+            nt.assert_array_equal(a_ind, ref_a[order])
+            nt.assert_array_equal(b_ind, ref_b[order])
+            nt.assert_allclose(np.radians(ang), dense[ref_a[order], ref_b[order]], atol=1e-7)
+
+    def test_threshold_small_angles(self):
+        offsets = np.array([1e-9, 1e-7, 1e-5])
+        b = np.stack([np.ones(3), offsets, np.zeros(3)])
+        _, b_ind, ang = linalg.pairwise_vector_angle(np.array([1.0, 0, 0]), b, max_angle=1e-3)
+        nt.assert_array_equal(b_ind, [0, 1, 2])
+        nt.assert_allclose(ang, np.arctan(offsets), rtol=1e-9)
+
+    def test_threshold_sub_microradian(self):
+        offsets = np.array([1e-10, 4e-10, 6e-10, 1e-9, 1e-7])
+        b = np.stack([np.ones(5), offsets, np.zeros(5)])
+        _, b_ind, ang = linalg.pairwise_vector_angle(np.array([1.0, 0, 0]), b, max_angle=5e-10)
+        nt.assert_array_equal(b_ind, [0, 1])
+        self.assertTrue(np.all(ang <= 5e-10))
+        nt.assert_allclose(ang, offsets[:2], rtol=1e-9)
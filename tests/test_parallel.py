@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+""" """
+
+import gc
+import unittest
+import numpy as np
+import numpy.testing as nt
+
+from spacecoords import parallel
+
+
+def _polynomial_states(t, scale):
+    return np.stack([t * scale, t**2, np.sin(t)], axis=0)
+
+
+class TestEpochPoolMap(unittest.TestCase):
+
+    def test_reassembly(self):
+        t = np.linspace(0, 10, 1001)
+        out = parallel.epoch_pool_map(_polynomial_states, (t,), (3, t.size), workers=2, args=(3.0,))
+        nt.assert_array_equal(out, _polynomial_states(t, 3.0))
+
+    def test_more_workers_than_epochs(self):
+        t = np.linspace(0, 1, 3)
+        out = parallel.epoch_pool_map(_polynomial_states, (t,), (3, t.size), workers=4, args=(1.0,))
+        nt.assert_array_equal(out, _polynomial_states(t, 1.0))
+
+    def test_output_not_copied(self):
+        t = np.linspace(0, 10, 101)
+        out = parallel.epoch_pool_map(_polynomial_states, (t,), (3, t.size), workers=2, args=(2.0,))
+        self.assertFalse(out.flags.owndata)
+        view = out[1]
+        del out
+        gc.collect()
+        nt.assert_array_equal(view, t**2)
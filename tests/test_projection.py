@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+""" """
+
+import unittest
+import numpy as np
+import numpy.testing as nt
+
+from spacecoords import projection
+
+
+class TestProjections(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.lon = rng.uniform(-np.pi, np.pi, size=2000)
+        self.lat = rng.uniform(-np.pi / 2 + 1e-3, np.pi / 2 - 1e-3, size=2000)
+
+    def test_hammer_known(self):
+        hx, hy = projection.latlon_to_hammer(np.pi, 0.0)
+        self.assertAlmostEqual(hx, 2.0)
+        self.assertAlmostEqual(hy, 0.0)
+        hx, hy = projection.latlon_to_hammer(0.0, np.pi / 2)
+        self.assertAlmostEqual(hx, 0.0)
+        self.assertAlmostEqual(hy, 1.0)
+
+    def test_hammer_seam(self):
+        # only exactly pi maps to the right edge, -pi and 3 pi wrap to the left edge
+        hx, _ = projection.latlon_to_hammer(np.array([-np.pi, np.pi, 3 * np.pi]), 0.0)
+        nt.assert_allclose(hx, [-2.0, 2.0, -2.0])
+        hx, _ = projection.latlon_to_hammer(-np.pi, 0.0)
+        self.assertAlmostEqual(float(hx), -2.0)
+
+    def test_hammer_ref_lon(self):
+        lon, lat = np.array([30.0, 120.0]), np.array([10.0, -40.0])
+        hx, hy = projection.latlon_to_hammer(lon, lat, ref_lon=15.0, degrees=True)
+        hx0, hy0 = projection.latlon_to_hammer(15.0 + 270.0 - lon, lat, degrees=True)
+        nt.assert_allclose(hx, hx0)
+        nt.assert_allclose(hy, hy0)
+
+    def test_aitoff_axes(self):
+        ax, ay = projection.latlon_to_aitoff(self.lon, 0.0)
+        nt.assert_allclose(ax, self.lon)
+        nt.assert_allclose(ay, 0.0, atol=1e-15)
+        ax, ay = projection.latlon_to_aitoff(0.0, self.lat)
+        nt.assert_allclose(ay, self.lat)
+
+    def test_mollweide_equal_area(self):
+        # the band between the equator and latitude lat covers (theta + sin(2 theta)/2)/pi of
+        # the map
+        theta = projection._mollweide_theta(self.lat)
+        nt.assert_allclose(2 * theta + np.sin(2 * theta), np.pi * np.sin(self.lat), atol=1e-13)
+        _, my = projection.latlon_to_mollweide(0.0, np.pi / 2)
+        self.assertAlmostEqual(my, np.sqrt(2))
+
+    def test_roundtrip(self):
+        for name, (forward, inverse, _) in projection.PROJECTIONS.items():
+            with self.subTest(projection=name):
+                for ref_lon in [None, 0.7]:
+                    x, y = forward(self.lon, self.lat, ref_lon=ref_lon)
+                    lon, lat = inverse(x, y, ref_lon=ref_lon)
+                    nt.assert_allclose(np.angle(np.exp(1j * (lon - self.lon))), 0, atol=1e-8)
+                    nt.assert_allclose(lat, self.lat, atol=1e-8)
+
+    def test_roundtrip_degrees(self):
+        for name, (forward, inverse, _) in projection.PROJECTIONS.items():
+            with self.subTest(projection=name):
+                x, y = forward(100.0, -20.0, ref_lon=30.0, degrees=True)
+                lon, lat = inverse(x, y, ref_lon=30.0, degrees=True)
+                self.assertAlmostEqual(float(lon), 100.0)
+                self.assertAlmostEqual(float(lat), -20.0)
+
+    def test_inverse_outside(self):
+        for name, (_, inverse, (a, b)) in projection.PROJECTIONS.items():
+            with self.subTest(projection=name):
+                lon, lat = inverse(np.array([0.0, a * 0.8]), np.array([0.0, b * 0.8]))
+                nt.assert_allclose(lon[0], 0.0, atol=1e-12)
+                nt.assert_allclose(lat[0], 0.0, atol=1e-12)
+                self.assertTrue(np.isnan(lon[1]) and np.isnan(lat[1]))
+
+
+class TestProjectionHistogram(unittest.TestCase):
+
+    def test_streaming_matches_histogram2d(self):
+        rng = np.random.default_rng(9)
+        lon = rng.uniform(-180, 180, size=10000)
+        lat = np.degrees(np.arcsin(rng.uniform(-1, 1, size=10000)))
+        weights = rng.uniform(size=10000)
+
+        hist = projection.ProjectionHistogram(
+            "mollweide", bins=(36, 18), degrees=True, chunk_size=777
+        )
+        hist.add(lon[:4000], lat[:4000], weights=weights[:4000])
+        hist.add(lon[4000:], lat[4000:], weights=weights[4000:])
+        self.assertEqual(hist.total, 10000)
+
+        x, y = projection.latlon_to_mollweide(lon, lat, degrees=True)
+        ref, _, _ = np.histogram2d(x, y, bins=[hist.x_edges, hist.y_edges], weights=weights)
+        nt.assert_allclose(hist.counts, ref)
+
+    def test_non_finite_dropped(self):
+        hist = projection.ProjectionHistogram("hammer", bins=(8, 4))
+        lon = np.array([0.1, np.nan, 0.2, np.inf, 0.3])
+        lat = np.array([0.1, 0.2, np.nan, 0.3, -0.1])
+        hist.add(lon, lat, weights=np.ones(5))
+        self.assertEqual(hist.total, 2)
+        self.assertEqual(hist.counts.sum(), 2.0)
+        self.assertTrue(np.all(np.isfinite(hist.counts)))
+
+    def test_edges_included(self):
+        hist = projection.ProjectionHistogram("hammer", bins=(8, 4))
+        hist.add(np.array([np.pi, -np.pi, 0.0]), np.array([0.0, 0.0, np.pi / 2]))
+        self.assertEqual(hist.total, 3)
+        self.assertEqual(hist.counts[-1].sum(), 1.0)
+        self.assertEqual(hist.counts[0].sum(), 1.0)
+        self.assertEqual(hist.counts[:, -1].sum(), 1.0)
+
+    def test_bin_centers(self):
+        hist = projection.ProjectionHistogram("hammer", bins=(8, 4), degrees=True)
+        lon, lat = hist.bin_centers()
+        self.assertEqual(lon.shape, (8, 4))
+        self.assertTrue(np.isnan(lon[0, 0]))
+        inside = ~np.isnan(lon)
+        hist.add(lon[inside], lat[inside])
+        nt.assert_array_equal(hist.counts, inside.astype(np.float64))
+
+    def test_unknown_projection(self):
+        with self.assertRaises(ValueError):
+            projection.ProjectionHistogram("mercator")
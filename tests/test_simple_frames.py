@@ -6,7 +6,7 @@ import unittest
 import numpy as np
 import numpy.testing as nt
 
-from spacecoords import frames
+from spacecoords import frames, spherical
 
 
 class ECEFRelatedFuncs(unittest.TestCase):
@@ -132,3 +132,47 @@ class ECEFRelatedFuncs(unittest.TestCase):
         )
         pt_ref = np.array([0.0, 0.0, 1.0])
         nt.assert_array_almost_equal(pt_ref, pt, decimal=3)
+
+
+class AzElRates(unittest.TestCase):
+
+    def setUp(self):
+        self.lat, self.lon, self.alt = 69.58, 19.22, 86.0
+        self.site = frames.geodetic_wgs84_to_ecef(self.lat, self.lon, self.alt, degrees=True)
+        rng = np.random.default_rng(17)
+        self.pos = self.site[:, None] + rng.normal(size=(3, 20)) * 500e3
+        self.vel = rng.normal(size=(3, 20)) * 7e3
+        self.states = np.concatenate([self.pos, self.vel])
+
+    def azel(self, t):
+        enu = frames.ecef_to_enu(
+            self.lat, self.lon, self.pos + self.vel * t - self.site[:, None], degrees=True
+        )
+        return spherical.cart_to_sph(enu, degrees=True)
+
+    def test_against_finite_differences(self):
+        out = frames.ecef_to_azel_rates(self.lat, self.lon, self.alt, self.states, degrees=True)
+        self.assertEqual(out.shape, (6, 20))
+        nt.assert_allclose(out[:3], self.azel(0.0))
+
+        dt = 1e-3
+        fd = (self.azel(dt) - self.azel(-dt)) / (2 * dt)
+        fd[0] = (np.mod(fd[0] * 2 * dt + 180, 360) - 180) / (2 * dt)
+        nt.assert_allclose(out[3:], fd, rtol=1e-6)
+
+    def test_single_state(self):
+        out = frames.ecef_to_azel_rates(
+            self.lat, self.lon, self.alt, self.states[:, 0], degrees=True
+        )
+        self.assertEqual(out.shape, (6,))
+        ref = frames.ecef_to_azel_rates(self.lat, self.lon, self.alt, self.states, degrees=True)
+        nt.assert_allclose(out, ref[:, 0])
+
+    def test_zenith(self):
+        up = frames.enu_to_ecef(self.lat, self.lon, np.array([0, 0, 1e5]), degrees=True)
+        vel = frames.enu_to_ecef(self.lat, self.lon, np.array([0, 0, 100.0]), degrees=True)
+        out = frames.ecef_to_azel_rates(
+            self.lat, self.lon, self.alt, np.concatenate([self.site + up, vel]), degrees=True
+        )
+        nt.assert_allclose(out[[0, 1, 2, 5]], [0, 90, 1e5, 100], atol=1e-6)
+        self.assertTrue(np.isnan(out[3]) and np.isnan(out[4]))
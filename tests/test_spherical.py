@@ -106,3 +106,218 @@ class TestCartSph(unittest.TestCase):
             X = spherical.sph_to_cart(Y[:, ind], degrees=False)
             Yp = spherical.cart_to_sph(X, degrees=False)
             nt.assert_array_almost_equal(Yp, Y[:, ind])
+
+    def test_cart_to_sph_poles(self):
+        X = np.array([[0, 0, 2], [1e-12, 0, -3], [0, 0, 0]], dtype=np.float64).T
+        Y = np.array([[0, pi / 2, 2], [0, -pi / 2, 3], [0, 0, 0]], dtype=np.float64).T
+        nt.assert_array_almost_equal(spherical.cart_to_sph(X), Y)
+
+    def test_cart_to_sph_float32(self):
+        X = self.X.astype(np.float32)
+        Y = spherical.cart_to_sph(X)
+        self.assertEqual(Y.dtype, np.float32)
+        nt.assert_allclose(Y, self.Y, rtol=1e-6, atol=1e-6)
+
+    def test_cart_to_sph_out(self):
+        out = np.empty_like(self.X)
+        Y = spherical.cart_to_sph(self.X, degrees=True, out=out)
+        self.assertIs(Y, out)
+        X = self.X.copy()
+        spherical.cart_to_sph(X, degrees=True, out=X)
+        nt.assert_array_almost_equal(X, out)
+        nt.assert_array_almost_equal(out[:2], np.degrees(self.Y[:2]))
+
+
+class TestAzElAngle(unittest.TestCase):
+
+    def test_pairwise(self):
+        rng = np.random.default_rng(3)
+        az = rng.uniform(-180, 180, size=5)
+        el = rng.uniform(0, 90, size=5)
+        cart = rng.normal(size=(3, 40))
+        ang = spherical.az_el_vs_cart_angle(az, el, cart, degrees=True, pairwise=True)
+        self.assertEqual(ang.shape, (5, 40))
+        for ind in range(5):
+            ref = spherical.az_el_vs_cart_angle(az[ind], el[ind], cart, degrees=True)
+            nt.assert_allclose(ang[ind], ref)
+
+
+class TestDirectionCosines(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(13)
+        self.az = rng.uniform(-180, 180, size=200)
+        self.el = rng.uniform(-89, 89, size=200)
+
+    def test_uvw_is_pointing(self):
+        uvw = spherical.az_el_to_uvw(self.az, self.el, degrees=True)
+        nt.assert_allclose(uvw, spherical.az_el_point(self.az, self.el, degrees=True), atol=1e-15)
+        uvw = spherical.az_el_to_uvw(0.0, 90.0, degrees=True)
+        nt.assert_allclose(uvw, [0, 0, 1], atol=1e-15)
+
+    def test_roundtrip(self):
+        uvw = spherical.az_el_to_uvw(self.az, self.el, degrees=True)
+        nt.assert_allclose(
+            spherical.uvw_to_az_el(uvw, degrees=True), [self.az, self.el], atol=1e-10
+        )
+
+    def test_face_frame(self):
+        frame = spherical.array_face_frame(0.0, 90.0, degrees=True)
+        nt.assert_allclose(frame, np.eye(3), atol=1e-15)
+
+        frame = spherical.array_face_frame(30.0, 20.0, degrees=True)
+        nt.assert_allclose(frame @ frame.T, np.eye(3), atol=1e-15)
+        nt.assert_allclose(np.linalg.det(frame), 1.0)
+        boresight = spherical.az_el_to_uvw(30.0, 20.0, degrees=True, frame=frame)
+        nt.assert_allclose(boresight, [0, 0, 1], atol=1e-15)
+
+        uvw = spherical.az_el_to_uvw(self.az, self.el, degrees=True, frame=frame)
+        az_el = spherical.uvw_to_az_el(uvw, degrees=True, frame=frame)
+        nt.assert_allclose(az_el, [self.az, self.el], atol=1e-10)
+
+        front = uvw[2] > 0
+        az_el = spherical.uvw_to_az_el(uvw[:2, front], degrees=True, frame=frame)
+        nt.assert_allclose(az_el, [self.az[front], self.el[front]], atol=1e-9)
+
+    def test_steering_grid(self):
+        grid = spherical.SteeringGrid(21, 45.0, degrees=True)
+        self.assertEqual(grid.uvw.shape[0], 3)
+        nt.assert_allclose(np.linalg.norm(grid.uvw, axis=0), 1)
+
+        enu = grid.directions(30.0, 60.0)
+        az_el = grid.az_el(30.0, 60.0)
+        self.assertIs(enu, grid.directions(30.0, 60.0))
+        self.assertFalse(enu.flags.writeable)
+        nt.assert_allclose(
+            spherical.az_el_to_uvw(az_el[0], az_el[1], degrees=True), enu, atol=1e-12
+        )
+
+        off = spherical.az_el_vs_cart_angle(30.0, 60.0, enu, degrees=True)
+        self.assertLessEqual(off.max(), 45.0 + 1e-9)
+        self.assertAlmostEqual(off.min(), 0.0)
+
+        grid.directions(0.0, 90.0)
+        self.assertEqual(len(grid._cache), 2)
+        grid.clear_cache()
+        self.assertEqual(len(grid._cache), 0)
+
+    def test_steering_grid_boresight(self):
+        for num in [1, 4, 5]:
+            with self.subTest(num=num):
+                grid = spherical.SteeringGrid(num, 30.0, degrees=True)
+                boresight = np.all(grid.uvw == np.array([[0.0], [0.0], [1.0]]), axis=0)
+                self.assertEqual(np.count_nonzero(boresight), 1)
+                nt.assert_array_equal(np.sort(grid.uvw[0]), np.sort(-grid.uvw[0]))
+        self.assertEqual(len(spherical.SteeringGrid(1, 30.0, degrees=True)), 1)
+        self.assertEqual(len(spherical.SteeringGrid(4, 30.0, degrees=True)), 13)
+        with self.assertRaises(ValueError):
+            spherical.SteeringGrid(0, 30.0, degrees=True)
+
+
+class TestGreatCircleDistance(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.el_a = rng.uniform(-pi / 2, pi / 2, size=30)
+        self.az_a = rng.uniform(-pi, pi, size=30)
+        self.el_b = rng.uniform(-pi / 2, pi / 2, size=50)
+        self.az_b = rng.uniform(-pi, pi, size=50)
+
+    def test_methods_agree(self):
+        ref = spherical.great_circle_distance(
+            self.el_a, self.az_a, self.el_a[::-1], self.az_a[::-1]
+        )
+        for method in ["cosine", "haversine"]:
+            dist = spherical.great_circle_distance(
+                self.el_a, self.az_a, self.el_a[::-1], self.az_a[::-1], method=method
+            )
+            nt.assert_allclose(dist, ref, atol=1e-7)
+        with self.assertRaises(ValueError):
+            spherical.great_circle_distance(0.0, 0.0, 1.0, 1.0, method="flat")
+
+    def test_small_and_antipodal(self):
+        el = np.radians(30.0)
+        for method in ["haversine", "vincenty"]:
+            dist = spherical.great_circle_distance(el, 0.1, el + 1e-9, 0.1, method=method)
+            self.assertAlmostEqual(dist / 1e-9, 1.0, places=6)
+        dist = spherical.great_circle_distance(10.0, 20.0, -10.0, 200.0, degrees=True)
+        self.assertAlmostEqual(dist, 180.0, places=12)
+
+    def test_pairwise(self):
+        dist = spherical.great_circle_distance(
+            self.el_a, self.az_a, self.el_b, self.az_b, pairwise=True, chunk_size=100
+        )
+        self.assertEqual(dist.shape, (30, 50))
+        ref = spherical.great_circle_distance(
+            self.el_a[:, None], self.az_a[:, None], self.el_b[None, :], self.az_b[None, :]
+        )
+        nt.assert_allclose(dist, ref)
+
+    def test_k_nearest(self):
+        dist, ind = spherical.great_circle_distance(
+            np.degrees(self.el_a),
+            np.degrees(self.az_a),
+            np.degrees(self.el_b),
+            np.degrees(self.az_b),
+            degrees=True,
+            k=3,
+        )
+        ref = spherical.great_circle_distance(
+            self.el_a, self.az_a, self.el_b, self.az_b, degrees=False, pairwise=True
+        )
+        nt.assert_array_equal(ind, np.argsort(ref, axis=1)[:, :3].T)
+        nt.assert_allclose(dist, np.degrees(np.sort(ref, axis=1)[:, :3].T), atol=1e-9)
+
+
+class TestSphericalIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.vectors = rng.normal(size=(3, 5000))
+        self.centers = rng.normal(size=(3, 40))
+        self.centers[:, :3] = np.array([[0, 0, 1], [0, 0, -1], [1, 0, 0]]).T
+        self.index = spherical.SphericalIndex(self.vectors)
+        self.angles = np.arccos(
+            np.clip(
+                (self.centers / np.linalg.norm(self.centers, axis=0)).T
+                @ (self.vectors / np.linalg.norm(self.vectors, axis=0)),
+                -1,
+                1,
+            )
+        )
+
+    def test_cone_search(self):
+        for radius in [0.01, 0.2, 1.0, 2.5, np.pi]:
+            cone, ind, ang = self.index.cone_search(self.centers, radius)
+            ref_cone, ref_ind = np.nonzero(self.angles <= radius)
+            nt.assert_array_equal(cone, ref_cone)
+            nt.assert_array_equal(ind, ref_ind)
+            nt.assert_allclose(ang, self.angles[cone, ind], atol=1e-9)
+
+    def test_cone_search_radius_per_cone(self):
+        radius = np.linspace(0, 0.5, self.centers.shape[1])
+        cone, ind, _ = self.index.cone_search(self.centers, np.degrees(radius), degrees=True)
+        ref_cone, ref_ind = np.nonzero(self.angles <= radius[:, None])
+        nt.assert_array_equal(cone, ref_cone)
+        nt.assert_array_equal(ind, ref_ind)
+
+    def test_query(self):
+        ang, ind = self.index.query(self.centers, k=4)
+        self.assertEqual(ind.shape, (4, self.centers.shape[1]))
+        nt.assert_array_equal(ind, np.argsort(self.angles, axis=1)[:, :4].T)
+        nt.assert_allclose(ang, np.sort(self.angles, axis=1)[:, :4].T, atol=1e-9)
+
+    def test_query_small_catalog(self):
+        index = spherical.SphericalIndex(self.vectors[:, :3])
+        _, ind = index.query(self.centers, k=3)
+        nt.assert_array_equal(np.sort(ind, axis=0), np.repeat(np.arange(3)[:, None], 40, axis=1))
+        with self.assertRaises(ValueError):
+            index.query(self.centers, k=4)
+
+    def test_from_az_el(self):
+        az = np.array([0.0, 90.0, 45.0])
+        el = np.array([0.0, 0.0, 89.0])
+        index = spherical.SphericalIndex.from_az_el(az, el, degrees=True)
+        ang, ind = index.query(np.array([0.0, 0.1, 1.0]), k=1, degrees=True)
+        self.assertEqual(ind[0, 0], 2)
+        self.assertLess(ang[0, 0], 10)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+
+""" """
+
+import struct
+import pathlib
+import tempfile
+import unittest
+import numpy as np
+import numpy.testing as nt
+from numpy.polynomial import chebyshev
+
+from spacecoords import interpolation, spk_basic
+
+FTPSTR = b"FTPSTR:\r:\n:\r\n:\r\x00:\x81:\x10\xce:ENDFTP"
+
+
+def write_synthetic_spk(path, segments):
+    """Write a minimal little-endian DAF/SPK file.
+
+    Each segment is a tuple of (center, target, data_type, init, intlen, coefficients) where
+    coefficients has shape (records, components, coefficient_count).
+    """
+    nd, ni = 2, 6
+    summary_doubles = nd + (ni + 1) // 2
+    data_start = 3 * 128 + 1
+
+    summaries = []
+    names = b""
+    data = []
+    address = data_start
+    for center, target, data_type, init, intlen, coefs in segments:
+        n, comps, ncoef = coefs.shape
+        rsize = 2 + comps * ncoef
+        mids = init + (np.arange(n) + 0.5) * intlen
+        records = np.empty((n, rsize))
+        records[:, 0] = mids
+        records[:, 1] = intlen / 2
+        records[:, 2:] = coefs.reshape(n, comps * ncoef)
+        seg = np.concatenate([records.flatten(), [init, intlen, rsize, n]])
+        start_i, end_i = address, address + len(seg) - 1
+        address = end_i + 1
+        data.append(seg)
+        summaries.append(
+            struct.pack("<dd", init, init + n * intlen)
+            + struct.pack("<6i", target, center, 1, data_type, start_i, end_i)
+        )
+        names += b"SYNTHETIC".ljust(8 * summary_doubles, b" ")
+
+    file_record = (
+        b"DAF/SPK "
+        + struct.pack("<ii", nd, ni)
+        + b"synthetic".ljust(60, b" ")
+        + struct.pack("<iii", 2, 2, address)
+        + b"LTL-IEEE"
+    ).ljust(500, b"\0")
+    file_record = (file_record + FTPSTR).ljust(1024, b"\0")
+    summary_record = struct.pack("<ddd", 0, 0, len(segments)) + b"".join(summaries)
+
+    with open(path, "wb") as fh:
+        fh.write(file_record)
+        fh.write(summary_record.ljust(1024, b"\0"))
+        fh.write(names.ljust(1024, b" "))
+        fh.write(np.concatenate(data).astype("<f8").tobytes())
+        fh.write(b"\0" * (-fh.tell() % 1024))
+
+
+class TestMemmapSPK(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(8273)
+        self.init = -86400.0 * 10
+        self.intlen = 86400.0 * 4
+        self.coefs2 = rng.normal(size=(5, 3, 8)) * 1e4
+        self.coefs3 = rng.normal(size=(6, 6, 5)) * 1e3
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmpdir.name) / "test.bsp"
+        write_synthetic_spk(
+            self.path,
+            [
+                (0, 3, 2, self.init, self.intlen, self.coefs2),
+                (3, 399, 3, self.init, self.intlen, self.coefs3),
+            ],
+        )
+        self.et = np.linspace(self.init, self.init + 5 * self.intlen, 101)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def reference(self, coefs, et):
+        index = np.clip(np.floor((et - self.init) / self.intlen).astype(int), 0, coefs.shape[0] - 1)
+        s = (et - (self.init + (index + 0.5) * self.intlen)) / (self.intlen / 2)
+        pos = np.empty((coefs.shape[1], len(et)))
+        vel = np.empty((coefs.shape[1], len(et)))
+        for ind, (i, x) in enumerate(zip(index, s)):
+            for c in range(coefs.shape[1]):
+                pos[c, ind] = chebyshev.chebval(x, coefs[i, c])
+                dcoefs = chebyshev.chebder(coefs[i, c])
+                vel[c, ind] = chebyshev.chebval(x, dcoefs) / (self.intlen / 2)
+        return pos, vel
+
+    def test_summaries(self):
+        with spk_basic.MemmapSPK(self.path) as kernel:
+            self.assertEqual(len(kernel.segments), 2)
+            seg = kernel[0, 3]
+            self.assertEqual(seg.data_type, 2)
+            self.assertEqual(seg.records, 5)
+            self.assertEqual(seg.coefficient_count, 8)
+            self.assertEqual(kernel[3, 399].data_type, 3)
+
+    def test_type2(self):
+        pos_ref, vel_ref = self.reference(self.coefs2, self.et)
+        with spk_basic.MemmapSPK(self.path) as kernel:
+            pos = kernel[0, 3].compute(self.et)
+            state = kernel[0, 3].compute_and_differentiate(self.et)
+        nt.assert_allclose(pos, pos_ref, rtol=1e-12, atol=1e-6)
+        nt.assert_allclose(state[:3], pos_ref, rtol=1e-12, atol=1e-6)
+        nt.assert_allclose(state[3:], vel_ref, rtol=1e-12, atol=1e-10)
+
+    def test_type3(self):
+        pos_ref, _ = self.reference(self.coefs3, self.et)
+        with spk_basic.MemmapSPK(self.path) as kernel:
+            state = kernel[3, 399].compute_and_differentiate(self.et)
+        nt.assert_allclose(state, pos_ref, rtol=1e-12, atol=1e-6)
+
+    def test_scalar_epoch(self):
+        with spk_basic.MemmapSPK(self.path) as kernel:
+            state = kernel[0, 3].compute_and_differentiate(self.et[3])
+            states = kernel[0, 3].compute_and_differentiate(self.et)
+        self.assertEqual(state.shape, (6,))
+        nt.assert_allclose(state, states[:, 3])
+
+    def test_out_of_range(self):
+        with spk_basic.MemmapSPK(self.path) as kernel:
+            with self.assertRaises(ValueError):
+                kernel[0, 3].compute(np.array([self.init - 1.0]))
+            end = kernel[0, 3].end_second
+            with self.assertRaises(ValueError):
+                kernel[0, 3].compute(np.array([end + 1.0]))
+            with self.assertRaises(ValueError):
+                kernel[0, 3].compute(np.nextafter(end, np.inf))
+            kernel[0, 3].compute(end)
+
+    def test_end_rounding(self):
+        # with a non-integer init the record index of epochs just below the end rounds up
+        init, intlen, records = 87249982.93084574, 935137.3513639804, 2188
+        path = pathlib.Path(self.tmpdir.name) / "rounding.bsp"
+        coefs = np.zeros((records, 3, 3))
+        coefs[:, :, 0] = np.arange(records)[:, None]
+        write_synthetic_spk(path, [(0, 10, 2, init, intlen, coefs)])
+        with spk_basic.MemmapSPK(path) as kernel:
+            seg = kernel[0, 10]
+            et = [seg.end_second]
+            for _ in range(4):
+                et.append(np.nextafter(et[-1], -np.inf))
+            pos = seg.compute(np.array(et))
+        nt.assert_array_equal(pos, records - 1)
+
+    def test_jplephem_correspondence(self):
+        try:
+            from jplephem.spk import SPK
+        except ImportError:
+            self.skipTest("jplephem not installed")
+        jd1 = np.full_like(self.et, spk_basic.J2000_JD)
+        jd2 = self.et / spk_basic.SECONDS_PER_DAY
+        with SPK.open(str(self.path)) as ref_kernel:
+            pos_ref, vel_ref = ref_kernel[0, 3].compute_and_differentiate(jd1, jd2)
+        with spk_basic.MemmapSPK(self.path) as kernel:
+            state = kernel[0, 3].compute_and_differentiate(self.et)
+        nt.assert_allclose(state[:3], pos_ref, rtol=1e-10, atol=1e-6)
+        nt.assert_allclose(state[3:] * spk_basic.SECONDS_PER_DAY, vel_ref, rtol=1e-10, atol=1e-6)
+
+    def test_body_states_native(self):
+        states = spk_basic.get_solarsystem_body_states_native(["earth"], self.et, self.path)
+        with spk_basic.MemmapSPK(self.path) as kernel:
+            ref = kernel[0, 3].compute_and_differentiate(self.et)
+            ref += kernel[3, 399].compute_and_differentiate(self.et)
+        nt.assert_allclose(states["earth"], ref * 1e3)
+
+        states = spk_basic.get_solarsystem_body_states_native(
+            ["earth"], self.et, self.path, units=[1.0, 1.0]
+        )
+        nt.assert_allclose(states["earth"][:3], ref[:3])
+        nt.assert_allclose(states["earth"][3:], ref[3:] * spk_basic.SECONDS_PER_DAY)
+        states = spk_basic.get_solarsystem_body_states_native(
+            ["earth"], self.et, self.path, units=[1e3, spk_basic.SECONDS_PER_DAY]
+        )
+        nt.assert_allclose(states["earth"], ref * 1e3)
+
+
+class TestEphemerisTable(unittest.TestCase):
+
+    def setUp(self):
+        self.period = 86400.0 * 27.3
+        self.radius = 3.844e8
+        self.t0, self.t1 = 0.0, 86400.0 * 30
+        self.step = 3600.0 * 6
+
+    def orbit(self, t):
+        w = 2 * np.pi / self.period
+        states = np.zeros((6, len(t)))
+        states[0] = self.radius * np.cos(w * t)
+        states[1] = self.radius * np.sin(w * t)
+        states[3] = -self.radius * w * np.sin(w * t)
+        states[4] = self.radius * w * np.cos(w * t)
+        return states
+
+    def test_error_bound(self):
+        step = 86400.0 * 2
+        table = spk_basic.EphemerisTable.from_function(self.orbit, self.t0, self.t1, step)
+        t = np.linspace(self.t0, table.t[-1], 10001)
+        err = np.max(np.abs(table.get_state(t) - self.orbit(t)), axis=1)
+        self.assertTrue(np.all(np.isfinite(table.error_bound)))
+        self.assertTrue(np.all(err <= table.error_bound * 1.05))
+        self.assertTrue(np.all(err[[0, 1, 3, 4]] >= table.error_bound[[0, 1, 3, 4]] * 0.5))
+
+        table = spk_basic.EphemerisTable.from_function(self.orbit, self.t0, self.t1, self.step)
+        self.assertLess(table.error_bound[0], 1e-3)
+
+    def test_out_of_range(self):
+        table = spk_basic.EphemerisTable.from_function(
+            self.orbit, self.t0, self.t1, self.step, validate=False
+        )
+        with self.assertRaises(ValueError):
+            table.get_state(np.array([self.t0 - 1.0]))
+
+    def test_save_load(self):
+        table = spk_basic.EphemerisTable.from_function(
+            self.orbit, self.t0, self.t1, self.step, body="moon"
+        )
+        t = np.linspace(self.t0, self.t1, 77)
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            for name, modes in [("table", [False, True]), ("table.npz", [False])]:
+                path = pathlib.Path(tmpdirname) / name
+                table.save(path)
+                for mmap in modes:
+                    for cls in [spk_basic.EphemerisTable, interpolation.Interpolator]:
+                        loaded = cls.load(path, mmap=mmap)
+                        self.assertIsInstance(loaded, spk_basic.EphemerisTable)
+                        self.assertEqual(loaded.body, "moon")
+                        nt.assert_array_equal(loaded.error_bound, table.error_bound)
+                        nt.assert_allclose(loaded.get_state(t), table.get_state(t), rtol=1e-12)
+                        del loaded
+
+    def test_from_kernel(self):
+        rng = np.random.default_rng(2)
+        coefs = rng.normal(size=(1, 3, 6)) * 1e5 / (np.arange(6) + 1) ** 2
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = pathlib.Path(tmpdirname) / "test.bsp"
+            write_synthetic_spk(path, [(0, 10, 2, 0.0, 86400.0 * 40, coefs)])
+            table = spk_basic.EphemerisTable.from_kernel("sun", self.t0, self.t1, self.step, path)
+            t = np.linspace(self.t0, self.t1, 50)
+            ref = spk_basic.get_solarsystem_body_states_native(["sun"], t, path)["sun"]
+        nt.assert_allclose(table.get_state(t), ref, rtol=1e-9, atol=1e-6)
+
+
+class TestKernelWorkers(unittest.TestCase):
+
+    def test_workers(self):
+        try:
+            from astropy.time import Time
+        except ImportError:
+            self.skipTest("astropy not installed")
+        rng = np.random.default_rng(7)
+        coefs = rng.normal(size=(4, 3, 7)) * 1e5
+        epoch = Time(spk_basic.J2000_JD + np.linspace(0.0, 15.0, 501), format="jd", scale="tdb")
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = str(pathlib.Path(tmpdirname) / "test.bsp")
+            write_synthetic_spk(path, [(0, 10, 2, 0.0, 86400.0 * 4, coefs)])
+            ref = spk_basic.get_solarsystem_body_states(["sun"], epoch, path)
+            states = spk_basic.get_solarsystem_body_states(["sun"], epoch, path, workers=2)
+        self.assertEqual(states["sun"].shape, (6, 501))
+        nt.assert_array_equal(states["sun"], ref["sun"])
+
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = str(pathlib.Path(tmpdirname) / "test.bsp")
+            write_synthetic_spk(path, [(0, 10, 2, 0.0, 86400.0 * 4, coefs)])
+            single = spk_basic.get_solarsystem_body_states(["sun"], epoch[:1], path)
+            scalar = spk_basic.get_solarsystem_body_states(["sun"], epoch[0], path)
+        self.assertEqual(single["sun"].shape, (6, 1))
+        self.assertEqual(scalar["sun"].shape, (6,))
+        nt.assert_array_equal(single["sun"][:, 0], scalar["sun"])